@@ -1,6 +1,7 @@
 # app.py
 
-from flask import Flask, render_template, request, jsonify, session, redirect, url_for
+import atexit
+from flask import Flask, render_template, request, jsonify, session, redirect, url_for, Response, send_file, abort
 import os
 from dotenv import load_dotenv
 import json
@@ -12,8 +13,16 @@ load_dotenv()
 # Import custom modules
 from src.nlp.enhanced_tokenizer import EnhancedSinhalaTokenizer
 from src.tts.enhanced_speech_engine import EnhancedSpeechEngine
-from src.learning.student_profile import StudentProfile
+from src.tts.audio_cache import guess_audio_mimetype
+from src.tts.backends import get_backend
+from src.tts.synthesis_service import SynthesisService
+from src.learning.student_profile import StudentProfile, answer_record
+from src.learning.profile_writer import ProfileWriter
+from src.learning.profile_cache import ProfileCache
+from src.learning.profile_store import get_profile_store
+from src.learning.answer_ingest import AnswerIngestor
 from src.learning.lesson_generator import AdaptiveLessonGenerator
+from src.learning.lesson_pool import LessonPool
 from src.cultural.problem_generator import CulturalProblemGenerator
 from src.feedback.feedback_engine import FeedbackEngine
 
@@ -24,19 +33,71 @@ app.secret_key = config.SECRET_KEY  # Set the secret key
 
 # Initialize components
 tokenizer = EnhancedSinhalaTokenizer()
-speech_engine = EnhancedSpeechEngine(language='si')
+tts_backend = get_backend(config.TTS_ENGINE, pool_size=config.TTS_WORKERS)
+synthesis_service = SynthesisService(tts_backend, max_workers=config.TTS_WORKERS, language='si')
+speech_engine = EnhancedSpeechEngine(language='si', synthesis_service=synthesis_service)
+if speech_engine.equation_mode == 'clips':
+    # Build the equation clip bank now rather than in the first request that needs it
+    speech_engine.prerender_clips()
 problem_generator = CulturalProblemGenerator()
 lesson_generator = AdaptiveLessonGenerator()
 feedback_engine = FeedbackEngine(speech_engine, language='si')
 
-# Global cache for student profiles
-student_profiles = {}
+# Background writer batching profile saves; flushed on shutdown. Not used when
+# several worker processes share profiles, since each update must reach disk.
+profile_writer = None
+if config.PROFILE_WRITE_BEHIND and not config.PROFILE_MULTIPROCESS:
+    profile_writer = ProfileWriter(config.PROFILE_FLUSH_INTERVAL, config.PROFILE_FLUSH_BATCH).start()
+    atexit.register(profile_writer.stop)
+
+# Bounded cache of loaded student profiles; evicted profiles are flushed first
+student_profiles = ProfileCache(
+    lambda student_id, impairment_type: StudentProfile(student_id, impairment_type,
+                                                       writer=profile_writer),
+    max_entries=config.PROFILE_CACHE_MAX_ENTRIES,
+    max_bytes=config.PROFILE_CACHE_MAX_MB * 1024 * 1024,
+    ttl=config.PROFILE_CACHE_TTL
+)
+atexit.register(student_profiles.flush_all)
 
 def get_student_profile(student_id, impairment_type=1):
     """Get or create student profile"""
-    if student_id not in student_profiles:
-        student_profiles[student_id] = StudentProfile(student_id, impairment_type)
-    return student_profiles[student_id]
+    profile = student_profiles.get(student_id, impairment_type)
+    if config.PROFILE_MULTIPROCESS:
+        # Pick up answers saved by other worker processes
+        profile.reload_if_changed()
+    return profile
+
+# Lessons predicted after each answer and built ahead of the next request
+lesson_pool = None
+if config.LESSON_PREFETCH:
+    lesson_pool = LessonPool(lesson_generator,
+                             per_key=config.LESSON_POOL_PER_KEY,
+                             max_keys=config.LESSON_POOL_MAX_KEYS,
+                             max_workers=config.LESSON_PREFETCH_WORKERS)
+    atexit.register(lesson_pool.shutdown)
+
+def apply_answers(student_id, records):
+    """Apply ingested answers to the profile and start preparing the next lesson"""
+    profile = get_student_profile(student_id)
+    profile.apply_answers(records, append_history=False)
+    if lesson_pool is not None:
+        lesson_pool.prefetch(profile)
+
+# Answers are applied and persisted in batches off the request path; stopped
+# before the profile cache is flushed (atexit runs in reverse order)
+answer_ingestor = None
+if config.ANSWER_INGEST:
+    answer_ingestor = AnswerIngestor(
+        get_profile_store(),
+        apply_answers,
+        max_queue=config.ANSWER_QUEUE_SIZE,
+        batch_size=config.ANSWER_BATCH_SIZE,
+        interval=config.ANSWER_FLUSH_INTERVAL,
+        enqueue_timeout=config.ANSWER_ENQUEUE_TIMEOUT,
+        spill_path=config.ANSWER_SPILL_PATH
+    ).start()
+    atexit.register(answer_ingestor.stop)
 
 @app.route('/')
 def index():
@@ -78,7 +139,10 @@ def get_lesson():
     
     topic = request.args.get('topic')
     profile = get_student_profile(student_id)
-    lesson = lesson_generator.generate_lesson(profile, topic)
+    if lesson_pool is not None:
+        lesson = lesson_pool.get(profile, topic)
+    else:
+        lesson = lesson_generator.generate_lesson(profile, topic)
     
     return jsonify({'lesson': lesson})
 
@@ -97,12 +161,21 @@ def check_answer():
     # Check answer and generate feedback
     feedback_data = feedback_engine.generate_feedback(problem, user_answer, profile)
     
-    # Update student progress
-    profile.update_progress(
-        problem.get('type', ''),
-        problem.get('subtype', ''),
-        feedback_data['is_correct']
-    )
+    # Update student progress, in the background when answers are ingested
+    if answer_ingestor is not None:
+        answer_ingestor.submit(student_id, answer_record(
+            problem.get('type', ''),
+            problem.get('subtype', ''),
+            feedback_data['is_correct']
+        ))
+    else:
+        profile.update_progress(
+            problem.get('type', ''),
+            problem.get('subtype', ''),
+            feedback_data['is_correct']
+        )
+        if lesson_pool is not None:
+            lesson_pool.prefetch(profile)
     
     return jsonify(feedback_data)
 
@@ -112,9 +185,67 @@ def speak():
     text = data.get('text', '')
     is_equation = data.get('is_equation', False)
     
-    success = speech_engine.speak(text, is_equation)
+    # Server-side playback is only for local kiosk deployments
+    if config.TTS_PLAYBACK and data.get('playback', False):
+        success = speech_engine.speak(text, is_equation)
+        return jsonify({'success': success})
+    
+    try:
+        key, audio = speech_engine.synthesize_with_key(text, is_equation)
+    except Exception as e:
+        print(f"Error in TTS: {e}")
+        return jsonify({'success': False}), 503
+    
+    # Let the client fetch (and re-fetch) the audio from the cache
+    if data.get('response') == 'url':
+        return jsonify({'success': True, 'url': url_for('get_audio', key=key)})
+    
+    return _audio_response(audio)
+
+@app.route('/api/audio/<key>')
+def get_audio(key):
+    if not key.isalnum():
+        abort(404)
+    
+    path = speech_engine.audio_path(key)
+    if path:
+        with open(path, 'rb') as file:
+            mimetype = guess_audio_mimetype(file.read(12))
+        return send_file(path, mimetype=mimetype, conditional=True, max_age=86400)
+    
+    audio = speech_engine.cache.get(key)
+    if audio is None:
+        abort(404)
+    return _audio_response(audio, ranges=True)
+
+@app.route('/api/tts_stats')
+def tts_stats():
+    return jsonify({
+        'cache': speech_engine.cache.stats(),
+        'synthesis': synthesis_service.stats()
+    })
+
+@app.route('/api/profile_stats')
+def profile_stats():
+    return jsonify({
+        'cache': student_profiles.stats(),
+        'writer': profile_writer.stats() if profile_writer else None,
+        'answers': answer_ingestor.stats() if answer_ingestor else None,
+        'lessons': lesson_pool.stats() if lesson_pool else None
+    })
+
+def _audio_response(audio, ranges=False):
+    """Build an audio response with Content-Length; with ranges, GET Range requests get 206
     
-    return jsonify({'success': success})
+    Werkzeug only honours Range on GET and HEAD, so POST /api/speak always
+    returns the whole clip; clients that seek ask it for response=url and
+    fetch GET /api/audio/<key>, which serves ranges.
+    """
+    response = Response(audio, mimetype=guess_audio_mimetype(audio))
+    response.headers['Cache-Control'] = 'public, max-age=86400'
+    if not ranges:
+        return response
+    return response.make_conditional(request, accept_ranges=True, complete_length=len(audio))
 
 @app.route('/api/get_progress')
 def get_progress():
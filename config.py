@@ -10,6 +10,9 @@ except UnicodeDecodeError:
 
 # Database configuration with fallback values
 DATABASE_URL = os.getenv("DATABASE_URL", "postgresql://PostgreSQL 17:1234@localhost:5432/mathlearn")
+# Pooled connections per process
+DATABASE_POOL_MIN = int(os.getenv("DATABASE_POOL_MIN", "1"))
+DATABASE_POOL_MAX = int(os.getenv("DATABASE_POOL_MAX", "10"))
 
 # Path configuration
 MODEL_PATH = os.getenv("MODEL_PATH", "./models")
@@ -18,8 +21,61 @@ DATA_PATH = os.getenv("DATA_PATH", "./data")
 # Application settings
 DEBUG = os.getenv("DEBUG", "False").lower() == "true"
 LANGUAGE = os.getenv("LANGUAGE", "si")
+# TTS backend: gtts (network), espeak (offline), sine or null (tests)
 TTS_ENGINE = os.getenv("TTS_ENGINE", "gtts")
 SECRET_KEY = os.getenv("SECRET_KEY", os.urandom(24))
 
+# Speech audio cache configuration
+TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR", os.path.join(DATA_PATH, "tts_cache"))
+TTS_CACHE_MEMORY_ITEMS = int(os.getenv("TTS_CACHE_MEMORY_ITEMS", "256"))
+TTS_CACHE_DISK_MB = int(os.getenv("TTS_CACHE_DISK_MB", "512"))
+TTS_CACHE_WARM = os.getenv("TTS_CACHE_WARM", "False").lower() == "true"
+# Number of background threads running speech synthesis
+TTS_WORKERS = int(os.getenv("TTS_WORKERS", "4"))
+# Pre-rendered audio for fixed phrases (see src/tts/audio_pack.py)
+TTS_AUDIO_PACK_DIR = os.getenv("TTS_AUDIO_PACK_DIR", os.path.join(DATA_PATH, "audio_pack"))
+# How equations are spoken: "synthesize" whole strings or join pre-rendered "clips"
+TTS_EQUATION_MODE = os.getenv("TTS_EQUATION_MODE", "synthesize")
+# Play speech through the server's speakers (local kiosk use only)
+TTS_PLAYBACK = os.getenv("TTS_PLAYBACK", "False").lower() == "true"
+
+# Student profile persistence: write-behind batches profile saves in the background
+PROFILE_WRITE_BEHIND = os.getenv("PROFILE_WRITE_BEHIND", "True").lower() == "true"
+PROFILE_FLUSH_INTERVAL = float(os.getenv("PROFILE_FLUSH_INTERVAL", "5"))
+PROFILE_FLUSH_BATCH = int(os.getenv("PROFILE_FLUSH_BATCH", "20"))
+# Set when several server processes (e.g. gunicorn workers) share the profile files:
+# updates are then saved synchronously under a cross-process file lock
+PROFILE_MULTIPROCESS = os.getenv("PROFILE_MULTIPROCESS", "False").lower() == "true"
+# Where profiles are stored: "json" files per student, an embedded "sqlite" database,
+# or "postgres" at DATABASE_URL
+PROFILE_STORE = os.getenv("PROFILE_STORE", "json")
+PROFILE_DB_PATH = os.getenv("PROFILE_DB_PATH", os.path.join(DATA_PATH, "profiles.db"))
+# Answers kept in memory per profile; the full history is in an append-only log
+PROFILE_HISTORY_TAIL = int(os.getenv("PROFILE_HISTORY_TAIL", "200"))
+# Log records older than this are rolled into daily summaries by compaction
+HISTORY_RETENTION_DAYS = int(os.getenv("HISTORY_RETENTION_DAYS", "30"))
+# A log is compacted as it is written each time it grows by this many bytes (0 disables)
+HISTORY_COMPACT_BYTES = int(os.getenv("HISTORY_COMPACT_BYTES", str(1024 * 1024)))
+# Loaded profiles kept in memory: entry limit, memory budget and idle timeout (seconds)
+PROFILE_CACHE_MAX_ENTRIES = int(os.getenv("PROFILE_CACHE_MAX_ENTRIES", "500"))
+PROFILE_CACHE_MAX_MB = int(os.getenv("PROFILE_CACHE_MAX_MB", "256"))
+PROFILE_CACHE_TTL = int(os.getenv("PROFILE_CACHE_TTL", "1800"))
+# Answers are recorded by a background writer instead of inside the request:
+# queue bound, batch size, wait for a batch (seconds) and how long a request
+# waits on a full queue before spilling to ANSWER_SPILL_PATH
+ANSWER_INGEST = os.getenv("ANSWER_INGEST", "True").lower() == "true"
+ANSWER_QUEUE_SIZE = int(os.getenv("ANSWER_QUEUE_SIZE", "10000"))
+ANSWER_BATCH_SIZE = int(os.getenv("ANSWER_BATCH_SIZE", "500"))
+ANSWER_FLUSH_INTERVAL = float(os.getenv("ANSWER_FLUSH_INTERVAL", "0.2"))
+ANSWER_ENQUEUE_TIMEOUT = float(os.getenv("ANSWER_ENQUEUE_TIMEOUT", "0.05"))
+# Answers the store could not take yet; replayed once writes succeed again
+ANSWER_SPILL_PATH = os.getenv("ANSWER_SPILL_PATH", os.path.join(DATA_PATH, "answer_spill.jsonl"))
+# Next lessons built in the background after each answer: ready lessons kept per
+# (topic, difficulty, learning style), pools kept and builder threads
+LESSON_PREFETCH = os.getenv("LESSON_PREFETCH", "True").lower() == "true"
+LESSON_POOL_PER_KEY = int(os.getenv("LESSON_POOL_PER_KEY", "2"))
+LESSON_POOL_MAX_KEYS = int(os.getenv("LESSON_POOL_MAX_KEYS", "256"))
+LESSON_PREFETCH_WORKERS = int(os.getenv("LESSON_PREFETCH_WORKERS", "2"))
+
 # Logging configuration
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
\ No newline at end of file
@@ -1,20 +1,130 @@
 # src/cultural/problem_generator.py
 
 import random
-import json
-import os
 from datetime import datetime
 
+import numpy as np
+
+CONTEXTS = {
+    "rural": ["ගොවිපල", "කුඹුර", "වත්ත", "ගම්මානය"],
+    "urban": ["පාසල", "සාප්පුව", "බස් රථය", "කඩය"]
+}
+CONTEXT_TYPES = ("rural", "urban")
+
+# Share of problems set in a rural context
+RURAL_SHARE = 0.6
+
+# Question text per topic; {a} and {b} are the topic's two drawn numbers
+QUESTION_TEMPLATES = {
+    "addition": ("{context}ට පළමුව {a} ක් සහ පසුව {b} ක් එකතු විය. මුළු එකතුව කීයද?",),
+    "subtraction": ("{context}ේ මුලින් {a} ක් තිබුණි. පසුව {b} ක් ඉවත් කළ විට ඉතිරි වූයේ කීයද?",),
+    "multiplication": ("{context}ේ එක් පේළියක {a} බැගින් පේළි {b} ක් ඇත. මුළු ගණන කීයද?",),
+    "division": ("{context}ේ {a} ක් {b} දෙනෙකු අතර සමව බෙදිය යුතුය. එක් අයෙකුට කීයක් බැගින් හිමිවේද?",),
+    "probability": (
+        # Type 1: Simple probability with fruits/vegetables
+        "{context}ේ {a} ක් අතරින් {b} ක් ගෙඩි ඇත. අහඹු ලෙස එක් ගෙඩියක් තෝරා ගැනීමේ සම්භාවිතාව කීයද?",
+        # Type 2: Probability with students
+        "{context}ේ සිටින {a} දෙනා අතරින් {b} දෙනෙක් ශිෂ්‍යයන් වේ. අහඹු ලෙස කෙනෙකු තෝරා ගැනීමේදී ඔහු/ඇය ශිෂ්‍යයෙකු වීමේ සම්භාවිතාව කීයද?",
+        # Type 3: Weather-based probability
+        "පසුගිය {a} දිනයන් අතරින් {b} දිනයන්හි වැසි ලැබිණි. ඊළඟ දිනයේ වැසි ලැබීමේ සම්භාවිතාව කීයද?"
+    )
+}
+
+class ProblemBatch:
+    """Problems of one topic and difficulty held as NumPy columns
+
+    a and b are the two numbers in the question text (for division the
+    total and the divisor, for probability the total and target items).
+    Dicts and question strings are only built when asked for.
+    """
+
+    def __init__(self, topic, difficulty, context_types, contexts, a, b, answers, templates):
+        self.topic = topic
+        self.difficulty = difficulty
+        self.context_types = context_types  # 0 rural, 1 urban
+        self.contexts = contexts            # index into CONTEXTS[context type]
+        self.a = a
+        self.b = b
+        self.answers = answers              # None for probability: the answer is "b/a"
+        self.templates = templates          # index into QUESTION_TEMPLATES[topic]
+
+    def __len__(self):
+        return len(self.a)
+
+    def take(self, indices):
+        """A new batch holding only the given rows"""
+        return ProblemBatch(self.topic, self.difficulty, self.context_types[indices],
+                            self.contexts[indices], self.a[indices], self.b[indices],
+                            None if self.answers is None else self.answers[indices],
+                            self.templates[indices])
+
+    def context_type(self, i):
+        return CONTEXT_TYPES[self.context_types[i]]
+
+    def question(self, i):
+        context = CONTEXTS[self.context_type(i)][self.contexts[i]]
+        template = QUESTION_TEMPLATES[self.topic][self.templates[i]]
+        return template.format(context=context, a=int(self.a[i]), b=int(self.b[i]))
+
+    def context_names(self):
+        names = np.array([CONTEXTS[name] for name in CONTEXT_TYPES], dtype=object)
+        return names[self.context_types, self.contexts].tolist()
+
+    def questions(self):
+        templates = QUESTION_TEMPLATES[self.topic]
+        return [templates[t].format(context=context, a=a, b=b)
+                for t, context, a, b in zip(self.templates.tolist(), self.context_names(),
+                                            self.a.tolist(), self.b.tolist())]
+
+    def answer(self, i):
+        if self.answers is None:
+            return f"{int(self.b[i])}/{int(self.a[i])}"
+        return int(self.answers[i])
+
+    def problem(self, i):
+        """The i-th problem as generate_problem would return it"""
+        problem = {
+            "type": self.topic,
+            "difficulty": self.difficulty,
+            "question": self.question(i),
+            "answer": self.answer(i),
+            "context_type": self.context_type(i)
+        }
+        if self.topic == "probability":
+            problem["total_items"] = int(self.a[i])
+            problem["target_items"] = int(self.b[i])
+        return problem
+
+    def to_dicts(self):
+        questions = self.questions()
+        context_types = [CONTEXT_TYPES[code] for code in self.context_types.tolist()]
+        if self.answers is None:
+            answers = [f"{b}/{a}" for a, b in zip(self.a.tolist(), self.b.tolist())]
+        else:
+            answers = self.answers.tolist()
+        problems = [{
+            "type": self.topic,
+            "difficulty": self.difficulty,
+            "question": question,
+            "answer": answer,
+            "context_type": context_type
+        } for question, answer, context_type in zip(questions, answers, context_types)]
+        if self.topic == "probability":
+            for problem, total, target in zip(problems, self.a.tolist(), self.b.tolist()):
+                problem["total_items"] = total
+                problem["target_items"] = target
+        return problems
+
 class CulturalProblemGenerator:
     def __init__(self):
-        self.contexts = {
-            "rural": ["ගොවිපල", "කුඹුර", "වත්ත", "ගම්මානය"],
-            "urban": ["පාසල", "සාප්පුව", "බස් රථය", "කඩය"]
-        }
+        self.contexts = CONTEXTS
+        self._context_types = {context: context_type
+                               for context_type, contexts in CONTEXTS.items()
+                               for context in contexts}
         
     def generate_problem(self, topic, difficulty):
         """Generate a culturally relevant math problem"""
-        context_type = "rural" if random.random() < 0.6 else "urban"  # 60:40 ratio
+        context_type = "rural" if random.random() < RURAL_SHARE else "urban"  # 60:40 ratio
         context = random.choice(self.contexts[context_type])
         
         if topic == "addition":
@@ -29,6 +139,47 @@ class CulturalProblemGenerator:
             return self._generate_probability_problem(context, difficulty)
             
         return None
+    
+    def generate_batch(self, topic, difficulty, n, seed=None):
+        """
+        Generate n problems at once as a ProblemBatch
+        
+        Draws from the same distributions as generate_problem, in bulk with
+        a NumPy Generator; seed is an int, SeedSequence or Generator.
+        Returns None for an unknown topic.
+        """
+        if topic not in QUESTION_TEMPLATES:
+            return None
+        rng = np.random.default_rng(seed)
+        
+        context_types = (rng.random(n) >= RURAL_SHARE).astype(np.int8)
+        sizes = np.array([len(self.contexts[name]) for name in CONTEXT_TYPES])
+        contexts = (rng.random(n) * sizes[context_types]).astype(np.int8)
+        templates = np.zeros(n, dtype=np.int8)
+        
+        if topic == "addition":
+            a = rng.integers(1, difficulty * 10, n, endpoint=True)
+            b = rng.integers(1, difficulty * 10, n, endpoint=True)
+            answers = a + b
+        elif topic == "subtraction":
+            a = rng.integers(difficulty * 10, difficulty * 20, n, endpoint=True)
+            b = rng.integers(1, a, endpoint=True)
+            answers = a - b
+        elif topic == "multiplication":
+            a = rng.integers(1, difficulty * 5, n, endpoint=True)
+            b = rng.integers(1, difficulty * 5, n, endpoint=True)
+            answers = a * b
+        elif topic == "division":
+            b = rng.integers(2, difficulty * 2, n, endpoint=True)
+            answers = rng.integers(1, difficulty * 5, n, endpoint=True)
+            a = b * answers
+        else:  # probability
+            a = rng.integers(difficulty * 5, difficulty * 10, n, endpoint=True)
+            b = rng.integers(1, a, endpoint=True)
+            answers = None
+            templates = rng.integers(0, len(QUESTION_TEMPLATES[topic]), n).astype(np.int8)
+        
+        return ProblemBatch(topic, difficulty, context_types, contexts, a, b, answers, templates)
         
     def _generate_addition_problem(self, context, difficulty):
         """Generate addition problem with cultural context"""
@@ -36,14 +187,14 @@ class CulturalProblemGenerator:
         num1 = random.randint(1, difficulty * 10)
         num2 = random.randint(1, difficulty * 10)
         
-        question = f"{context}ට පළමුව {num1} ක් සහ පසුව {num2} ක් එකතු විය. මුළු එකතුව කීයද?"
+        question = QUESTION_TEMPLATES["addition"][0].format(context=context, a=num1, b=num2)
         
         return {
             "type": "addition",
             "difficulty": difficulty,
             "question": question,
             "answer": num1 + num2,
-            "context_type": "rural" if context in self.contexts["rural"] else "urban"
+            "context_type": self._context_types[context]
         }
         
     def _generate_subtraction_problem(self, context, difficulty):
@@ -51,14 +202,14 @@ class CulturalProblemGenerator:
         total = random.randint(difficulty * 10, difficulty * 20)
         subtract = random.randint(1, total)
         
-        question = f"{context}ේ මුලින් {total} ක් තිබුණි. පසුව {subtract} ක් ඉවත් කළ විට ඉතිරි වූයේ කීයද?"
+        question = QUESTION_TEMPLATES["subtraction"][0].format(context=context, a=total, b=subtract)
         
         return {
             "type": "subtraction",
             "difficulty": difficulty,
             "question": question,
             "answer": total - subtract,
-            "context_type": "rural" if context in self.contexts["rural"] else "urban"
+            "context_type": self._context_types[context]
         }
     
     def _generate_multiplication_problem(self, context, difficulty):
@@ -67,14 +218,14 @@ class CulturalProblemGenerator:
         num1 = random.randint(1, difficulty * 5)
         num2 = random.randint(1, difficulty * 5)
         
-        question = f"{context}ේ එක් පේළියක {num1} බැගින් පේළි {num2} ක් ඇත. මුළු ගණන කීයද?"
+        question = QUESTION_TEMPLATES["multiplication"][0].format(context=context, a=num1, b=num2)
         
         return {
             "type": "multiplication",
             "difficulty": difficulty,
             "question": question,
             "answer": num1 * num2,
-            "context_type": "rural" if context in self.contexts["rural"] else "urban"
+            "context_type": self._context_types[context]
         }
     
     def _generate_division_problem(self, context, difficulty):
@@ -84,14 +235,14 @@ class CulturalProblemGenerator:
         quotient = random.randint(1, difficulty * 5)
         total = divisor * quotient
         
-        question = f"{context}ේ {total} ක් {divisor} දෙනෙකු අතර සමව බෙදිය යුතුය. එක් අයෙකුට කීයක් බැගින් හිමිවේද?"
+        question = QUESTION_TEMPLATES["division"][0].format(context=context, a=total, b=divisor)
         
         return {
             "type": "division",
             "difficulty": difficulty,
             "question": question,
             "answer": quotient,
-            "context_type": "rural" if context in self.contexts["rural"] else "urban"
+            "context_type": self._context_types[context]
         }
     
     def _generate_probability_problem(self, context, difficulty):
@@ -100,20 +251,9 @@ class CulturalProblemGenerator:
         total_items = random.randint(difficulty * 5, difficulty * 10)
         target_items = random.randint(1, total_items)
         
-        # Create culturally relevant probability questions
-        question_types = [
-            # Type 1: Simple probability with fruits/vegetables
-            lambda: f"{context}ේ {total_items} ක් අතරින් {target_items} ක් ගෙඩි ඇත. අහඹු ලෙස එක් ගෙඩියක් තෝරා ගැනීමේ සම්භාවිතාව කීයද?",
-            
-            # Type 2: Probability with students
-            lambda: f"{context}ේ සිටින {total_items} දෙනා අතරින් {target_items} දෙනෙක් ශිෂ්‍යයන් වේ. අහඹු ලෙස කෙනෙකු තෝරා ගැනීමේදී ඔහු/ඇය ශිෂ්‍යයෙකු වීමේ සම්භාවිතාව කීයද?",
-            
-            # Type 3: Weather-based probability
-            lambda: f"පසුගිය {total_items} දිනයන් අතරින් {target_items} දිනයන්හි වැසි ලැබිණි. ඊළඟ දිනයේ වැසි ලැබීමේ සම්භාවිතාව කීයද?"
-        ]
-        
         # Select random question type
-        question = random.choice(question_types)()
+        question = random.choice(QUESTION_TEMPLATES["probability"]).format(
+            context=context, a=total_items, b=target_items)
         
         # Calculate probability as a fraction
         answer = f"{target_items}/{total_items}"
@@ -123,46 +263,7 @@ class CulturalProblemGenerator:
             "difficulty": difficulty,
             "question": question,
             "answer": answer,
-            "context_type": "rural" if context in self.contexts["rural"] else "urban",
+            "context_type": self._context_types[context],
             "total_items": total_items,
             "target_items": target_items
         }
-
-def generate_training_dataset(num_problems=1000):
-    """Generate training dataset for math problems"""
-    
-    # Initialize problem generator
-    problem_generator = CulturalProblemGenerator()
-    
-    # Topics and difficulties to generate problems for
-    topics = ["addition", "subtraction", "multiplication", "division"]
-    difficulties = range(1, 11)  # 1-10 difficulty levels
-    
-    # Generate problems
-    problems = []
-    for topic in topics:
-        for difficulty in difficulties:
-            # Generate multiple problems per difficulty level
-            for _ in range(num_problems // (len(topics) * len(difficulties))):
-                problem = problem_generator.generate_problem(topic, difficulty)
-                if problem:
-                    problems.append({
-                        "text": problem["question"],
-                        "answer": str(problem["answer"]),
-                        "type": problem["type"],
-                        "difficulty": problem["difficulty"],
-                        "context_type": problem["context_type"]
-                    })
-    
-    # Ensure output directory exists
-    os.makedirs("data/processed", exist_ok=True)
-    
-    # Save to JSON file
-    output_file = "data/processed/math_problems.json"
-    with open(output_file, "w", encoding="utf-8") as f:
-        json.dump({"problems": problems}, f, ensure_ascii=False, indent=2)
-    
-    print(f"Generated {len(problems)} problems and saved to {output_file}")
-
-if __name__ == "__main__":
-    generate_training_dataset()
\ No newline at end of file
@@ -0,0 +1,90 @@
+# src/data/arrow_shards.py
+
+import glob
+import os
+
+import pyarrow as pa
+
+# Columns of every generated training shard
+SCHEMA = pa.schema([
+    ("question", pa.string()),
+    ("answer", pa.string()),
+    ("type", pa.string()),
+    ("difficulty", pa.int8()),
+    ("context_type", pa.string()),
+    ("solution", pa.string())
+])
+
+# Rows buffered before a record batch is written out
+ROWS_PER_BATCH = 10000
+
+
+class ShardWriter:
+    """Write problems to an Arrow IPC stream file a record batch at a time
+
+    Memory stays at one batch however many rows are written. The stream
+    format is what datasets.Dataset.from_file memory-maps, so training can
+    open shards without parsing them. The file only appears under its
+    final name once closed.
+    """
+
+    def __init__(self, path, rows_per_batch=ROWS_PER_BATCH):
+        self.path = path
+        self.rows_per_batch = rows_per_batch
+        self.rows = 0
+        self._temp_path = f"{path}.tmp"
+        self._sink = pa.OSFile(self._temp_path, 'wb')
+        self._writer = pa.ipc.new_stream(self._sink, SCHEMA)
+        self._buffer = {name: [] for name in SCHEMA.names}
+
+    def write(self, problems, solutions=None):
+        """Append problem dicts; solutions defaults to each problem's "solution" """
+        for i, problem in enumerate(problems):
+            self._buffer["question"].append(problem["question"])
+            self._buffer["answer"].append(str(problem["answer"]))
+            self._buffer["type"].append(problem["type"])
+            self._buffer["difficulty"].append(problem["difficulty"])
+            self._buffer["context_type"].append(problem["context_type"])
+            self._buffer["solution"].append(
+                solutions[i] if solutions is not None else problem.get("solution", ""))
+            if len(self._buffer["question"]) >= self.rows_per_batch:
+                self._flush()
+
+    def _flush(self):
+        if not self._buffer["question"]:
+            return
+        batch = pa.RecordBatch.from_pydict(self._buffer, schema=SCHEMA)
+        self._writer.write_batch(batch)
+        self.rows += batch.num_rows
+        self._buffer = {name: [] for name in SCHEMA.names}
+
+    def close(self):
+        self._flush()
+        self._writer.close()
+        self._sink.close()
+        os.replace(self._temp_path, self.path)
+
+    def abort(self):
+        self._writer.close()
+        self._sink.close()
+        os.remove(self._temp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def shard_paths(directory):
+    """Arrow shards in a directory, in shard order"""
+    return sorted(glob.glob(os.path.join(directory, "*.arrow")))
+
+
+def read_shard(path):
+    """A shard as a pyarrow Table backed by a memory map"""
+    # The table's buffers keep the mapping open after this returns
+    return pa.ipc.open_stream(pa.memory_map(path, 'r')).read_all()
@@ -0,0 +1,280 @@
+# src/data/build_dataset.py
+
+import argparse
+import hashlib
+import json
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from .arrow_shards import ShardWriter, shard_paths
+from .dedup import MAX_STALE_ROUNDS, Deduplicator
+from .math_problem_generator import TrainingDataGenerator
+
+MANIFEST_NAME = "manifest.json"
+
+# Problems generated at a time inside a shard, bounding a worker's memory
+CHUNK_SIZE = 10000
+
+# Most problems drawn in one round of a partitioned random shard; keeps a
+# build with many shards from drawing shard count x CHUNK_SIZE at once
+MAX_ROUND_DRAW = 1 << 20
+
+# Settings that must match for a resumed build to reuse finished shards
+BUILD_SETTINGS = ("seed", "num_examples", "shard_size", "format", "unique_per_cell", "dedup")
+
+# How random builds keep problems distinct: each shard only takes the problems
+# in its own key partition, so no two shards can share one
+DEDUP_MODE = "partitioned"
+
+
+def shard_seeds(seed, num_shards):
+    """One independent SeedSequence per shard, all derived from the master seed
+
+    Shard i always gets the same child, so a shard's contents depend only on
+    the master seed and its index, not on the worker count or build order.
+    """
+    return np.random.SeedSequence(seed).spawn(num_shards)
+
+
+def shard_sizes(num_examples, shard_size):
+    full, rest = divmod(num_examples, shard_size)
+    return [shard_size] * full + ([rest] if rest else [])
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _write_atomic(path, text):
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+
+def random_chunks(generator, size, rng, dedup, partitions=1):
+    """
+    Lists of distinct random problems, at most CHUNK_SIZE each, until size are kept
+    
+    With dedup partitioned over `partitions` shards, only about one drawn
+    problem in `partitions` is this shard's, so that many more are drawn.
+    Drawing is cheap next to formatting, which only kept problems get.
+    Duplicates and other shards' problems are topped up with fresh draws;
+    stops short of size once MAX_STALE_ROUNDS draws in a row add nothing.
+    """
+    kept = 0
+    stale = 0
+    while kept < size and stale < MAX_STALE_ROUNDS:
+        needed = min(size - kept, CHUNK_SIZE)
+        draw = min(needed * partitions, max(needed, MAX_ROUND_DRAW))
+        problems = generator.generate_problems(draw, rng, dedup=dedup)[:needed]
+        if not problems:
+            stale += 1
+            continue
+        stale = 0
+        kept += len(problems)
+        yield problems
+
+
+def build_shard(output_dir, index, size, seed_sequence, output_format, cell=None, partitions=1):
+    """
+    Generate one shard into its own file, chunk by chunk; returns its manifest entry
+    
+    A random shard holds size distinct problems, none of which any other
+    of the `partitions` shards of the build can hold. With a (topic,
+    difficulty) cell the shard holds up to size distinct problems of that
+    cell only, fewer if the cell has fewer.
+    """
+    generator = TrainingDataGenerator()
+    rng = np.random.default_rng(seed_sequence)
+    counts = Counter()
+    if cell is None:
+        dedup = Deduplicator(partition=(index, partitions) if partitions > 1 else None)
+        chunks = random_chunks(generator, size, rng, dedup, partitions)
+    else:
+        dedup = Deduplicator()
+        chunks = (batch.to_dicts() for batch in dedup.fill(
+            generator.problem_generator, cell[0], cell[1], size, rng))
+
+    if output_format == "arrow":
+        file_name = f"shard-{index:05d}.arrow"
+        path = os.path.join(output_dir, file_name)
+        with ShardWriter(path) as writer:
+            for problems in chunks:
+                writer.write(problems, [generator._generate_solution_steps(problem)
+                                        for problem in problems])
+                counts.update(problem["type"] for problem in problems)
+    else:
+        file_name = f"shard-{index:05d}.jsonl"
+        path = os.path.join(output_dir, file_name)
+        with open(f"{path}.tmp", 'w', encoding='utf-8') as f:
+            for problems in chunks:
+                for problem in problems:
+                    example = problem if output_format == "problems" else \
+                        generator._format_for_training(problem)
+                    f.write(json.dumps(example, ensure_ascii=False) + '\n')
+                counts.update(problem["type"] for problem in problems)
+        os.replace(f"{path}.tmp", path)
+
+    entry = {
+        "index": index,
+        "file": file_name,
+        "examples": sum(counts.values()),
+        "counts": dict(sorted(counts.items())),
+        "requested": size,
+        "duplicates": dedup.duplicates,
+        "sha256": file_sha256(path)
+    }
+    if cell is not None:
+        entry["cell"] = list(cell)
+    return entry
+
+
+def load_manifest(output_dir):
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def training_shard_paths(data_dir):
+    """
+    The Arrow shards training reads from data_dir
+    
+    Raises FileNotFoundError when the directory holds no dataset at all,
+    and ValueError naming what to rebuild when a build left a manifest but
+    no Arrow shards (a JSONL build, or one interrupted before any shard).
+    """
+    paths = shard_paths(data_dir)
+    if paths:
+        return paths
+    manifest = load_manifest(data_dir)
+    if manifest is None:
+        raise FileNotFoundError(data_dir)
+    build = f"python -m src.data.build_dataset --output-dir {data_dir}"
+    output_format = manifest.get("format", "arrow")
+    if output_format != "arrow":
+        raise ValueError(f"{data_dir} holds a '{output_format}' JSONL build ({MANIFEST_NAME}), "
+                         f"not Arrow shards; rebuild it with '{build} --format arrow'")
+    raise ValueError(f"{data_dir} holds an Arrow build with no finished shards; "
+                     f"complete it with '{build} --resume' and the same settings")
+
+
+def _completed(output_dir, manifest):
+    """Shards in the manifest whose file is still there and unchanged"""
+    done = {}
+    for entry in manifest.get("shards", []):
+        path = os.path.join(output_dir, entry["file"])
+        if os.path.exists(path) and file_sha256(path) == entry["sha256"]:
+            done[entry["index"]] = entry
+    return done
+
+
+def build_dataset(output_dir, num_examples, shard_size=50000, seed=0, workers=None,
+                  output_format="arrow", resume=False, unique_per_cell=None):
+    """
+    Generate num_examples across shards on a process pool
+
+    Writes shard-NNNNN files (Arrow shards read by src/model/train.py, or
+    JSONL) and a manifest.json recording the settings and
+    each finished shard's example count, per-topic counts and sha256. The
+    manifest is rewritten as shards finish, so with resume=True an
+    interrupted build only generates the shards still missing.
+    
+    Random shards hold distinct problems: each takes only the problems in
+    its own key partition and tops up what it drops, so the build has
+    num_examples problems unless the problem space runs out first.
+    
+    unique_per_cell: instead of num_examples drawn at random, build one
+    shard per (topic, difficulty) cell holding up to this many distinct
+    problems. Duplicates are then impossible across the whole dataset,
+    since no two shards share a cell.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    settings = {"seed": seed, "num_examples": num_examples, "shard_size": shard_size,
+                "format": output_format, "unique_per_cell": unique_per_cell,
+                "dedup": None if unique_per_cell else DEDUP_MODE}
+
+    done = {}
+    previous = load_manifest(output_dir)
+    if resume and previous is not None:
+        changed = [name for name in BUILD_SETTINGS if previous.get(name) != settings[name]]
+        if changed:
+            raise ValueError(f"Cannot resume: {', '.join(changed)} differ from {MANIFEST_NAME}")
+        done = _completed(output_dir, previous)
+
+    if unique_per_cell:
+        generator = TrainingDataGenerator()
+        cells = [(topic, difficulty) for topic in generator.topics
+                 for difficulty in generator.difficulty_levels]
+        sizes = [unique_per_cell] * len(cells)
+    else:
+        cells = None
+        sizes = shard_sizes(num_examples, shard_size)
+    seeds = shard_seeds(seed, len(sizes))
+    manifest = dict(settings, shards=sorted(done.values(), key=lambda entry: entry["index"]))
+
+    def save_manifest():
+        manifest["shards"].sort(key=lambda entry: entry["index"])
+        manifest["complete"] = len(manifest["shards"]) == len(sizes)
+        _write_atomic(os.path.join(output_dir, MANIFEST_NAME),
+                      json.dumps(manifest, ensure_ascii=False, indent=2))
+
+    pending = [index for index in range(len(sizes)) if index not in done]
+    save_manifest()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(build_shard, output_dir, index, sizes[index], seeds[index],
+                                   output_format, cells[index] if cells else None, len(sizes))
+                   for index in pending]
+        for future in as_completed(futures):
+            manifest["shards"].append(future.result())
+            save_manifest()
+            print(f"Shard {len(manifest['shards'])}/{len(sizes)} done")
+
+    return {
+        "shards": len(sizes),
+        "built": len(pending),
+        "skipped": len(done),
+        "examples": sum(entry["examples"] for entry in manifest["shards"])
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a sharded training dataset in parallel")
+    parser.add_argument("--output-dir", default="data/processed/math_problems")
+    parser.add_argument("--examples", type=int, default=50000,
+                        help="distinct problems drawn at random, split across shards")
+    parser.add_argument("--shard-size", type=int, default=50000)
+    parser.add_argument("--seed", type=int, default=0, help="master seed; same seed, same dataset")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--format", choices=["arrow", "instructions", "problems"], default="arrow",
+                        help="Arrow shards for training, instruction/input/output JSONL, "
+                             "or raw problem dicts as JSONL")
+    parser.add_argument("--resume", action="store_true", help="skip shards already built")
+    parser.add_argument("--unique-per-cell", type=int,
+                        help="build this many distinct problems per topic and difficulty "
+                             "instead of --examples random ones; no duplicates anywhere")
+    args = parser.parse_args()
+
+    try:
+        result = build_dataset(args.output_dir, args.examples, args.shard_size, args.seed,
+                               args.workers, args.format, args.resume, args.unique_per_cell)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return
+    print(f"{result['examples']} examples in {result['shards']} shards: "
+          f"{result['built']} built, {result['skipped']} reused")
+
+
+if __name__ == "__main__":
+    main()
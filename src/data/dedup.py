@@ -0,0 +1,270 @@
+# src/data/dedup.py
+
+import argparse
+import hashlib
+from collections import Counter
+
+import numpy as np
+
+from ..cultural.problem_generator import CONTEXT_TYPES, CONTEXTS, QUESTION_TEMPLATES
+
+TOPIC_CODES = {topic: code for code, topic in enumerate(QUESTION_TEMPLATES)}
+
+# Bits per field of a problem key, most significant first; 61 in all
+KEY_FIELDS = (
+    ("topic", 4),
+    ("difficulty", 4),
+    ("context_type", 1),
+    ("context", 2),
+    ("template", 2),
+    ("a", 24),
+    ("b", 24),
+)
+KEY_BITS = dict(KEY_FIELDS)
+KEY_SHIFTS = {name: sum(bits for _, bits in KEY_FIELDS[i + 1:])
+              for i, (name, _) in enumerate(KEY_FIELDS)}
+
+# Fields whose range is fixed by the generator's tables must fit now, not per batch
+for _name, _count in (("topic", len(TOPIC_CODES)),
+                      ("context_type", len(CONTEXT_TYPES)),
+                      ("context", max(len(names) for names in CONTEXTS.values())),
+                      ("template", max(len(t) for t in QUESTION_TEMPLATES.values()))):
+    if _count > 1 << KEY_BITS[_name]:
+        raise ValueError(f"{_count} values of {_name} do not fit in {KEY_BITS[_name]} key bits")
+
+# Per topic, which templates mention the context; for the others the drawn
+# context does not change the text and is left out of the key
+USES_CONTEXT = {topic: np.array(["{context}" in template for template in templates])
+                for topic, templates in QUESTION_TEMPLATES.items()}
+
+# Recently added keys are merged into the main sorted array once they
+# outnumber this, or an eighth of the main array
+MERGE_MIN = 4096
+
+# Fresh batches drawn for a cell with no new problem before it counts as exhausted
+MAX_STALE_ROUNDS = 3
+
+# Largest batch drawn at a time while filling a cell
+MAX_DRAW = 65536
+
+
+def batch_keys(batch):
+    """One uint64 per problem in a ProblemBatch, equal exactly when the problems are
+
+    Packs topic, difficulty (part of the training text), context type and
+    context, question template and the two numbers into the KEY_FIELDS
+    bits, so keys never collide. Raises ValueError for a difficulty or
+    number too large for its field.
+    """
+    _check_width("difficulty", batch.difficulty, batch.difficulty)
+    if len(batch):
+        for name, values in (("a", batch.a), ("b", batch.b)):
+            _check_width(name, int(values.min()), int(values.max()))
+
+    def field(name, values):
+        return values << np.uint64(KEY_SHIFTS[name])
+
+    uses_context = USES_CONTEXT[batch.topic][batch.templates].astype(np.uint64)
+    keys = field("topic", np.full(len(batch), TOPIC_CODES[batch.topic], dtype=np.uint64))
+    keys |= field("difficulty", np.uint64(batch.difficulty))
+    keys |= field("context_type", batch.context_types.astype(np.uint64) * uses_context)
+    keys |= field("context", batch.contexts.astype(np.uint64) * uses_context)
+    keys |= field("template", batch.templates.astype(np.uint64))
+    keys |= field("a", batch.a.astype(np.uint64))
+    keys |= field("b", batch.b.astype(np.uint64))
+    return keys
+
+
+def _check_width(name, low, high):
+    if low < 0 or high >= 1 << KEY_BITS[name]:
+        raise ValueError(f"{name} outside 0..{(1 << KEY_BITS[name]) - 1} cannot be keyed")
+
+
+def key_partition(keys, count):
+    """Which of count partitions each key falls in, spread by a splitmix64 mix of the key
+
+    Keys pack their fields in order, so they are mixed first or the
+    partitions would split on the second number alone.
+    """
+    z = np.asarray(keys, dtype=np.uint64).copy()
+    z ^= z >> np.uint64(30)
+    z *= np.uint64(0xbf58476d1ce4e5b9)
+    z ^= z >> np.uint64(27)
+    z *= np.uint64(0x94d049bb133111eb)
+    z ^= z >> np.uint64(31)
+    return z % np.uint64(count)
+
+
+def text_key(topic, difficulty, question):
+    """8-byte blake2b key of a problem's normalized text, for rows without operands"""
+    normalized = f"{topic}\x1f{difficulty}\x1f{' '.join(str(question).split())}"
+    return int.from_bytes(hashlib.blake2b(normalized.encode('utf-8'), digest_size=8).digest(),
+                          'little')
+
+
+def is_validation(key, fraction):
+    """Deterministic split by key: a problem always lands on the same side"""
+    return key % 10000 < fraction * 10000
+
+
+def _first_occurrences(keys):
+    """Sorted distinct keys and the index of each one's first occurrence
+
+    Sort-based; np.unique is several times slower on uint64 here.
+    """
+    order = np.argsort(keys, kind='stable')
+    ordered = keys[order]
+    first = np.ones(len(keys), dtype=bool)
+    first[1:] = ordered[1:] != ordered[:-1]
+    return ordered[first], order[first]
+
+
+def _merge(a, b):
+    """Union of two sorted key arrays; the stable sort merges the two runs in linear time"""
+    merged = np.sort(np.concatenate([a, b]), kind='stable')
+    distinct = np.ones(len(merged), dtype=bool)
+    distinct[1:] = merged[1:] != merged[:-1]
+    return merged[distinct]
+
+
+def _member(sorted_keys, keys):
+    if len(sorted_keys) == 0:
+        return np.zeros(len(keys), dtype=bool)
+    positions = np.searchsorted(sorted_keys, keys)
+    positions[positions == len(sorted_keys)] = 0
+    return sorted_keys[positions] == keys
+
+
+class KeySet:
+    """Set of uint64 keys at 8 bytes each, queried a whole array at a time
+
+    Keys live in a sorted NumPy array; new keys collect in a small sorted
+    array that is merged in once it grows, so adding n keys costs
+    O(n log n) amortized instead of re-sorting everything per batch.
+    """
+
+    def __init__(self):
+        self._sorted = np.empty(0, dtype=np.uint64)
+        self._recent = np.empty(0, dtype=np.uint64)
+
+    def __len__(self):
+        return len(self._sorted) + len(self._recent)
+
+    def nbytes(self):
+        return self._sorted.nbytes + self._recent.nbytes
+
+    def contains(self, keys):
+        """Membership mask; much faster when keys are sorted"""
+        keys = np.asarray(keys, dtype=np.uint64)
+        return _member(self._sorted, keys) | _member(self._recent, keys)
+
+    def add(self, keys):
+        self._recent = _merge(self._recent, np.asarray(keys, dtype=np.uint64))
+        if len(self._recent) > max(MERGE_MIN, len(self._sorted) // 8):
+            self._sorted = _merge(self._sorted, self._recent)
+            self._recent = np.empty(0, dtype=np.uint64)
+
+
+class Deduplicator:
+    """Streaming filter that passes each distinct problem once
+
+    target_per_cell caps the problems kept per (topic, difficulty) cell.
+    partition=(index, count) passes only the problems in key partition
+    index of count, so filters with different indexes never pass the same
+    problem; each can run in its own process with no shared state.
+    """
+
+    def __init__(self, target_per_cell=None, partition=None):
+        self.target_per_cell = target_per_cell
+        self.partition = partition
+        self.keys = KeySet()
+        self.counts = Counter()
+        self.seen = 0
+        self.duplicates = 0
+
+    def remaining(self, topic, difficulty):
+        if self.target_per_cell is None:
+            return None
+        return max(0, self.target_per_cell - self.counts[(topic, difficulty)])
+
+    def filter(self, batch, limit=None):
+        """The batch's problems not seen before, at most limit and the cell's remaining target"""
+        keys = batch_keys(batch)
+        if self.partition is not None:
+            index, count = self.partition
+            mine = np.flatnonzero(key_partition(keys, count) == np.uint64(index))
+            batch, keys = batch.take(mine), keys[mine]
+        unique, first = _first_occurrences(keys)
+        # Rows holding the first copy of each new problem, in batch order
+        rows = np.sort(first[~self.keys.contains(unique)])
+        self.seen += len(batch)
+        self.duplicates += len(batch) - len(rows)
+
+        remaining = self.remaining(batch.topic, batch.difficulty)
+        for cap in (remaining, limit):
+            if cap is not None:
+                rows = rows[:cap]
+        self.keys.add(keys[rows])
+        self.counts[(batch.topic, batch.difficulty)] += len(rows)
+        return batch.take(rows)
+
+    def fill(self, problem_generator, topic, difficulty, count, rng):
+        """
+        Yield batches of distinct problems for one cell until count are kept
+
+        Stops early, short of count, when MAX_STALE_ROUNDS fresh batches in a
+        row add nothing new: the cell has fewer distinct problems than asked.
+        """
+        kept = 0
+        stale = 0
+        while kept < count and stale < MAX_STALE_ROUNDS:
+            needed = count - kept
+            batch = self.filter(problem_generator.generate_batch(
+                topic, difficulty, min(MAX_DRAW, max(256, needed * 2)), rng), limit=needed)
+            if len(batch) == 0:
+                stale += 1
+                continue
+            stale = 0
+            kept += len(batch)
+            yield batch
+
+    def stats(self):
+        return {
+            "seen": self.seen,
+            "kept": sum(self.counts.values()),
+            "duplicates": self.duplicates,
+            "keys": len(self.keys),
+            "key_bytes": self.keys.nbytes()
+        }
+
+
+def main():
+    """Report duplicates within, and overlap between, Arrow shard directories"""
+    from .arrow_shards import read_shard, shard_paths
+
+    parser = argparse.ArgumentParser(description="Count duplicate problems in Arrow shards")
+    parser.add_argument("data_dir")
+    parser.add_argument("--against", help="another shard directory, e.g. a validation set")
+    args = parser.parse_args()
+
+    def directory_keys(directory):
+        keys = []
+        for path in shard_paths(directory):
+            table = read_shard(path)
+            keys.extend(text_key(topic, difficulty, question) for topic, difficulty, question in zip(
+                table.column("type").to_pylist(), table.column("difficulty").to_pylist(),
+                table.column("question").to_pylist()))
+        return np.array(keys, dtype=np.uint64)
+
+    keys = directory_keys(args.data_dir)
+    unique = _first_occurrences(keys)[0]
+    print(f"{len(keys)} problems, {len(unique)} distinct, "
+          f"{len(keys) - len(unique)} duplicates ({1 - len(unique) / max(1, len(keys)):.1%})")
+    if args.against:
+        other = _first_occurrences(directory_keys(args.against))[0]
+        shared = int(_member(other, unique).sum())
+        print(f"{shared} distinct problems also appear in {args.against}")
+
+
+if __name__ == "__main__":
+    main()
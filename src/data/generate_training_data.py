@@ -1,34 +1,68 @@
+import argparse
 import os
-import json
+
+import numpy as np
+
 from ..cultural.problem_generator import CulturalProblemGenerator
+from .arrow_shards import ShardWriter, shard_paths
+from .build_dataset import MANIFEST_NAME
+from .math_problem_generator import TrainingDataGenerator
 
-def generate_training_dataset(num_problems=1000):
-    """Generate training dataset for math problems"""
+DATASET_DIR = "data/processed/math_problems"
+
+def generate_training_dataset(num_problems=1000, seed=None, output_dir=DATASET_DIR,
+                              overwrite=False):
+    """
+    Generate a small training dataset for math problems as one Arrow shard
+    
+    output_dir defaults to the directory src/data/build_dataset.py writes
+    to. A dataset already there (shards or a build manifest) is only
+    replaced with overwrite=True.
+    """
     
     # Initialize problem generator
     generator = CulturalProblemGenerator()
+    solver = TrainingDataGenerator()
+    rng = np.random.default_rng(seed)
     
-    # Generate problems
-    problems = []
     topics = ["addition", "subtraction", "multiplication", "division"]
     difficulties = range(1, 11)
     
-    for topic in topics:
-        for difficulty in difficulties:
-            for _ in range(num_problems // (len(topics) * len(difficulties))):
-                problem = generator.generate_problem(topic, difficulty)
-                if problem:
-                    problems.append(problem)
+    # Replace whatever dataset was in the directory before, if allowed
+    os.makedirs(output_dir, exist_ok=True)
+    existing = [path for path in shard_paths(output_dir) + [os.path.join(output_dir, MANIFEST_NAME)]
+                if os.path.exists(path)]
+    if existing and not overwrite:
+        raise ValueError(f"{output_dir} already holds a dataset; pass overwrite=True to replace it")
+    for path in existing:
+        os.remove(path)
     
-    # Ensure output directory exists
-    os.makedirs("data/processed", exist_ok=True)
+    # Stream each topic and difficulty batch into one Arrow shard
+    output_file = os.path.join(output_dir, "shard-00000.arrow")
+    with ShardWriter(output_file) as writer:
+        for topic in topics:
+            for difficulty in difficulties:
+                batch = generator.generate_batch(
+                    topic, difficulty, num_problems // (len(topics) * len(difficulties)), rng)
+                problems = batch.to_dicts()
+                writer.write(problems, [solver._generate_solution_steps(problem)
+                                        for problem in problems])
     
-    # Save to JSON file
-    output_file = "data/processed/math_problems.json"
-    with open(output_file, "w", encoding="utf-8") as f:
-        json.dump({"problems": problems}, f, ensure_ascii=False, indent=2)
-    
-    print(f"Generated {len(problems)} problems and saved to {output_file}")
+    print(f"Generated {writer.rows} problems and saved to {output_file}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a small Arrow training dataset")
+    parser.add_argument("--output-dir", default=DATASET_DIR)
+    parser.add_argument("--problems", type=int, default=1000)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--overwrite", action="store_true",
+                        help="replace the shards and manifest already in --output-dir")
+    args = parser.parse_args()
+
+    try:
+        generate_training_dataset(args.problems, args.seed, args.output_dir, args.overwrite)
+    except ValueError as e:
+        print(f"Error: {e}")
 
 if __name__ == "__main__":
-    generate_training_dataset() 
\ No newline at end of file
+    main()
@@ -1,5 +1,4 @@
-import json
-import random
+import numpy as np
 from tqdm import tqdm
 from ..cultural.problem_generator import CulturalProblemGenerator
 
@@ -9,23 +8,46 @@ class TrainingDataGenerator:
         self.topics = ["addition", "subtraction", "multiplication", "division", "probability"]
         self.difficulty_levels = range(1, 11)  # 1-10 difficulty levels
         
-    def generate_training_data(self, num_problems=50000):
-        """Generate training data for Llama 3 fine-tuning"""
-        training_data = []
+    def generate_training_data(self, num_problems=50000, seed=None, chunk_size=10000):
+        """
+        Yield training examples for Llama 3 fine-tuning
         
-        for _ in tqdm(range(num_problems)):
-            # Randomly select topic and difficulty
-            topic = random.choice(self.topics)
-            difficulty = random.choice(self.difficulty_levels)
-            
-            # Generate problem
-            problem = self.problem_generator.generate_problem(topic, difficulty)
-            
-            # Format for training
-            training_example = self._format_for_training(problem)
-            training_data.append(training_example)
+        Problems are generated chunk_size at a time, so memory stays flat
+        however many are asked for. To write them out, use
+        src/data/build_dataset.py, which streams them into Arrow shards.
+        """
+        rng = np.random.default_rng(seed)
+        with tqdm(total=num_problems) as progress:
+            for start in range(0, num_problems, chunk_size):
+                problems = self.generate_problems(min(chunk_size, num_problems - start), rng)
+                for problem in problems:
+                    yield self._format_for_training(problem)
+                progress.update(len(problems))
+    
+    def generate_problems(self, num_problems, seed=None, dedup=None):
+        """
+        Problems with a uniformly drawn topic and difficulty each, in random order
+        
+        dedup: optional src.data.dedup.Deduplicator; problems it has already
+        passed are dropped, so fewer than num_problems may come back.
+        """
+        rng = np.random.default_rng(seed)
+        
+        # Draw how many problems each cell gets, generate every cell as one
+        # batch, then shuffle
+        cells = [(topic, difficulty) for topic in self.topics for difficulty in self.difficulty_levels]
+        counts = rng.multinomial(num_problems, [1 / len(cells)] * len(cells))
         
-        return training_data
+        problems = []
+        for (topic, difficulty), count in zip(cells, counts):
+            if count:
+                batch = self.problem_generator.generate_batch(topic, difficulty, int(count), rng)
+                if dedup is not None:
+                    batch = dedup.filter(batch)
+                problems.extend(batch.to_dicts())
+        order = rng.permutation(len(problems))
+        
+        return [problems[i] for i in order]
     
     def _format_for_training(self, problem):
         """Format problem for Llama 3 training"""
@@ -67,20 +89,3 @@ class TrainingDataGenerator:
         """Extract numbers from problem text"""
         import re
         return [int(num) for num in re.findall(r'\d+', text)]
-
-def main():
-    # Initialize generator
-    generator = TrainingDataGenerator()
-    
-    # Generate training data
-    training_data = generator.generate_training_data(num_problems=50000)
-    
-    # Save to JSON file
-    output_file = "data/training/math_problems_sinhala.json"
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(training_data, f, ensure_ascii=False, indent=2)
-    
-    print(f"Generated {len(training_data)} training examples")
-
-if __name__ == "__main__":
-    main() 
\ No newline at end of file
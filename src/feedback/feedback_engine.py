@@ -5,6 +5,15 @@ import json
 import os
 import datetime
 
+from ..learning.history_columns import PERIOD_DAYS
+
+# Suggested next steps after an incorrect answer
+NEXT_STEPS = [
+    "ගැටලුව නැවත කියවන්න.",
+    "පියවරෙන් පියවර විසඳුම සඳහා උත්සාහ කරන්න.",
+    "සමාන ගැටලු සඳහා උදාහරණ බලන්න."
+]
+
 class FeedbackEngine:
     def __init__(self, speech_engine, language='si'):
         self.speech_engine = speech_engine
@@ -150,11 +159,7 @@ class FeedbackEngine:
                     feedback_data["feedback_text"] += " " + encouragement
             
             # Suggest next steps
-            feedback_data["next_steps"] = [
-                "ගැටලුව නැවත කියවන්න.",
-                "පියවරෙන් පියවර විසඳුම සඳහා උත්සාහ කරන්න.",
-                "සමාන ගැටලු සඳහා උදාහරණ බලන්න."
-            ]
+            feedback_data["next_steps"] = list(NEXT_STEPS)
         
         return feedback_data
     
@@ -171,6 +176,33 @@ class FeedbackEngine:
         
         return True
     
+    def static_phrases(self):
+        """Return every fixed sentence the engine can speak
+        
+        Templates with placeholders are filled at runtime and skipped.
+        Combinations that deliver_feedback joins into one utterance are
+        included since they are spoken as a single clip.
+        """
+        def is_static(text):
+            return "{" not in text
+        
+        correct = [t for t in self.feedback_templates.get("correct", ["නිවැරදියි!"]) if is_static(t)]
+        incorrect = [t for t in self.feedback_templates.get("incorrect", ["වැරදියි."]) if is_static(t)]
+        encouragement = [t for t in self.feedback_templates.get("encouragement", ["නැවත උත්සාහ කරන්න."])
+                         if is_static(t)]
+        explanations = [p.get("explanation", "") for p in self.error_patterns.values()]
+        explanations = [e for e in explanations if e and is_static(e)]
+        
+        phrases = list(correct) + list(NEXT_STEPS) + explanations
+        for text in incorrect:
+            variants = [text] + [f"{text} {e}" for e in encouragement]
+            for variant in variants:
+                phrases.append(variant)
+                phrases.extend(f"{variant} {e}" for e in explanations)
+        
+        # Preserve order while dropping duplicates
+        return list(dict.fromkeys(phrases))
+    
     def detect_emotion(self, audio_data):
         """Detect student emotion from audio (placeholder)"""
         # This would be implemented with MediaPipe or another audio analysis
@@ -235,14 +267,18 @@ class FeedbackEngine:
         return adjustments
     
     def generate_progress_report(self, student_profile, time_period="biweekly"):
-        """Generate a progress report for the student"""
-        # This would analyze the student's performance history
-        # and generate a comprehensive report
+        """Generate a progress report for the student
+        
+        Improvement is the change in accuracy, in percentage points,
+        between the current period and the one before it.
+        """
+        history = student_profile.history_columns()
+        period_days = PERIOD_DAYS.get(time_period, PERIOD_DAYS["biweekly"])
+        now = datetime.datetime.now()
         
-        # For a basic implementation, let's create a simple report
         report = {
             "student_id": student_profile.student_id,
-            "report_date": datetime.datetime.now().isoformat(),
+            "report_date": now.isoformat(),
             "period": time_period,
             "overall_progress": {},
             "topic_progress": {},
@@ -251,17 +287,31 @@ class FeedbackEngine:
         
         # Calculate overall progress
         overall_level = student_profile.get_proficiency_level()
+        current_streak, best_streak = history.streaks()
         report["overall_progress"] = {
             "current_level": overall_level,
-            "improvement": 0  # Would be calculated from historical data
+            "improvement": history.improvement(period_days, now=now),
+            "accuracy": history.accuracy(),
+            "mean_response_time": history.mean_response_time(),
+            "current_streak": current_streak,
+            "best_streak": best_streak
         }
         
         # Topic-specific progress
+        improvements = history.improvement_by_topic(period_days, now=now)
+        accuracies = history.accuracy_by_topic()
         for topic, level in student_profile.topic_progress.items():
-            # This would include historical comparison in full implementation
+            stats = student_profile.get_topic_stats(topic)
             report["topic_progress"][topic] = {
                 "current_level": level,
-                "improvement": 0  # Placeholder
+                "improvement": improvements.get(topic, 0.0),
+                "accuracy": accuracies.get(topic),
+                "recent_accuracy": stats["ewma_accuracy"],
+                "recent_response_time": stats["ewma_response_time"],
+                "attempts": stats["attempts"],
+                "current_streak": stats["current_streak"],
+                "best_streak": stats["best_streak"],
+                "last_seen": stats["last_seen"]
             }
         
         # Generate recommendations
@@ -0,0 +1,282 @@
+# src/learning/answer_ingest.py
+
+import json
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+
+from .file_lock import FileLock
+from .profile_store import HistoryWriteError
+
+
+class AnswerIngestor:
+    """Asynchronous, batched recording of submitted answers
+
+    Requests only put (student_id, record) on a bounded in-memory queue. A
+    background thread drains it in batches: each student's answers are
+    applied to the profile through `apply(student_id, records)`, and the
+    whole batch's history goes to the store in one append_history_many
+    call. When the queue stays full for `enqueue_timeout` seconds, or the
+    store rejects a batch, the records are appended to a spill file instead
+    and replayed into the store once writes succeed again. Answers whose
+    apply failed are spilled as well and applied again on replay, without
+    writing their history twice.
+
+    The spill file is shared by every worker process through a FileLock.
+    """
+
+    def __init__(self, store, apply=None, max_queue=10000, batch_size=500, interval=0.2,
+                 enqueue_timeout=0.05, spill_path=None, retry_interval=5.0):
+        self.store = store
+        self.apply = apply
+        self.batch_size = batch_size
+        self.interval = interval
+        self.enqueue_timeout = enqueue_timeout
+        self.spill_path = spill_path
+        self.retry_interval = retry_interval
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._spill_lock = FileLock(spill_path + '.lock') if spill_path else None
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+        self._next_replay = 0
+
+        self.submitted = 0
+        self.written = 0
+        self.batches = 0
+        self.spilled = 0
+        self.replayed = 0
+        self.failures = 0
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='answer-ingest', daemon=True)
+            self._thread.start()
+        return self
+
+    def submit(self, student_id, record):
+        """Queue one answer; spills to disk if the queue stays full"""
+        with self._lock:
+            self.submitted += 1
+        try:
+            self._queue.put((student_id, record), timeout=self.enqueue_timeout)
+        except queue.Full:
+            # Backpressure: the writer is behind, keep the answer on disk instead
+            self._spill([(student_id, record, False, False)])
+
+    def _take(self):
+        """Up to batch_size queued answers, waiting at most interval for the first"""
+        try:
+            items = [self._queue.get(timeout=self.interval)]
+        except queue.Empty:
+            return []
+        while len(items) < self.batch_size:
+            try:
+                items.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return items
+
+    def drain(self):
+        """Write everything queued now; returns the number of answers taken"""
+        taken = 0
+        while True:
+            items = []
+            while len(items) < self.batch_size:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not items:
+                return taken
+            self._process(items)
+            taken += len(items)
+
+    def _process(self, items):
+        # Group by student, keeping each student's answers in submission order
+        batches = OrderedDict()
+        for student_id, record in items:
+            batches.setdefault(student_id, []).append(record)
+
+        # Students whose profile did not take the answers; they are retried from the spill file
+        unapplied = {student_id for student_id in batches
+                     if not self._apply(student_id, batches[student_id])}
+
+        if self._write(batches, unapplied):
+            self._replay()
+
+    def _apply(self, student_id, records):
+        if self.apply is None:
+            return True
+        try:
+            self.apply(student_id, records)
+            return True
+        except Exception as e:
+            print(f"Error applying answers for {student_id}: {e}")
+            return False
+
+    def _write(self, batches, unapplied=()):
+        """
+        Append a batch's history to the store, spilling whatever is not done
+
+        Records not written, and records of the students in unapplied, go to
+        the spill file marked with what is still missing for them.
+        """
+        total = sum(len(records) for records in batches.values())
+        failed = {}
+        try:
+            self.store.append_history_many(batches)
+        except HistoryWriteError as e:
+            failed = e.failed
+            print(f"Error writing answers: {e}")
+        except Exception as e:
+            failed = batches
+            print(f"Error writing answers: {e}")
+
+        with self._lock:
+            if failed:
+                self.failures += 1
+            else:
+                self.batches += 1
+            self.written += total - sum(len(records) for records in failed.values())
+
+        self._spill([(student_id, record, student_id not in unapplied, student_id not in failed)
+                     for student_id, records in batches.items()
+                     if student_id in failed or student_id in unapplied
+                     for record in records])
+        return not failed
+
+    def _spill(self, entries):
+        """Append (student_id, record, applied, written) entries to the spill file
+
+        applied says whether the profile already has the answer, written
+        whether its history is already in the store.
+        """
+        if not entries:
+            return
+        if not self.spill_path:
+            print(f"Dropping {len(entries)} answers: no spill file")
+            return
+        lines = ''.join(self._spill_line(*entry) for entry in entries)
+        try:
+            with self._spill_lock:
+                with open(self.spill_path, 'a', encoding='utf-8') as f:
+                    f.write(lines)
+                    f.flush()
+                    os.fsync(f.fileno())
+            with self._lock:
+                self.spilled += len(entries)
+        except Exception as e:
+            print(f"Error spilling answers: {e}")
+
+    @staticmethod
+    def _spill_line(student_id, record, applied, written=False):
+        return json.dumps({'student_id': student_id, 'record': record,
+                           'applied': applied, 'written': written}) + '\n'
+
+    def _replay(self):
+        """Finish spilled answers (store writes and profile updates), at most once per retry_interval"""
+        if not self.spill_path or time.monotonic() < self._next_replay:
+            return
+        self._next_replay = time.monotonic() + self.retry_interval
+        with self._spill_lock:
+            if not os.path.exists(self.spill_path):
+                return
+            entries = []
+            try:
+                with open(self.spill_path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        try:
+                            entry = json.loads(line)
+                        except ValueError:
+                            # Torn last line from a crash mid-write
+                            continue
+                        entries.append((entry['student_id'], entry['record'],
+                                        entry.get('applied', True), entry.get('written', False)))
+            except Exception as e:
+                print(f"Error reading spilled answers: {e}")
+                return
+
+            unwritten = OrderedDict()
+            unapplied = OrderedDict()
+            for student_id, record, applied, written in entries:
+                if not written:
+                    unwritten.setdefault(student_id, []).append(record)
+                if not applied:
+                    unapplied.setdefault(student_id, []).append(record)
+
+            failed = {}
+            try:
+                if unwritten:
+                    self.store.append_history_many(unwritten)
+            except HistoryWriteError as e:
+                failed = e.failed
+            except Exception as e:
+                print(f"Error replaying spilled answers: {e}")
+                return
+
+            # Answers spilled under backpressure, or whose apply failed, never reached their profiles
+            applied_now = {student_id for student_id, records in unapplied.items()
+                           if self._apply(student_id, records)}
+
+            # Keep only what is still unfinished; the lock keeps new spills out meanwhile
+            remaining = []
+            for student_id, record, applied, written in entries:
+                applied = applied or student_id in applied_now
+                written = written or student_id not in failed
+                if not (applied and written):
+                    remaining.append((student_id, record, applied, written))
+            if remaining:
+                tmp_path = self.spill_path + '.tmp'
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    f.write(''.join(self._spill_line(*entry) for entry in remaining))
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.spill_path)
+            else:
+                os.remove(self.spill_path)
+            with self._lock:
+                self.replayed += sum(len(records) for records in unwritten.values()) - \
+                    sum(len(records) for records in failed.values())
+
+    def _run(self):
+        self._replay()
+        while not self._stopped.is_set():
+            try:
+                items = self._take()
+                if items:
+                    self._process(items)
+                else:
+                    self._replay()
+            except Exception as e:
+                print(f"Error ingesting answers: {e}")
+
+    def stop(self):
+        """Stop the background thread after writing everything queued"""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.drain()
+
+    def stats(self):
+        spill_bytes = 0
+        if self.spill_path:
+            try:
+                spill_bytes = os.path.getsize(self.spill_path)
+            except FileNotFoundError:
+                pass  # nothing spilled, or a replay just removed it
+        with self._lock:
+            return {
+                "queued": self._queue.qsize(),
+                "submitted": self.submitted,
+                "written": self.written,
+                "batches": self.batches,
+                "spilled": self.spilled,
+                "replayed": self.replayed,
+                "failures": self.failures,
+                "spill_bytes": spill_bytes
+            }
@@ -0,0 +1,85 @@
+# src/learning/file_lock.py
+
+import os
+import threading
+import weakref
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+class FileLock:
+    """Reentrant lock held across threads and processes
+
+    Inside a process a RLock serializes threads; across processes an
+    advisory lock on a side file (flock, or msvcrt on Windows) serializes
+    workers. Reentrant so code holding the lock can call helpers that
+    take it again.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._fd = None
+
+    def acquire(self):
+        self._lock.acquire()
+        if self._depth == 0:
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+                try:
+                    if fcntl is not None:
+                        fcntl.flock(fd, fcntl.LOCK_EX)
+                    else:
+                        msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+                except BaseException:
+                    os.close(fd)
+                    raise
+            except BaseException:
+                self._lock.release()
+                raise
+            self._fd = fd
+        self._depth += 1
+        return self
+
+    def release(self):
+        self._depth -= 1
+        if self._depth == 0:
+            fd, self._fd = self._fd, None
+            try:
+                if fcntl is not None:
+                    fcntl.flock(fd, fcntl.LOCK_UN)
+                else:
+                    os.lseek(fd, 0, os.SEEK_SET)
+                    msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+            finally:
+                os.close(fd)
+        self._lock.release()
+
+    def __enter__(self):
+        return self.acquire()
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+
+# One lock object per path in this process; flock is per open file, so two
+# objects for the same path in one process would block each other
+_locks = weakref.WeakValueDictionary()
+_locks_guard = threading.Lock()
+
+
+def student_lock(directory, student_id):
+    """The shared lock guarding a student's profile and history files"""
+    path = os.path.abspath(os.path.join(directory, f".{student_id}.lock"))
+    with _locks_guard:
+        lock = _locks.get(path)
+        if lock is None:
+            lock = FileLock(path)
+            _locks[path] = lock
+        return lock
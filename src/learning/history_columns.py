@@ -0,0 +1,285 @@
+# src/learning/history_columns.py
+
+import argparse
+import datetime
+import random
+import time
+
+import numpy as np
+
+# Report periods accepted by FeedbackEngine.generate_progress_report, in days
+PERIOD_DAYS = {
+    "daily": 1,
+    "weekly": 7,
+    "biweekly": 14,
+    "monthly": 30
+}
+
+DAY_SECONDS = 86400
+
+
+def _epoch_seconds(timestamps):
+    """ISO timestamp strings to int64 epoch seconds in one conversion"""
+    if not timestamps:
+        return np.zeros(0, dtype=np.int64)
+    return np.array(timestamps, dtype='datetime64[us]').astype('datetime64[s]').astype(np.int64)
+
+
+def _now_seconds(now=None):
+    now = now or datetime.datetime.now()
+    return int(np.datetime64(now, 's').astype(np.int64))
+
+
+class HistoryColumns:
+    """Performance history as parallel NumPy columns
+
+    One row per answer from the history log, plus one row per day, topic
+    and subtopic from the compacted summary. Topics and subtopics are
+    stored as integer codes into the `topics` and `subtopics` tuples.
+    Raw answers have attempts == 1; summary rows carry the day's totals,
+    so every query weights rows by attempts.
+    """
+
+    def __init__(self, timestamps, topic_codes, subtopic_codes, attempts, correct,
+                 response_time, timed, topics, subtopics):
+        order = np.argsort(timestamps, kind='stable')
+        self.timestamps = timestamps[order]
+        self.topic_codes = topic_codes[order]
+        self.subtopic_codes = subtopic_codes[order]
+        self.attempts = attempts[order]
+        self.correct = correct[order]
+        self.response_time = response_time[order]
+        self.timed = timed[order]
+        self.topics = topics
+        self.subtopics = subtopics
+
+    @classmethod
+    def from_records(cls, records, summary=None, topics=(), subtopics=()):
+        """Build columns from log records and an optional daily summary
+
+        topics and subtopics seed the code tables, so columns built for
+        new records share codes with an existing instance.
+        """
+        topic_index = {name: code for code, name in enumerate(topics)}
+        subtopic_index = {name: code for code, name in enumerate(subtopics)}
+
+        def code(index, name):
+            return index.setdefault(name or "", len(index))
+
+        stamps = []
+        topic_codes = []
+        subtopic_codes = []
+        attempts = []
+        correct = []
+        response_time = []
+        timed = []
+
+        for day, day_topics in sorted((summary or {}).get("days", {}).items()):
+            for topic, day_subtopics in day_topics.items():
+                for subtopic, totals in day_subtopics.items():
+                    stamps.append(day)
+                    topic_codes.append(code(topic_index, topic))
+                    subtopic_codes.append(code(subtopic_index, subtopic))
+                    attempts.append(totals["attempts"])
+                    correct.append(totals["correct"])
+                    count = totals.get("timed", 0)
+                    response_time.append(totals["response_time_total"] / count if count else np.nan)
+                    timed.append(count)
+
+        for record in records:
+            stamps.append(record.get("timestamp", ""))
+            topic_codes.append(code(topic_index, record.get("topic")))
+            subtopic_codes.append(code(subtopic_index, record.get("subtopic")))
+            attempts.append(1)
+            correct.append(1 if record.get("is_correct") else 0)
+            seconds = record.get("response_time")
+            response_time.append(np.nan if seconds is None else seconds)
+            timed.append(0 if seconds is None else 1)
+
+        return cls(
+            _epoch_seconds(stamps),
+            np.array(topic_codes, dtype=np.int32),
+            np.array(subtopic_codes, dtype=np.int32),
+            np.array(attempts, dtype=np.int32),
+            np.array(correct, dtype=np.int32),
+            np.array(response_time, dtype=np.float32),
+            np.array(timed, dtype=np.int32),
+            tuple(topic_index),
+            tuple(subtopic_index)
+        )
+
+    def extend(self, records):
+        """New columns with records appended; this instance is unchanged"""
+        if not records:
+            return self
+        added = HistoryColumns.from_records(records, topics=self.topics, subtopics=self.subtopics)
+        return HistoryColumns(
+            np.concatenate((self.timestamps, added.timestamps)),
+            np.concatenate((self.topic_codes, added.topic_codes)),
+            np.concatenate((self.subtopic_codes, added.subtopic_codes)),
+            np.concatenate((self.attempts, added.attempts)),
+            np.concatenate((self.correct, added.correct)),
+            np.concatenate((self.response_time, added.response_time)),
+            np.concatenate((self.timed, added.timed)),
+            added.topics,
+            added.subtopics
+        )
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def nbytes(self):
+        """Memory used by the column arrays"""
+        return sum(column.nbytes for column in (self.timestamps, self.topic_codes, self.subtopic_codes,
+                                                self.attempts, self.correct, self.response_time,
+                                                self.timed))
+
+    def _mask(self, topic=None, start=None, end=None):
+        mask = np.ones(len(self), dtype=bool)
+        if topic is not None:
+            if topic not in self.topics:
+                return np.zeros(len(self), dtype=bool)
+            mask &= self.topic_codes == self.topics.index(topic)
+        if start is not None:
+            mask &= self.timestamps >= start
+        if end is not None:
+            mask &= self.timestamps < end
+        return mask
+
+    def accuracy(self, topic=None, start=None, end=None):
+        """Fraction of correct answers, or None when there are no attempts"""
+        mask = self._mask(topic, start, end)
+        attempts = self.attempts[mask].sum()
+        if not attempts:
+            return None
+        return float(self.correct[mask].sum() / attempts)
+
+    def accuracy_by_topic(self, start=None, end=None):
+        """{topic: accuracy} for topics with attempts in [start, end)"""
+        mask = self._mask(start=start, end=end)
+        size = len(self.topics)
+        attempts = np.bincount(self.topic_codes[mask], weights=self.attempts[mask], minlength=size)
+        correct = np.bincount(self.topic_codes[mask], weights=self.correct[mask], minlength=size)
+        return {
+            self.topics[code]: float(correct[code] / attempts[code])
+            for code in np.flatnonzero(attempts)
+        }
+
+    def accuracy_by_window(self, window_days=1, topic=None):
+        """Accuracy per fixed window, as (window start epochs, accuracies)
+
+        Windows with no attempts are NaN.
+        """
+        mask = self._mask(topic)
+        if not mask.any():
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float64)
+
+        window = window_days * DAY_SECONDS
+        stamps = self.timestamps[mask]
+        origin = stamps[0] - stamps[0] % window
+        buckets = (stamps - origin) // window
+        attempts = np.bincount(buckets, weights=self.attempts[mask])
+        correct = np.bincount(buckets, weights=self.correct[mask])
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            accuracy = correct / attempts
+        starts = origin + np.arange(len(attempts), dtype=np.int64) * window
+        return starts, accuracy
+
+    def improvement(self, period_days=14, topic=None, now=None):
+        """Accuracy change in percentage points between the current and previous period
+
+        Returns 0.0 when either period has no attempts.
+        """
+        end = _now_seconds(now)
+        period = period_days * DAY_SECONDS
+        current = self.accuracy(topic, end - period, end)
+        previous = self.accuracy(topic, end - 2 * period, end - period)
+        if current is None or previous is None:
+            return 0.0
+        return round((current - previous) * 100, 1)
+
+    def improvement_by_topic(self, period_days=14, now=None):
+        """{topic: improvement} for every topic, in one pass per period"""
+        end = _now_seconds(now)
+        period = period_days * DAY_SECONDS
+        current = self.accuracy_by_topic(end - period, end)
+        previous = self.accuracy_by_topic(end - 2 * period, end - period)
+        return {
+            topic: round((current[topic] - previous[topic]) * 100, 1)
+            if topic in current and topic in previous else 0.0
+            for topic in self.topics
+        }
+
+    def mean_response_time(self, topic=None, start=None, end=None):
+        """Mean response time in seconds over timed answers, or None"""
+        mask = self._mask(topic, start, end) & (self.timed > 0)
+        timed = self.timed[mask].sum()
+        if not timed:
+            return None
+        return float(np.dot(self.response_time[mask].astype(np.float64), self.timed[mask]) / timed)
+
+    def streaks(self, topic=None):
+        """(current, best) runs of consecutive correct answers
+
+        Only individual answers count; compacted days carry no ordering.
+        """
+        mask = self._mask(topic) & (self.attempts == 1)
+        correct = self.correct[mask].astype(bool)
+        if not correct.any():
+            return 0, 0
+
+        # Run boundaries of True values from the edges of a zero-padded array
+        edges = np.diff(np.concatenate(([0], correct.view(np.int8), [0])))
+        starts = np.flatnonzero(edges == 1)
+        ends = np.flatnonzero(edges == -1)
+        lengths = ends - starts
+        current = int(lengths[-1]) if correct[-1] else 0
+        return current, int(lengths.max())
+
+
+def generate_records(count, days=365, seed=0):
+    """Synthetic answer records spread over the last `days` days"""
+    rng = random.Random(seed)
+    now = datetime.datetime.now()
+    topics = ["algebra", "geometry", "arithmetic", "addition", "subtraction"]
+    records = []
+    for i in range(count):
+        offset = datetime.timedelta(seconds=(count - i) * days * DAY_SECONDS / count)
+        records.append({
+            "timestamp": (now - offset).isoformat(),
+            "topic": rng.choice(topics),
+            "subtopic": None,
+            "is_correct": rng.random() < 0.4 + 0.4 * i / count,
+            "response_time": rng.uniform(2, 30)
+        })
+    return records
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Progress analytics benchmark")
+    parser.add_argument("--records", type=int, default=100000)
+    args = parser.parse_args()
+
+    records = generate_records(args.records)
+
+    started = time.perf_counter()
+    columns = HistoryColumns.from_records(records)
+    built = time.perf_counter() - started
+
+    started = time.perf_counter()
+    improvement = columns.improvement(PERIOD_DAYS["biweekly"])
+    by_topic = columns.improvement_by_topic(PERIOD_DAYS["biweekly"])
+    columns.accuracy_by_window(7)
+    columns.mean_response_time()
+    streaks = columns.streaks()
+    queried = time.perf_counter() - started
+
+    print(f"{len(columns)} records")
+    print(f"build:   {built * 1000:.1f} ms")
+    print(f"queries: {queried * 1000:.2f} ms")
+    print(f"improvement: {improvement} (by topic: {by_topic}), streaks: {streaks}")
+
+
+if __name__ == "__main__":
+    main()
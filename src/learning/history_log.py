@@ -0,0 +1,231 @@
+# src/learning/history_log.py
+
+import argparse
+import datetime
+import glob
+import json
+import os
+import tempfile
+from collections import deque
+
+from .file_lock import student_lock
+
+
+def _write_atomic(path, text):
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as file:
+            file.write(text)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+class HistoryLog:
+    """Append-only performance log for one student
+
+    Each answer is one JSON line in {student_id}.history.jsonl. Compaction
+    rolls records older than the retention window into per-day summaries
+    in {student_id}.summary.json, so the log only ever holds recent
+    answers and loading a profile reads the summary plus a short tail.
+
+    With compact_bytes set, appends compact the log themselves each time
+    it grows by another compact_bytes, so no separate job is needed.
+    """
+
+    def __init__(self, student_id, directory, compact_bytes=None, retention_days=30):
+        self.student_id = student_id
+        self.directory = directory
+        self.compact_bytes = compact_bytes
+        self.retention_days = retention_days
+        self.log_path = os.path.join(directory, f"{student_id}.history.jsonl")
+        self.summary_path = os.path.join(directory, f"{student_id}.summary.json")
+        # Shared with the student's profile; serializes appends and compaction
+        self.lock = student_lock(directory, student_id)
+
+    def exists(self):
+        return os.path.exists(self.log_path) or os.path.exists(self.summary_path)
+
+    def append(self, record):
+        self.append_many([record])
+
+    def append_many(self, records):
+        """Append records to the log in one write, compacting when due"""
+        if not records:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        data = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records).encode('utf-8')
+        with self.lock:
+            with open(self.log_path, 'ab') as file:
+                file.write(data)
+                size = file.tell()
+            if self._compaction_due(size - len(data), size):
+                try:
+                    self._compact(self.retention_days, None)
+                except Exception as e:
+                    print(f"Error compacting history log: {e}")
+
+    def _compaction_due(self, before, after):
+        """True when an append took the log past another multiple of compact_bytes
+
+        Keyed on the size alone, so it needs no state between instances, and
+        a log of only recent records is rescanned once per compact_bytes
+        appended rather than on every append.
+        """
+        if not self.compact_bytes:
+            return False
+        return before // self.compact_bytes < after // self.compact_bytes
+
+    def records(self):
+        """Every record still in the log (not yet compacted), oldest first"""
+        return self.read_from(0)[0]
+
+    def read_from(self, offset):
+        """Records appended at or after byte offset, and the offset to resume from
+
+        Only complete lines are returned, so a reader never sees a record
+        that is still being written. Returns (None, 0) when the log is
+        shorter than offset, meaning it was rewritten by compaction.
+        """
+        if not os.path.exists(self.log_path):
+            return ([], 0) if offset == 0 else (None, 0)
+        compacted_until = self.load_summary().get("compacted_until")
+
+        with open(self.log_path, 'rb') as file:
+            file.seek(0, os.SEEK_END)
+            if file.tell() < offset:
+                return None, 0
+            file.seek(offset)
+            data = file.read()
+        complete = data.rfind(b"\n") + 1
+
+        records = []
+        for line in data[:complete].decode('utf-8').splitlines():
+            record = self._parse(line)
+            if record is None:
+                continue
+            # Already rolled into the summary by an interrupted compaction
+            if compacted_until and record.get("timestamp", "") < compacted_until:
+                continue
+            records.append(record)
+        return records, offset + complete
+
+    def tail(self, limit):
+        """The last `limit` records, reading only the end of the file"""
+        if limit <= 0 or not os.path.exists(self.log_path):
+            return []
+
+        block_size = 8192
+        with open(self.log_path, 'rb') as file:
+            file.seek(0, os.SEEK_END)
+            position = file.tell()
+            data = b""
+            while position > 0 and data.count(b"\n") <= limit:
+                step = min(block_size, position)
+                position -= step
+                file.seek(position)
+                data = file.read(step) + data
+
+        lines = data.decode('utf-8', errors='ignore').splitlines()
+        if position > 0:
+            lines = lines[1:]  # first line may be cut mid-record
+
+        tail = deque(maxlen=limit)
+        for line in lines:
+            record = self._parse(line)
+            if record is not None:
+                tail.append(record)
+        return list(tail)
+
+    @staticmethod
+    def _parse(line):
+        line = line.strip()
+        if not line:
+            return None
+        try:
+            return json.loads(line)
+        except ValueError:
+            return None  # torn final line from a crash
+
+    def load_summary(self):
+        """Per-day rollups of compacted records"""
+        if os.path.exists(self.summary_path):
+            try:
+                with open(self.summary_path, 'r', encoding='utf-8') as file:
+                    return json.load(file)
+            except Exception as e:
+                print(f"Error loading history summary: {e}")
+        return {"compacted_until": None, "days": {}}
+
+    def compact(self, retention_days=30, now=None):
+        """Roll records older than the retention window into daily summaries"""
+        with self.lock:
+            return self._compact(retention_days, now)
+
+    def _compact(self, retention_days, now):
+        now = now or datetime.datetime.now()
+        cutoff = (now - datetime.timedelta(days=retention_days)).isoformat()
+
+        records = self.records()
+        old = [r for r in records if r.get("timestamp", "") < cutoff]
+        if not old:
+            return {"compacted": 0, "kept": len(records)}
+        recent = [r for r in records if r.get("timestamp", "") >= cutoff]
+
+        summary = self.load_summary()
+        days = summary.setdefault("days", {})
+        for record in old:
+            day = record.get("timestamp", "")[:10]
+            topics = days.setdefault(day, {})
+            subtopics = topics.setdefault(record.get("topic", ""), {})
+            totals = subtopics.setdefault(record.get("subtopic", "") or "", {
+                "attempts": 0, "correct": 0, "response_time_total": 0.0, "timed": 0
+            })
+            totals["attempts"] += 1
+            totals["correct"] += 1 if record.get("is_correct") else 0
+            if record.get("response_time") is not None:
+                totals["response_time_total"] += record["response_time"]
+                totals["timed"] += 1
+        summary["compacted_until"] = cutoff
+
+        # Summary first: if the log rewrite is interrupted, compacted_until
+        # makes readers skip the records that were already rolled up
+        _write_atomic(self.summary_path, json.dumps(summary, ensure_ascii=False))
+        _write_atomic(self.log_path,
+                      "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in recent))
+
+        return {"compacted": len(old), "kept": len(recent)}
+
+
+def compact_all(directory, retention_days=30):
+    """Compact the history log of every student in directory"""
+    totals = {"students": 0, "compacted": 0, "kept": 0}
+    suffix = ".history.jsonl"
+    for path in glob.glob(os.path.join(directory, f"*{suffix}")):
+        student_id = os.path.basename(path)[:-len(suffix)]
+        result = HistoryLog(student_id, directory).compact(retention_days)
+        totals["students"] += 1
+        totals["compacted"] += result["compacted"]
+        totals["kept"] += result["kept"]
+    return totals
+
+
+def main():
+    import config
+    from .profile_store import PROFILES_DIR
+
+    parser = argparse.ArgumentParser(description="Compact student performance logs")
+    parser.add_argument("--directory", default=PROFILES_DIR)
+    parser.add_argument("--retention-days", type=int, default=config.HISTORY_RETENTION_DAYS)
+    args = parser.parse_args()
+
+    totals = compact_all(args.directory, args.retention_days)
+    print(f"Compacted {totals['compacted']} records for {totals['students']} students "
+          f"({totals['kept']} kept in logs)")
+
+
+if __name__ == "__main__":
+    main()
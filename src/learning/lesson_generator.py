@@ -3,12 +3,41 @@
 import random
 from ..cultural.problem_generator import CulturalProblemGenerator
 
+# Fixed introduction and summary text per topic
+TOPIC_INTRODUCTIONS = {
+    "addition": "එකතු කිරීම යනු දෙකක් හෝ ඊට වැඩි ගණනක් එකතු කිරීමේ ක්‍රියාවලියයි.",
+    "subtraction": "අඩු කිරීම යනු එක් අගයකින් තවත් අගයක් ඉවත් කිරීමේ ක්‍රියාවලියයි.",
+    "multiplication": "ගුණ කිරීම යනු සංඛ්‍යාවක් කිහිප වතාවක් එකතු කිරීමේ කෙටි ක්‍රමයයි.",
+    "division": "බෙදීම යනු ප්‍රමාණයක් කොටස් වලට බෙදීමේ ක්‍රියාවලියයි."
+}
+
+TOPIC_SUMMARIES = {
+    "addition": "එකතු කිරීමේදී, ඔබ දෙකක් හෝ වැඩි ගණනක් සංඛ්‍යා එකතු කරන අතර අවසාන එකතුව ලබා ගනී.",
+    "subtraction": "අඩු කිරීමේදී, ඔබ එක් සංඛ්‍යාවකින් තවත් සංඛ්‍යාවක් අඩු කරයි.",
+    "multiplication": "ගුණ කිරීමේදී, ඔබ සංඛ්‍යාවක් වෙනත් සංඛ්‍යාවකින් වැඩි කරයි.",
+    "division": "බෙදීමේදී, ඔබ සංඛ්‍යාවක් සමාන කොටස් වලට බෙදයි."
+}
+
+# Answers needed on a topic before its rollup moves the lesson difficulty
+MIN_ATTEMPTS_FOR_STATS = 5
+
+# Recent accuracy and run of correct answers that move a lesson up a level,
+# and the recent accuracy below which it drops one
+STEP_UP_ACCURACY = 0.85
+STEP_UP_STREAK = 3
+STEP_DOWN_ACCURACY = 0.4
+
 class AdaptiveLessonGenerator:
     def __init__(self):
         self.problem_generator = CulturalProblemGenerator()
         
     def generate_lesson(self, student_profile, focus_topic=None):
         """Generate a personalized lesson based on student profile"""
+        topic, difficulty, learning_style = self.plan_lesson(student_profile, focus_topic)
+        return self.build_lesson(topic, difficulty, learning_style)
+    
+    def plan_lesson(self, student_profile, focus_topic=None):
+        """Pick the topic, difficulty and learning style of the student's next lesson"""
         # Get learning path if no focus topic specified
         if not focus_topic:
             learning_path = student_profile.get_learning_path()
@@ -19,11 +48,32 @@ class AdaptiveLessonGenerator:
         
         # Get current proficiency level
         current_level = student_profile.get_proficiency_level(focus_topic)
-        difficulty = max(1, min(10, int(current_level)))
+        difficulty = self._adjust_difficulty(int(current_level),
+                                             student_profile.get_topic_stats(focus_topic))
         
         # Get optimal learning style
         learning_style = student_profile.get_learning_style()
         
+        return focus_topic, difficulty, learning_style
+    
+    def _adjust_difficulty(self, difficulty, stats):
+        """
+        Move the level-based difficulty by the topic's rollup
+        
+        Proficiency only moves 0.2 per correct answer, so a student who is
+        answering everything right on a run steps up a level early, and one
+        whose recent answers are mostly wrong steps down.
+        """
+        if stats["attempts"] >= MIN_ATTEMPTS_FOR_STATS and stats["ewma_accuracy"] is not None:
+            if (stats["ewma_accuracy"] >= STEP_UP_ACCURACY
+                    and stats["current_streak"] >= STEP_UP_STREAK):
+                difficulty += 1
+            elif stats["ewma_accuracy"] < STEP_DOWN_ACCURACY:
+                difficulty -= 1
+        return max(1, min(10, difficulty))
+    
+    def build_lesson(self, focus_topic, difficulty, learning_style):
+        """Build the lesson content; depends only on its arguments, not on the student"""
         # Structure the lesson
         lesson = {
             "topic": focus_topic,
@@ -40,14 +90,7 @@ class AdaptiveLessonGenerator:
     def _generate_introduction(self, topic, difficulty):
         """Generate topic introduction based on difficulty level"""
         # This would be more comprehensive in a full implementation
-        topics_intro = {
-            "addition": "එකතු කිරීම යනු දෙකක් හෝ ඊට වැඩි ගණනක් එකතු කිරීමේ ක්‍රියාවලියයි.",
-            "subtraction": "අඩු කිරීම යනු එක් අගයකින් තවත් අගයක් ඉවත් කිරීමේ ක්‍රියාවලියයි.",
-            "multiplication": "ගුණ කිරීම යනු සංඛ්‍යාවක් කිහිප වතාවක් එකතු කිරීමේ කෙටි ක්‍රමයයි.",
-            "division": "බෙදීම යනු ප්‍රමාණයක් කොටස් වලට බෙදීමේ ක්‍රියාවලියයි."
-        }
-        
-        return topics_intro.get(topic, f"{topic} පිළිබඳ හැඳින්වීම")
+        return TOPIC_INTRODUCTIONS.get(topic, f"{topic} පිළිබඳ හැඳින්වීම")
     
     def _generate_examples(self, topic, difficulty, count=2):
         """Generate worked examples of increasing complexity"""
@@ -118,11 +161,8 @@ class AdaptiveLessonGenerator:
     def _generate_summary(self, topic):
         """Generate a summary of key points for the topic"""
         # This would be more comprehensive in a full implementation
-        topics_summary = {
-            "addition": "එකතු කිරීමේදී, ඔබ දෙකක් හෝ වැඩි ගණනක් සංඛ්‍යා එකතු කරන අතර අවසාන එකතුව ලබා ගනී.",
-            "subtraction": "අඩු කිරීමේදී, ඔබ එක් සංඛ්‍යාවකින් තවත් සංඛ්‍යාවක් අඩු කරයි.",
-            "multiplication": "ගුණ කිරීමේදී, ඔබ සංඛ්‍යාවක් වෙනත් සංඛ්‍යාවකින් වැඩි කරයි.",
-            "division": "බෙදීමේදී, ඔබ සංඛ්‍යාවක් සමාන කොටස් වලට බෙදයි."
-        }
-        
-        return topics_summary.get(topic, f"{topic} පිළිබඳ සාරාංශය")
\ No newline at end of file
+        return TOPIC_SUMMARIES.get(topic, f"{topic} පිළිබඳ සාරාංශය")
+    
+    def static_phrases(self):
+        """Return every fixed sentence a lesson can contain"""
+        return list(TOPIC_INTRODUCTIONS.values()) + list(TOPIC_SUMMARIES.values())
\ No newline at end of file
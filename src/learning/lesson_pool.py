@@ -0,0 +1,150 @@
+# src/learning/lesson_pool.py
+
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+class LessonPool:
+    """Lessons built ahead of time, kept per (topic, difficulty, learning style)
+
+    After each answer prefetch() predicts the student's next lesson with
+    AdaptiveLessonGenerator.plan_lesson and tops that key's pool up to
+    `per_key` ready lessons on a background executor, so get() is usually a
+    pop from a deque. Lesson content depends only on its key, so students
+    at the same level share a pool; each lesson is handed out once.
+
+    When a student's predicted key changes (their proficiency crossed a
+    difficulty boundary, or the learning path moved on) and no other
+    student is waiting on the old key, its ready lessons are dropped.
+    At most `max_keys` pools are kept, least recently used first out.
+    """
+
+    def __init__(self, generator, per_key=2, max_keys=256, max_students=10000, max_workers=2):
+        self.generator = generator
+        self.per_key = per_key
+        self.max_keys = max_keys
+        self.max_students = max_students
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix='lesson')
+        self._lock = threading.Lock()
+        self._ready = OrderedDict()   # key -> deque of lessons
+        self._building = {}           # key -> lessons being built
+        self._students = OrderedDict()  # student_id -> predicted key
+        self._interest = {}           # key -> students predicted to need it
+
+        self.hits = 0
+        self.misses = 0
+        self.built = 0
+        self.invalidated = 0
+        self.failed = 0
+
+    @staticmethod
+    def _key(topic, difficulty, learning_style):
+        return topic, difficulty, tuple(sorted(learning_style.items()))
+
+    def get(self, student_profile, focus_topic=None):
+        """The student's next lesson: a ready one if pooled, otherwise built now"""
+        plan = self.generator.plan_lesson(student_profile, focus_topic)
+        key = self._key(*plan)
+        with self._lock:
+            ready = self._ready.get(key)
+            lesson = ready.popleft() if ready else None
+            if lesson is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+        if lesson is None:
+            lesson = self.generator.build_lesson(*plan)
+        self._fill(key, plan)
+        return lesson
+
+    def prefetch(self, student_profile):
+        """Predict the student's next lesson and make sure one is being prepared"""
+        plan = self.generator.plan_lesson(student_profile)
+        key = self._key(*plan)
+        with self._lock:
+            previous = self._students.pop(student_profile.student_id, None)
+            self._students[student_profile.student_id] = key
+            if previous != key:
+                self._interest[key] = self._interest.get(key, 0) + 1
+                if previous is not None:
+                    self._release(previous)
+            while len(self._students) > self.max_students:
+                _, oldest = self._students.popitem(last=False)
+                self._release(oldest)
+        self._fill(key, plan)
+
+    def _release(self, key):
+        """Drop a student's interest in key; its pool goes once nobody needs it"""
+        remaining = self._interest.get(key, 0) - 1
+        if remaining > 0:
+            self._interest[key] = remaining
+            return
+        self._interest.pop(key, None)
+        ready = self._ready.pop(key, None)
+        if ready:
+            self.invalidated += len(ready)
+
+    def _fill(self, key, plan):
+        with self._lock:
+            ready = self._ready.get(key)
+            if ready is None:
+                ready = self._ready[key] = deque()
+                while len(self._ready) > self.max_keys:
+                    self._ready.popitem(last=False)
+            self._ready.move_to_end(key)
+
+            missing = self.per_key - len(ready) - self._building.get(key, 0)
+            if missing <= 0:
+                return
+            self._building[key] = self._building.get(key, 0) + missing
+
+        for _ in range(missing):
+            self._executor.submit(self._build, key, plan)
+
+    def _build(self, key, plan):
+        try:
+            lesson = self.generator.build_lesson(*plan)
+        except Exception as e:
+            lesson = None
+            print(f"Error building lesson {key[:2]}: {e}")
+
+        with self._lock:
+            building = self._building.get(key, 0) - 1
+            if building > 0:
+                self._building[key] = building
+            else:
+                self._building.pop(key, None)
+
+            if lesson is None:
+                self.failed += 1
+                return
+            self.built += 1
+            # The pool may have been invalidated while this lesson was built
+            ready = self._ready.get(key)
+            if ready is not None and len(ready) < self.per_key:
+                ready.append(lesson)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self):
+        with self._lock:
+            ready = sum(len(lessons) for lessons in self._ready.values())
+            building = sum(self._building.values())
+            keys = len(self._ready)
+        requests = self.hits + self.misses
+        return {
+            "keys": keys,
+            "ready": ready,
+            "building": building,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / requests if requests else 0.0,
+            "built": self.built,
+            "invalidated": self.invalidated,
+            "failed": self.failed
+        }
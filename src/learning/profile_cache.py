@@ -0,0 +1,139 @@
+# src/learning/profile_cache.py
+
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+
+class ProfileCache:
+    """Bounded LRU cache of loaded student profiles
+
+    Holds at most `max_entries` profiles and roughly `max_bytes` of
+    profile memory, and drops profiles idle for longer than `ttl`
+    seconds. Evicted profiles are flushed first so no answers are lost.
+    """
+
+    def __init__(self, loader, max_entries=500, max_bytes=256 * 1024 * 1024, ttl=1800):
+        self.loader = loader
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+
+        self._entries = OrderedDict()  # student_id -> [profile, size, last access]
+        # Evicted profiles still referenced by in-flight requests. Reviving them
+        # instead of loading a second copy keeps one instance per student.
+        self._evicted = weakref.WeakValueDictionary()
+        self._bytes = 0
+        self._lock = threading.RLock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, student_id, *args):
+        """Return the cached profile, loading it with loader(student_id, *args) on a miss"""
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            entry = self._entries.get(student_id)
+            if entry is not None:
+                self.hits += 1
+                self._touch(student_id, entry, now)
+                return entry[0]
+            self.misses += 1
+            evicted = self._evicted.pop(student_id, None)
+            if evicted is not None:
+                return self._insert(student_id, evicted, now)
+
+        # Load outside the lock so a slow disk read does not block other students
+        profile = self.loader(student_id, *args)
+
+        with self._lock:
+            entry = self._entries.get(student_id)
+            if entry is not None:
+                # Another request loaded it first; keep that instance
+                self._touch(student_id, entry, now)
+                return entry[0]
+            evicted = self._evicted.pop(student_id, None)
+            if evicted is not None:
+                # Evicted while we were loading but still in use elsewhere
+                profile = evicted
+            else:
+                # An eviction flush may have saved the file after we read it
+                profile.reload_if_changed()
+            return self._insert(student_id, profile, now)
+
+    def _insert(self, student_id, profile, now):
+        size = profile.memory_estimate()
+        self._entries[student_id] = [profile, size, now]
+        self._bytes += size
+        self._evict()
+        return profile
+
+    def _touch(self, student_id, entry, now):
+        # Profiles grow as they are used, so re-measure on access
+        size = entry[0].memory_estimate()
+        self._bytes += size - entry[1]
+        entry[1] = size
+        entry[2] = now
+        self._entries.move_to_end(student_id)
+
+    def _drop(self, student_id):
+        profile, size, _ = self._entries.pop(student_id)
+        self._bytes -= size
+        self._evicted[student_id] = profile
+        # Flushed under the lock so a reload cannot read the file before this save
+        profile.flush()
+
+    def _expire(self, now):
+        # Least recently used first, so idle entries are at the front
+        while self._entries:
+            student_id, entry = next(iter(self._entries.items()))
+            if now - entry[2] < self.ttl:
+                break
+            self._drop(student_id)
+            self.expirations += 1
+
+    def _evict(self):
+        # Keep the newest entry even if it alone exceeds the memory budget
+        while len(self._entries) > 1 and (len(self._entries) > self.max_entries
+                                          or self._bytes > self.max_bytes):
+            self._drop(next(iter(self._entries)))
+            self.evictions += 1
+
+    def sweep(self):
+        """Drop profiles idle past the TTL; returns how many were dropped"""
+        with self._lock:
+            before = self.expirations
+            self._expire(time.monotonic())
+            return self.expirations - before
+
+    def flush_all(self):
+        """Save every cached profile with unsaved changes"""
+        with self._lock:
+            profiles = [entry[0] for entry in self._entries.values()]
+        for profile in profiles:
+            profile.flush()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, student_id):
+        return student_id in self._entries
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations
+            }
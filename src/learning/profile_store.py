@@ -0,0 +1,488 @@
+# src/learning/profile_store.py
+
+import glob
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+from contextlib import contextmanager
+
+import config
+from .file_lock import student_lock
+from .history_log import HistoryLog
+
+PROFILES_DIR = os.path.join(os.path.dirname(__file__), '../data/profiles')
+
+EMPTY_SUMMARY = {"compacted_until": None, "days": {}}
+
+
+class HistoryWriteError(Exception):
+    """Some students' records in a batch were not written
+
+    `failed` maps student_id to the records still to be written.
+    """
+
+    def __init__(self, failed, cause):
+        super().__init__(f"{len(failed)} students not written: {cause}")
+        self.failed = failed
+
+
+class ProfileStore:
+    """Where student profiles and their performance history are kept
+
+    A profile is a JSON-compatible dict (impairment_type, topic_progress,
+    learning_objectives, topic_stats, subtopic_stats). History is a
+    sequence of answer records. Versions are opaque tokens that change
+    whenever a profile is saved, used to notice writes by other processes.
+    """
+
+    def lock(self, student_id):
+        """Lock serializing updates to one student across threads and processes"""
+        raise NotImplementedError
+
+    def load(self, student_id):
+        """Return (profile dict, version), or (None, None) for an unknown student"""
+        raise NotImplementedError
+
+    def save(self, student_id, data):
+        """Store a profile dict and return its new version"""
+        raise NotImplementedError
+
+    def version(self, student_id):
+        raise NotImplementedError
+
+    def has_history(self, student_id):
+        raise NotImplementedError
+
+    def append_history(self, student_id, records):
+        raise NotImplementedError
+
+    def append_history_many(self, batches):
+        """Write {student_id: records} for many students
+
+        Stores that can write everything in one transaction override this;
+        here each student is written in turn and a HistoryWriteError lists
+        the ones left over when a write fails.
+        """
+        pending = dict(batches)
+        for student_id, records in batches.items():
+            try:
+                self.append_history(student_id, records)
+            except Exception as e:
+                raise HistoryWriteError(pending, e) from e
+            del pending[student_id]
+
+    def history_tail(self, student_id, limit):
+        """The last `limit` records, oldest first"""
+        raise NotImplementedError
+
+    def read_history(self, student_id, cursor=0):
+        """Records after cursor and the cursor to resume from
+
+        Returns (None, 0) when history was rewritten since cursor was
+        taken, so the caller must start again from 0.
+        """
+        raise NotImplementedError
+
+    def history_summary(self, student_id):
+        """Per-day rollups of history no longer kept record by record"""
+        return dict(EMPTY_SUMMARY)
+
+    def student_ids(self):
+        raise NotImplementedError
+
+    def weakest_students(self, topic, limit=10):
+        """[(student_id, level)] with the lowest progress level on topic"""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class JsonProfileStore(ProfileStore):
+    """One {student_id}.json file per student plus an append-only history log"""
+
+    def __init__(self, directory=PROFILES_DIR, compact_bytes=None,
+                 retention_days=config.HISTORY_RETENTION_DAYS):
+        self.directory = directory
+        self.compact_bytes = compact_bytes
+        self.retention_days = retention_days
+
+    def _path(self, student_id):
+        return os.path.join(self.directory, f'{student_id}.json')
+
+    def _log(self, student_id):
+        return HistoryLog(student_id, self.directory, self.compact_bytes, self.retention_days)
+
+    def lock(self, student_id):
+        return student_lock(self.directory, student_id)
+
+    @staticmethod
+    def _signature(stat):
+        # os.replace gives every save a new inode, so this changes on each save
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def load(self, student_id):
+        try:
+            with open(self._path(student_id), 'r', encoding='utf-8') as file:
+                version = self._signature(os.fstat(file.fileno()))
+                return json.load(file), version
+        except FileNotFoundError:
+            return None, None
+
+    def save(self, student_id, data):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(student_id)
+
+        # Write a temp file and rename it so a crash never leaves a torn profile
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, prefix=f'.{student_id}.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as file:
+                file.write(json.dumps(data, indent=2, ensure_ascii=False))
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+        return self.version(student_id)
+
+    def version(self, student_id):
+        try:
+            return self._signature(os.stat(self._path(student_id)))
+        except FileNotFoundError:
+            return None
+
+    def has_history(self, student_id):
+        return self._log(student_id).exists()
+
+    def append_history(self, student_id, records):
+        self._log(student_id).append_many(records)
+
+    def history_tail(self, student_id, limit):
+        return self._log(student_id).tail(limit)
+
+    def read_history(self, student_id, cursor=0):
+        return self._log(student_id).read_from(cursor)
+
+    def history_summary(self, student_id):
+        return self._log(student_id).load_summary()
+
+    def student_ids(self):
+        ids = []
+        for path in glob.glob(os.path.join(self.directory, '*.json')):
+            name = os.path.basename(path)[:-len('.json')]
+            if not name.endswith('.summary'):
+                ids.append(name)
+        return ids
+
+    def weakest_students(self, topic, limit=10):
+        # Has to open every profile; the SQLite store answers from an index
+        levels = []
+        for student_id in self.student_ids():
+            data, _ = self.load(student_id)
+            if data and topic in data.get('topic_progress', {}):
+                levels.append((student_id, data['topic_progress'][topic]))
+        levels.sort(key=lambda item: item[1])
+        return levels[:limit]
+
+
+class SqliteProfileStore(ProfileStore):
+    """Profiles in one embedded SQLite database in WAL mode
+
+    Tables follow src/models/database.py: students, progress and
+    performance_history, with history indexed on (student_id, topic,
+    created_at). WAL lets readers run alongside the single writer, and
+    each save or history batch is one transaction.
+    """
+
+    SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS students (
+        student_id TEXT PRIMARY KEY,
+        impairment_type INTEGER NOT NULL,
+        learning_objectives TEXT NOT NULL DEFAULT '{}',
+        topic_stats TEXT NOT NULL DEFAULT '{}',
+        subtopic_stats TEXT NOT NULL DEFAULT '{}',
+        version INTEGER NOT NULL DEFAULT 0,
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+        updated_at TEXT
+    );
+
+    CREATE TABLE IF NOT EXISTS progress (
+        student_id TEXT NOT NULL REFERENCES students(student_id),
+        topic TEXT NOT NULL,
+        level REAL NOT NULL,
+        updated_at TEXT,
+        PRIMARY KEY (student_id, topic)
+    );
+    CREATE INDEX IF NOT EXISTS idx_progress_topic_level ON progress (topic, level);
+
+    CREATE TABLE IF NOT EXISTS performance_history (
+        id INTEGER PRIMARY KEY,
+        student_id TEXT NOT NULL REFERENCES students(student_id),
+        topic TEXT NOT NULL,
+        subtopic TEXT,
+        is_correct INTEGER NOT NULL,
+        response_time REAL,
+        created_at TEXT NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_history_student_topic_created
+        ON performance_history (student_id, topic, created_at);
+    CREATE INDEX IF NOT EXISTS idx_history_student_id ON performance_history (student_id, id);
+    '''
+
+    def __init__(self, path):
+        self.path = path
+        self.directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(self.directory, exist_ok=True)
+        self._local = threading.local()
+        self._connections = []
+        self._connections_lock = threading.Lock()
+        self._conn().executescript(self.SCHEMA)
+
+    def _conn(self):
+        """One connection per thread; sqlite3 connections are not shared"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # Autocommit mode; transactions are opened explicitly below
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None,
+                                   check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    @contextmanager
+    def transaction(self, write=True):
+        conn = self._conn()
+        conn.execute('BEGIN IMMEDIATE' if write else 'BEGIN')
+        try:
+            yield conn
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
+
+    def lock(self, student_id):
+        return student_lock(os.path.join(self.directory, 'locks'), student_id)
+
+    def load(self, student_id):
+        with self.transaction(write=False) as conn:
+            row = conn.execute('SELECT * FROM students WHERE student_id = ?',
+                               (student_id,)).fetchone()
+            if row is None:
+                return None, None
+            progress = conn.execute('SELECT topic, level FROM progress WHERE student_id = ?',
+                                    (student_id,)).fetchall()
+
+        data = {
+            'student_id': student_id,
+            'impairment_type': row['impairment_type'],
+            'topic_progress': {topic: level for topic, level in progress},
+            'learning_objectives': json.loads(row['learning_objectives']),
+            'topic_stats': json.loads(row['topic_stats']),
+            'subtopic_stats': json.loads(row['subtopic_stats']),
+            'last_updated': row['updated_at']
+        }
+        return data, row['version']
+
+    def save(self, student_id, data):
+        updated_at = data.get('last_updated')
+        with self.transaction() as conn:
+            conn.execute('''
+                INSERT INTO students (student_id, impairment_type, learning_objectives,
+                                      topic_stats, subtopic_stats, version, updated_at)
+                VALUES (?, ?, ?, ?, ?, 1, ?)
+                ON CONFLICT (student_id) DO UPDATE SET
+                    impairment_type = excluded.impairment_type,
+                    learning_objectives = excluded.learning_objectives,
+                    topic_stats = excluded.topic_stats,
+                    subtopic_stats = excluded.subtopic_stats,
+                    version = students.version + 1,
+                    updated_at = excluded.updated_at
+            ''', (
+                student_id,
+                data.get('impairment_type', 1),
+                json.dumps(data.get('learning_objectives', {}), ensure_ascii=False),
+                json.dumps(data.get('topic_stats', {}), ensure_ascii=False),
+                json.dumps(data.get('subtopic_stats', {}), ensure_ascii=False),
+                updated_at
+            ))
+            conn.executemany('''
+                INSERT INTO progress (student_id, topic, level, updated_at) VALUES (?, ?, ?, ?)
+                ON CONFLICT (student_id, topic) DO UPDATE SET
+                    level = excluded.level, updated_at = excluded.updated_at
+            ''', [(student_id, topic, level, updated_at)
+                  for topic, level in data.get('topic_progress', {}).items()])
+            return conn.execute('SELECT version FROM students WHERE student_id = ?',
+                                (student_id,)).fetchone()[0]
+
+    def version(self, student_id):
+        row = self._conn().execute('SELECT version FROM students WHERE student_id = ?',
+                                   (student_id,)).fetchone()
+        return row[0] if row else None
+
+    def has_history(self, student_id):
+        return self._conn().execute('SELECT 1 FROM performance_history WHERE student_id = ? LIMIT 1',
+                                    (student_id,)).fetchone() is not None
+
+    def append_history(self, student_id, records):
+        self.append_history_many({student_id: records})
+
+    def append_history_many(self, batches):
+        rows = [(student_id, r.get('topic') or '', r.get('subtopic'), int(bool(r.get('is_correct'))),
+                 r.get('response_time'), r.get('timestamp'))
+                for student_id, records in batches.items() for r in records]
+        if not rows:
+            return
+        with self.transaction() as conn:
+            conn.executemany('''
+                INSERT INTO performance_history
+                    (student_id, topic, subtopic, is_correct, response_time, created_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', rows)
+
+    @staticmethod
+    def _record(row):
+        return {
+            'timestamp': row['created_at'],
+            'topic': row['topic'],
+            'subtopic': row['subtopic'],
+            'is_correct': bool(row['is_correct']),
+            'response_time': row['response_time']
+        }
+
+    def history_tail(self, student_id, limit):
+        rows = self._conn().execute('''
+            SELECT * FROM performance_history WHERE student_id = ? ORDER BY id DESC LIMIT ?
+        ''', (student_id, limit)).fetchall()
+        return [self._record(row) for row in reversed(rows)]
+
+    def read_history(self, student_id, cursor=0):
+        rows = self._conn().execute('''
+            SELECT * FROM performance_history WHERE student_id = ? AND id > ? ORDER BY id
+        ''', (student_id, cursor)).fetchall()
+        if rows:
+            cursor = rows[-1]['id']
+        return [self._record(row) for row in rows], cursor
+
+    def student_ids(self):
+        return [row[0] for row in self._conn().execute('SELECT student_id FROM students')]
+
+    def weakest_students(self, topic, limit=10):
+        rows = self._conn().execute('''
+            SELECT student_id, level FROM progress WHERE topic = ? ORDER BY level LIMIT ?
+        ''', (topic, limit)).fetchall()
+        return [(row[0], row[1]) for row in rows]
+
+    def close(self):
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections = []
+        self._local = threading.local()
+
+
+class PostgresProfileStore(ProfileStore):
+    """Profiles in PostgreSQL through the pooled repository layer
+
+    The profile document goes into students.profile, topic levels into
+    progress (upserted in one statement per save) and answers into
+    performance_history in bulk. Locks are database advisory locks, so
+    workers on several machines can share one database.
+    """
+
+    def __init__(self, db=None):
+        from ..models.database import Database
+        from ..models.repositories import (PerformanceRepository, ProgressRepository,
+                                           StudentRepository)
+
+        self.db = db or Database()
+        self.students = StudentRepository(self.db)
+        self.progress = ProgressRepository(self.db)
+        self.performance = PerformanceRepository(self.db)
+
+    def lock(self, student_id):
+        return self.db.lock(f"student:{student_id}")
+
+    def load(self, student_id):
+        row = self.students.get(student_id)
+        if row is None:
+            return None, None
+        data = dict(row['profile'] or {})
+        data['student_id'] = student_id
+        data['impairment_type'] = row['impairment_type']
+        data['topic_progress'] = self.progress.get(student_id)
+        return data, row['version']
+
+    def save(self, student_id, data):
+        document = {key: value for key, value in data.items()
+                    if key not in ('student_id', 'impairment_type', 'topic_progress')}
+        updated_at = data.get('last_updated')
+        with self.db.cursor() as cursor:
+            version = self.students.save(cursor, student_id, data.get('impairment_type', 1),
+                                         document, updated_at)
+            self.progress.upsert_many(cursor, student_id, data.get('topic_progress', {}), updated_at)
+        return version
+
+    def version(self, student_id):
+        return self.students.version(student_id)
+
+    def has_history(self, student_id):
+        return self.performance.exists(student_id)
+
+    def append_history(self, student_id, records):
+        self.append_history_many({student_id: records})
+
+    def append_history_many(self, batches):
+        batches = {student_id: records for student_id, records in batches.items() if records}
+        if not batches:
+            return
+        with self.db.cursor() as cursor:
+            # History can arrive before the first profile save
+            self.students.ensure_many(cursor, list(batches))
+            self.performance.add_batches(cursor, batches)
+
+    def history_tail(self, student_id, limit):
+        return self.performance.recent(student_id, limit)
+
+    def read_history(self, student_id, cursor=0):
+        return self.performance.after(student_id, cursor)
+
+    def student_ids(self):
+        return self.students.ids()
+
+    def weakest_students(self, topic, limit=10):
+        return self.progress.weakest(topic, limit)
+
+    def close(self):
+        self.db.close()
+
+
+def create_profile_store(kind=None):
+    """Build the store named by kind, or by config.PROFILE_STORE"""
+    kind = kind or config.PROFILE_STORE
+    if kind == 'json':
+        return JsonProfileStore(PROFILES_DIR, config.HISTORY_COMPACT_BYTES)
+    if kind == 'sqlite':
+        return SqliteProfileStore(config.PROFILE_DB_PATH)
+    if kind == 'postgres':
+        return PostgresProfileStore()
+    raise ValueError(f"Unknown profile store: {kind}")
+
+
+_shared_store = None
+_shared_store_lock = threading.Lock()
+
+
+def get_profile_store():
+    """Return the process-wide profile store"""
+    global _shared_store
+    with _shared_store_lock:
+        if _shared_store is None:
+            _shared_store = create_profile_store()
+        return _shared_store
@@ -0,0 +1,92 @@
+# src/learning/profile_writer.py
+
+import threading
+
+
+class ProfileWriter:
+    """Write-behind flusher for student profiles
+
+    Profiles mark themselves dirty instead of saving on every answer. A
+    background thread writes all dirty profiles every `interval` seconds,
+    or sooner once `batch_size` distinct profiles are waiting, so many
+    answers from the same student coalesce into a single write.
+    """
+
+    def __init__(self, interval=5.0, batch_size=20):
+        self.interval = interval
+        self.batch_size = batch_size
+
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+
+        self.marked = 0
+        self.writes = 0
+        self.failures = 0
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='profile-writer',
+                                            daemon=True)
+            self._thread.start()
+        return self
+
+    def mark_dirty(self, profile):
+        """Queue a profile to be written on the next flush"""
+        with self._lock:
+            self._pending[profile.student_id] = profile
+            self.marked += 1
+            full = len(self._pending) >= self.batch_size
+        if full:
+            self._wake.set()
+
+    def discard(self, profile):
+        """Forget a pending profile (after it has been saved elsewhere)"""
+        with self._lock:
+            if self._pending.get(profile.student_id) is profile:
+                del self._pending[profile.student_id]
+
+    def flush(self):
+        """Write every pending profile now; returns the number written"""
+        with self._lock:
+            pending = list(self._pending.values())
+            self._pending.clear()
+
+        written = 0
+        for profile in pending:
+            if profile.flush():
+                written += 1
+            else:
+                self.failures += 1
+        self.writes += written
+        return written
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Error flushing profiles: {e}")
+
+    def stop(self):
+        """Stop the background thread after a final flush"""
+        self._stopped.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def stats(self):
+        with self._lock:
+            pending = len(self._pending)
+        return {
+            "pending": pending,
+            "marked": self.marked,
+            "writes": self.writes,
+            "failures": self.failures
+        }
@@ -1,12 +1,63 @@
 # src/learning/student_profile.py
 
-import json
-import os
+import copy
 import datetime
+import threading
 from collections import defaultdict
 
+import config
+from .history_columns import HistoryColumns
+from .profile_store import get_profile_store
+
+# Rough in-memory sizes used to budget the profile cache
+PROFILE_BASE_BYTES = 8192
+HISTORY_RECORD_BYTES = 600
+STATS_BYTES = 900
+
+# Weight of the newest answer in the running accuracy and response-time averages
+EWMA_ALPHA = 0.2
+
+def _new_stats():
+    return {
+        "attempts": 0,
+        "correct": 0,
+        "ewma_accuracy": None,
+        "ewma_response_time": None,
+        "current_streak": 0,
+        "best_streak": 0,
+        "last_seen": None
+    }
+
+def _update_stats(stats, is_correct, response_time, timestamp):
+    """Fold one answer into a rollup in constant time"""
+    hit = 1.0 if is_correct else 0.0
+    stats["attempts"] += 1
+    stats["correct"] += int(is_correct)
+    if stats["ewma_accuracy"] is None:
+        stats["ewma_accuracy"] = hit
+    else:
+        stats["ewma_accuracy"] += EWMA_ALPHA * (hit - stats["ewma_accuracy"])
+    if response_time is not None:
+        if stats["ewma_response_time"] is None:
+            stats["ewma_response_time"] = float(response_time)
+        else:
+            stats["ewma_response_time"] += EWMA_ALPHA * (response_time - stats["ewma_response_time"])
+    stats["current_streak"] = stats["current_streak"] + 1 if is_correct else 0
+    stats["best_streak"] = max(stats["best_streak"], stats["current_streak"])
+    stats["last_seen"] = timestamp
+
+def answer_record(topic, subtopic, is_correct, response_time=None):
+    """One answer as stored in the history, stamped with the current time"""
+    return {
+        'timestamp': datetime.datetime.now().isoformat(),
+        'topic': topic,
+        'subtopic': subtopic,
+        'is_correct': is_correct,
+        'response_time': response_time
+    }
+
 class StudentProfile:
-    def __init__(self, student_id, impairment_type=1):
+    def __init__(self, student_id, impairment_type=1, writer=None, multiprocess=None, store=None):
         """
         Initialize student profile
         
@@ -14,17 +65,52 @@ class StudentProfile:
         1 - Congenital blindness
         2 - Acquired blindness
         3 - Low vision
+        
+        writer: optional ProfileWriter; when given, updates mark the profile
+        dirty and the writer saves it in the background instead of on
+        every answer.
+        
+        multiprocess: several server processes share the profile files.
+        Each update then reloads the profile if another process changed
+        it and saves synchronously, all under a cross-process file lock.
+        Defaults to config.PROFILE_MULTIPROCESS.
+        
+        store: ProfileStore the profile and its history are kept in;
+        defaults to the process-wide store chosen by config.PROFILE_STORE.
         """
         self.student_id = student_id
         self.impairment_type = impairment_type
+        self.multiprocess = config.PROFILE_MULTIPROCESS if multiprocess is None else multiprocess
+        # Write-behind would let another process overwrite unsaved answers
+        self.writer = None if self.multiprocess else writer
+        self.dirty = False
+        self.store = store or get_profile_store()
         
+        # The store lock guards the student's stored data across threads and
+        # processes and is always taken before _lock, which guards in-memory state
+        self._file_lock = self.store.lock(student_id)
+        self._lock = threading.RLock()
+        self._version = None  # store version of the profile last read or written
+        
+        # Full history lives in the store; only a recent tail is kept here
+        self.history_tail = config.PROFILE_HISTORY_TAIL
+        self._history_columns = None  # (compacted_until, history cursor, HistoryColumns)
+        
+        self._reset_state()
+        
+        # Load existing profile if available
+        self._load_profile()
+    
+    def _reset_state(self):
         # Initialize learning progress
         self.topic_progress = defaultdict(lambda: 1)
         self.performance_history = []
-        self.learning_objectives = self._initialize_learning_objectives()
         
-        # Load existing profile if available
-        self._load_profile()
+        # Running rollups per topic and per topic/subtopic, updated on every answer
+        self.topic_stats = {}
+        self.subtopic_stats = {}
+        self._progress_total = 0
+        self.learning_objectives = self._initialize_learning_objectives()
     
     def _initialize_learning_objectives(self):
         """Initialize the 42 learning objectives from curriculum"""
@@ -50,91 +136,214 @@ class StudentProfile:
     
     def _load_profile(self):
         """Load existing profile if available"""
-        profile_path = os.path.join(os.path.dirname(__file__), 
-                               f'../data/profiles/{self.student_id}.json')
-        
-        if os.path.exists(profile_path):
-            try:
-                with open(profile_path, 'r', encoding='utf-8') as file:
-                    profile_data = json.load(file)
-                    
-                    # Load impairment type
-                    self.impairment_type = profile_data.get('impairment_type', 1)
-                    
-                    # Load topic progress
-                    for topic, level in profile_data.get('topic_progress', {}).items():
-                        self.topic_progress[topic] = level
-                    
-                    # Load performance history
-                    self.performance_history = profile_data.get('performance_history', [])
-                    
-                    # Load learning objectives
-                    objectives = profile_data.get('learning_objectives', {})
-                    for category, objectives_dict in objectives.items():
-                        if category in self.learning_objectives:
-                            for objective, level in objectives_dict.items():
-                                if objective in self.learning_objectives[category]:
-                                    self.learning_objectives[category][objective] = level
-            except Exception as e:
-                print(f"Error loading profile: {e}")
+        with self._file_lock, self._lock:
+            self._read_profile()
     
-    def save_profile(self):
-        """Save student profile to file"""
-        # Ensure directory exists
-        os.makedirs(os.path.join(os.path.dirname(__file__), '../data/profiles'), 
-                   exist_ok=True)
+    def _read_profile(self):
+        self._version = None
+        try:
+            profile_data, self._version = self.store.load(self.student_id)
+            if profile_data is not None:
+                # Load impairment type
+                self.impairment_type = profile_data.get('impairment_type', 1)
+                
+                # Load topic progress
+                for topic, level in profile_data.get('topic_progress', {}).items():
+                    self.topic_progress[topic] = level
+                
+                # Load rollups
+                self.topic_stats = profile_data.get('topic_stats', {})
+                self.subtopic_stats = profile_data.get('subtopic_stats', {})
+                
+                # Profiles saved before the history log kept every record inline
+                legacy_history = profile_data.get('performance_history')
+                if legacy_history and not self.store.has_history(self.student_id):
+                    self.store.append_history(self.student_id, legacy_history)
+                
+                # Load learning objectives
+                objectives = profile_data.get('learning_objectives', {})
+                for category, objectives_dict in objectives.items():
+                    if category in self.learning_objectives:
+                        for objective, level in objectives_dict.items():
+                            if objective in self.learning_objectives[category]:
+                                self.learning_objectives[category][objective] = level
+        except Exception as e:
+            print(f"Error loading profile: {e}")
+        
+        # Recent answers only; older ones are read from the log when needed
+        self.performance_history = self.store.history_tail(self.student_id, self.history_tail)
         
-        profile_path = os.path.join(os.path.dirname(__file__), 
-                               f'../data/profiles/{self.student_id}.json')
+        # Profiles saved before rollups existed: rebuild them once from the log
+        if not self.topic_stats and self.store.has_history(self.student_id):
+            self._rebuild_stats()
+        
+        self._progress_total = sum(self.topic_progress.values())
+    
+    def _rebuild_stats(self):
+        """Recompute rollups from the compacted summary and the full log"""
+        self.topic_stats = {}
+        self.subtopic_stats = {}
+        
+        # Compacted days only keep counts; streaks and averages start from the log
+        for day, topics in sorted(self.history_summary().get("days", {}).items()):
+            for topic, subtopics in topics.items():
+                for subtopic, totals in subtopics.items():
+                    for stats in self._stats_for(topic, subtopic):
+                        stats["attempts"] += totals["attempts"]
+                        stats["correct"] += totals["correct"]
+                        stats["last_seen"] = day
+        
+        for record in self.history_records():
+            for stats in self._stats_for(record.get("topic"), record.get("subtopic")):
+                _update_stats(stats, record.get("is_correct"), record.get("response_time"),
+                              record.get("timestamp"))
+    
+    def _stats_for(self, topic, subtopic):
+        """Rollups an answer on topic/subtopic contributes to, created on demand"""
+        rollups = [self.topic_stats.setdefault(topic, _new_stats())]
+        if subtopic:
+            rollups.append(self.subtopic_stats.setdefault(topic, {}).setdefault(subtopic, _new_stats()))
+        return rollups
+    
+    def reload_if_changed(self):
+        """Reload the profile if another process saved it since we last read or wrote it
+        
+        Returns True when the profile was reloaded. Profiles with unsaved
+        changes are left alone.
+        """
+        with self._file_lock, self._lock:
+            if self.dirty or self.store.version(self.student_id) == self._version:
+                return False
+            self._reset_state()
+            self._read_profile()
+            return True
+    
+    def history_records(self):
+        """Every uncompacted performance record, oldest first"""
+        return self.store.read_history(self.student_id)[0] or []
+    
+    def history_summary(self):
+        """Per-day rollups of compacted performance records"""
+        return self.store.history_summary(self.student_id)
+    
+    def history_columns(self):
+        """Columnar view of the full history for analytics
         
+        Cached between calls; only records appended to the log since the
+        last call are parsed. Compaction triggers a full rebuild.
+        """
+        with self._lock:
+            summary = self.history_summary()
+            compacted_until = summary.get("compacted_until")
+            cached = self._history_columns
+            
+            records = None
+            if cached is not None and cached[0] == compacted_until:
+                records, offset = self.store.read_history(self.student_id, cached[1])
+            if records is None:
+                records, offset = self.store.read_history(self.student_id)
+                columns = HistoryColumns.from_records(records or [], summary)
+            else:
+                columns = cached[2].extend(records)
+            
+            self._history_columns = (compacted_until, offset, columns)
+            return columns
+    
+    def save_profile(self):
+        """Save student profile to the store"""
         try:
-            profile_data = {
+            with self._file_lock:
+                self._write_profile()
+            return True
+        except Exception as e:
+            self.dirty = True
+            print(f"Error saving profile: {e}")
+            return False
+    
+    def _write_profile(self):
+        with self._lock:
+            # Snapshot under the lock so concurrent answers cannot change it mid-write
+            profile_data = copy.deepcopy({
                 'student_id': self.student_id,
                 'impairment_type': self.impairment_type,
                 'topic_progress': dict(self.topic_progress),
-                'performance_history': self.performance_history,
                 'learning_objectives': self.learning_objectives,
+                'topic_stats': self.topic_stats,
+                'subtopic_stats': self.subtopic_stats,
                 'last_updated': datetime.datetime.now().isoformat()
-            }
-            
-            with open(profile_path, 'w', encoding='utf-8') as file:
-                json.dump(profile_data, file, indent=2, ensure_ascii=False)
-                
+            })
+            self.dirty = False
+        
+        self._version = self.store.save(self.student_id, profile_data)
+    
+    def flush(self):
+        """Save the profile if it has unsaved changes"""
+        if not self.dirty:
             return True
-        except Exception as e:
-            print(f"Error saving profile: {e}")
-            return False
+        if self.writer is not None:
+            self.writer.discard(self)
+        return self.save_profile()
     
     def update_progress(self, topic, subtopic, is_correct, response_time=None):
         """Update student progress based on performance"""
-        # Record performance
-        performance_record = {
-            'timestamp': datetime.datetime.now().isoformat(),
-            'topic': topic,
-            'subtopic': subtopic,
-            'is_correct': is_correct,
-            'response_time': response_time
-        }
-        
-        self.performance_history.append(performance_record)
+        self.apply_answers([answer_record(topic, subtopic, is_correct, response_time)])
+    
+    def apply_answers(self, records, append_history=True):
+        """
+        Apply answer records in order and save the profile once
         
-        # Update topic progress
-        if is_correct:
-            self.topic_progress[topic] = min(10, self.topic_progress[topic] + 0.2)
-        else:
-            self.topic_progress[topic] = max(1, self.topic_progress[topic] - 0.1)
+        append_history: write the records to the store's history; pass
+        False when the caller batches them into the store itself (see
+        src/learning/answer_ingest.py).
+        """
+        with self._file_lock:
+            if self.multiprocess:
+                # Apply these answers on top of whatever other workers have saved
+                self.reload_if_changed()
+            if append_history:
+                self.store.append_history(self.student_id, records)
+            for performance_record in records:
+                self._apply_answer(performance_record)
+            
+            # Save the updated profile, or leave it to the write-behind flusher
+            if self.writer is not None:
+                self.writer.mark_dirty(self)
+            else:
+                self.save_profile()
+    
+    def _apply_answer(self, performance_record):
+        topic = performance_record['topic']
+        subtopic = performance_record['subtopic']
+        is_correct = performance_record['is_correct']
+        response_time = performance_record['response_time']
         
-        # Update specific learning objective if applicable
-        if topic in self.learning_objectives and subtopic in self.learning_objectives[topic]:
+        with self._lock:
+            # The store holds the full history; the profile JSON does not carry it
+            self.performance_history.append(performance_record)
+            if len(self.performance_history) > self.history_tail:
+                del self.performance_history[:-self.history_tail]
+            
+            for stats in self._stats_for(topic, subtopic):
+                _update_stats(stats, is_correct, response_time, performance_record['timestamp'])
+            
+            # Update topic progress, keeping the running total for the overall level
+            previous = self.topic_progress.get(topic, 0)
             if is_correct:
-                self.learning_objectives[topic][subtopic] = min(
-                    10, self.learning_objectives[topic][subtopic] + 0.2)
+                self.topic_progress[topic] = min(10, self.topic_progress[topic] + 0.2)
             else:
-                self.learning_objectives[topic][subtopic] = max(
-                    1, self.learning_objectives[topic][subtopic] - 0.1)
-        
-        # Save the updated profile
-        self.save_profile()
+                self.topic_progress[topic] = max(1, self.topic_progress[topic] - 0.1)
+            self._progress_total += self.topic_progress[topic] - previous
+            
+            # Update specific learning objective if applicable
+            if topic in self.learning_objectives and subtopic in self.learning_objectives[topic]:
+                if is_correct:
+                    self.learning_objectives[topic][subtopic] = min(
+                        10, self.learning_objectives[topic][subtopic] + 0.2)
+                else:
+                    self.learning_objectives[topic][subtopic] = max(
+                        1, self.learning_objectives[topic][subtopic] - 0.1)
+            
+            self.dirty = True
     
     def get_proficiency_level(self, topic=None, subtopic=None):
         """Get student's proficiency level overall or for specific topic"""
@@ -148,9 +357,35 @@ class StudentProfile:
         
         # Overall proficiency is average of all topics
         if len(self.topic_progress) > 0:
-            return sum(self.topic_progress.values()) / len(self.topic_progress)
+            return self._progress_total / len(self.topic_progress)
         return 1
     
+    def memory_estimate(self):
+        """Approximate bytes held by this profile, for cache budgeting"""
+        with self._lock:
+            size = PROFILE_BASE_BYTES + HISTORY_RECORD_BYTES * len(self.performance_history)
+            rollups = len(self.topic_stats) + sum(len(s) for s in self.subtopic_stats.values())
+            size += STATS_BYTES * rollups
+            if self._history_columns is not None:
+                size += self._history_columns[2].nbytes()
+            return size
+    
+    def get_topic_stats(self, topic=None, subtopic=None):
+        """Rollup for a topic or topic/subtopic, or every topic's rollup
+        
+        Returns attempts, correct, ewma_accuracy, ewma_response_time,
+        current_streak, best_streak and last_seen. Unseen topics get an
+        empty rollup.
+        """
+        with self._lock:
+            if topic is None:
+                return {name: dict(stats) for name, stats in self.topic_stats.items()}
+            if subtopic:
+                stats = self.subtopic_stats.get(topic, {}).get(subtopic)
+            else:
+                stats = self.topic_stats.get(topic)
+            return dict(stats) if stats else _new_stats()
+    
     def get_learning_path(self):
         """Generate personalized learning path based on profile"""
         # Identify weakest areas
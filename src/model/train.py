@@ -6,16 +6,30 @@ from transformers import (
     Trainer,
     DataCollatorForLanguageModeling
 )
-from datasets import load_dataset, DatasetDict
+from datasets import Dataset, DatasetDict, concatenate_datasets
 from peft import prepare_model_for_kbit_training, LoraConfig, get_peft_model
+from src.data.build_dataset import training_shard_paths
+from src.data.dedup import is_validation, text_key
 
-def prepare_dataset(tokenizer):
-    """Load and prepare the dataset for training"""
+# Arrow shards written by src/data/build_dataset.py or generate_training_data.py
+DATASET_DIR = "data/processed/math_problems"
+
+VALIDATION_FRACTION = 0.1
+
+def prepare_dataset(tokenizer, data_dir=DATASET_DIR, disjoint_splits=True):
+    """
+    Load and prepare the dataset for training
+    
+    disjoint_splits: pick validation rows by a hash of the problem text, so
+    a problem repeated in the data is always on the same side and never
+    in both splits. False gives the plain random split.
+    """
     try:
-        # Load the dataset
-        dataset = load_dataset("json", 
-                             data_files="data/processed/math_problems.json",
-                             field="problems")
+        # Memory-map the Arrow shards; nothing is parsed or copied into memory
+        # No dataset at all falls back to a sample below; a build in
+        # another format raises ValueError saying what to rebuild
+        paths = training_shard_paths(data_dir)
+        dataset = {"train": concatenate_datasets([Dataset.from_file(path) for path in paths])}
         
         def format_for_model(examples):
             """Format examples for model training"""
@@ -47,28 +61,45 @@ def prepare_dataset(tokenizer):
             
             return tokenized
 
-        # Process dataset
-        processed_dataset = dataset["train"].map(
-            format_for_model,
-            batched=True,
-            remove_columns=dataset["train"].column_names,
-            desc="Processing dataset"
-        )
-        
         # Split into train and validation
-        splits = processed_dataset.train_test_split(test_size=0.1, seed=42)
+        if disjoint_splits:
+            def mark_validation(examples):
+                return {"validation": [
+                    is_validation(text_key(t, d, q), VALIDATION_FRACTION)
+                    for t, d, q in zip(examples['type'], examples['difficulty'], examples['question'])
+                ]}
+            
+            marked = dataset["train"].map(mark_validation, batched=True, desc="Splitting dataset")
+            splits = {
+                "train": marked.filter(lambda examples: [not v for v in examples["validation"]],
+                                       batched=True),
+                "test": marked.filter(lambda examples: examples["validation"], batched=True)
+            }
+        else:
+            splits = dataset["train"].train_test_split(test_size=VALIDATION_FRACTION, seed=42)
+        
+        # Process dataset
+        processed = {
+            name: split.map(
+                format_for_model,
+                batched=True,
+                remove_columns=split.column_names,
+                desc="Processing dataset"
+            )
+            for name, split in splits.items()
+        }
         
         return DatasetDict({
-            "train": splits["train"],
-            "validation": splits["test"]
+            "train": processed["train"],
+            "validation": processed["test"]
         })
         
     except FileNotFoundError:
         print("Error: Training data file not found. Generating sample data...")
         from src.data.generate_training_data import generate_training_dataset
-        generate_training_dataset()
+        generate_training_dataset(output_dir=data_dir)
         # Try loading again
-        return prepare_dataset(tokenizer)
+        return prepare_dataset(tokenizer, data_dir)
 
 def prepare_model():
     # Load base model
@@ -1,61 +1,248 @@
 import os
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+
 import psycopg2
 from psycopg2.extras import RealDictCursor
+from psycopg2.pool import PoolError, ThreadedConnectionPool
 import config
 
+# Connections idle longer than this are checked with a round trip before reuse
+HEALTH_CHECK_IDLE_SECONDS = 30
+
+# How long a thread waits for a free pooled connection before giving up
+POOL_WAIT_SECONDS = 30
+
+class AdvisoryLock:
+    """Reentrant lock shared by every process using the database
+
+    Holds a PostgreSQL session advisory lock on a pooled connection while
+    acquired, so workers on different machines serialize on the same key.
+    The connection is pinned to the holding thread: queries it runs through
+    Database.connection() while holding the lock use that same connection
+    instead of taking a second one from the pool.
+    """
+
+    def __init__(self, db, name):
+        self.db = db
+        self.name = name
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._conn = None
+
+    def acquire(self):
+        self._lock.acquire()
+        if self._depth == 0:
+            try:
+                conn = self.db._pin()
+                try:
+                    with conn.cursor() as cursor:
+                        cursor.execute('SELECT pg_advisory_lock(hashtext(%s))', (self.name,))
+                    conn.commit()
+                except BaseException:
+                    self.db._unpin(close=True)
+                    raise
+            except BaseException:
+                self._lock.release()
+                raise
+            self._conn = conn
+        self._depth += 1
+        return self
+
+    def release(self):
+        self._depth -= 1
+        if self._depth == 0:
+            conn, self._conn = self._conn, None
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute('SELECT pg_advisory_unlock(hashtext(%s))', (self.name,))
+                conn.commit()
+                self.db._unpin()
+            except Exception:
+                # Closing the session releases its advisory locks
+                self.db._unpin(close=True)
+        self._lock.release()
+
+    def __enter__(self):
+        return self.acquire()
+
+    def __exit__(self, *exc_info):
+        self.release()
+
 class Database:
-    def __init__(self):
-        self.conn = None
+    def __init__(self, dsn=None, minconn=None, maxconn=None):
+        """
+        Thread-safe PostgreSQL access through a connection pool
+
+        dsn defaults to config.DATABASE_URL; pass another one to run
+        against a throwaway database.
+        """
+        self.dsn = dsn or config.DATABASE_URL
+        self.minconn = minconn or config.DATABASE_POOL_MIN
+        self.maxconn = maxconn or config.DATABASE_POOL_MAX
+        self.pool = None
+        self._last_used = {}
+        self._lock = threading.Lock()
+        # ThreadedConnectionPool raises instead of waiting when it runs dry
+        self._available = threading.BoundedSemaphore(self.maxconn)
+        self._local = threading.local()
+        self._advisory_locks = weakref.WeakValueDictionary()
         self.connect()
-        
+
     def connect(self):
-        """Connect to PostgreSQL database"""
+        """Create the connection pool and the tables"""
         try:
-            self.conn = psycopg2.connect(config.DATABASE_URL)
+            self.pool = ThreadedConnectionPool(self.minconn, self.maxconn, self.dsn)
             self.create_tables()
             return True
         except Exception as e:
             print(f"Database connection error: {e}")
+            # Retried on the next request
+            self.close()
+            return False
+
+    def _healthy(self, conn):
+        if conn.closed:
+            return False
+        with self._lock:
+            last_used = self._last_used.get(id(conn), 0)
+        if time.monotonic() - last_used < HEALTH_CHECK_IDLE_SECONDS:
+            return True
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            conn.rollback()
+            return True
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
             return False
-            
+
+    def _getconn(self):
+        """Take a pooled connection, replacing dead ones
+
+        Waits up to POOL_WAIT_SECONDS for one to be returned when all
+        maxconn are in use.
+        """
+        if self.pool is None and not self.connect():
+            raise psycopg2.OperationalError("Database is unavailable")
+
+        if not self._available.acquire(timeout=POOL_WAIT_SECONDS):
+            raise PoolError("Timed out waiting for a database connection")
+        try:
+            for _ in range(self.maxconn + 1):
+                conn = self.pool.getconn()
+                if self._healthy(conn):
+                    return conn
+                # Server restarted or connection dropped: discard and try another
+                self.pool.putconn(conn, close=True)
+        except BaseException:
+            self._available.release()
+            raise
+        self._available.release()
+        raise psycopg2.OperationalError("No healthy database connection available")
+
+    def _putconn(self, conn, close=False):
+        with self._lock:
+            if close:
+                self._last_used.pop(id(conn), None)
+            else:
+                self._last_used[id(conn)] = time.monotonic()
+        try:
+            self.pool.putconn(conn, close=close)
+        finally:
+            self._available.release()
+
+    def _pin(self):
+        """The calling thread's pinned connection, taken from the pool on first use"""
+        local = self._local
+        if getattr(local, 'conn', None) is None:
+            local.conn = self._getconn()
+            local.pins = 0
+            local.broken = False
+            local.transaction = False
+        local.pins += 1
+        return local.conn
+
+    def _unpin(self, close=False):
+        """Drop one pin; the connection goes back to the pool with the last one"""
+        local = self._local
+        local.broken = local.broken or close
+        local.pins -= 1
+        if local.pins == 0:
+            conn, local.conn = local.conn, None
+            self._putconn(conn, close=local.broken)
+
+    @contextmanager
+    def _pinned_transaction(self, conn):
+        local = self._local
+        if local.transaction:
+            # Nested inside another transaction on this connection
+            yield conn
+            return
+        local.transaction = True
+        try:
+            yield conn
+            conn.commit()
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            local.broken = True
+            raise
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            local.transaction = False
+
+    @contextmanager
+    def connection(self):
+        """Pooled connection for one transaction; commits on success, rolls back on error
+
+        A thread holding an AdvisoryLock gets the lock's connection.
+        """
+        pinned = getattr(self._local, 'conn', None)
+        if pinned is not None:
+            with self._pinned_transaction(pinned) as conn:
+                yield conn
+            return
+
+        conn = self._getconn()
+        try:
+            yield conn
+            conn.commit()
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            # The connection itself is broken; do not return it to the pool
+            self._putconn(conn, close=True)
+            raise
+        except BaseException:
+            conn.rollback()
+            self._putconn(conn)
+            raise
+        self._putconn(conn)
+
+    @contextmanager
+    def cursor(self, dict_rows=False):
+        """Cursor inside a pooled transaction"""
+        with self.connection() as conn:
+            with conn.cursor(cursor_factory=RealDictCursor if dict_rows else None) as cursor:
+                yield cursor
+
+    def lock(self, name):
+        """The shared AdvisoryLock for name; one object per name in this process"""
+        with self._lock:
+            lock = self._advisory_locks.get(name)
+            if lock is None:
+                lock = AdvisoryLock(self, name)
+                self._advisory_locks[name] = lock
+            return lock
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.closeall()
+            self.pool = None
+
     def create_tables(self):
-        """Create necessary tables if they don't exist"""
-        cursor = self.conn.cursor()
-        
-        # Create students table
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS students (
-            id SERIAL PRIMARY KEY,
-            student_id VARCHAR(20) UNIQUE NOT NULL,
-            impairment_type INTEGER NOT NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-        ''')
-        
-        # Create progress table
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS progress (
-            id SERIAL PRIMARY KEY,
-            student_id VARCHAR(20) REFERENCES students(student_id),
-            topic VARCHAR(50) NOT NULL,
-            level FLOAT NOT NULL,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-        ''')
-        
-        # Create performance_history table
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS performance_history (
-            id SERIAL PRIMARY KEY,
-            student_id VARCHAR(20) REFERENCES students(student_id),
-            topic VARCHAR(50) NOT NULL,
-            question_type VARCHAR(50) NOT NULL,
-            difficulty INTEGER NOT NULL,
-            is_correct BOOLEAN NOT NULL,
-            response_time FLOAT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-        ''')
-        
-        self.conn.commit()
-        cursor.close()
\ No newline at end of file
+        """Bring the schema up to date (see src/models/migrations.py)"""
+        from .migrations import migrate
+        applied = migrate(self)
+        if applied:
+            print(f"Applied schema migrations: {applied}")
@@ -0,0 +1,256 @@
+import argparse
+import datetime
+
+# Taken for the duration of a migration run so two workers starting at once
+# do not apply the same step twice
+MIGRATION_LOCK_KEY = 'mathlearn:schema_migrations'
+
+# Monthly partitions created ahead of the current month
+PARTITION_MONTHS_AHEAD = 3
+
+def _month_start(day):
+    return datetime.date(day.year, day.month, 1)
+
+def _next_month(month):
+    return datetime.date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+def _partition_name(month):
+    return f"performance_history_y{month.year}m{month.month:02d}"
+
+def ensure_history_partitions(cursor, start=None, months_ahead=PARTITION_MONTHS_AHEAD):
+    """Create monthly partitions of performance_history from start through months_ahead"""
+    today = datetime.date.today()
+    month = _month_start(start or today)
+    last = _month_start(today)
+    for _ in range(months_ahead):
+        last = _next_month(last)
+
+    created = []
+    while month <= last:
+        name = _partition_name(month)
+        # Fails if the default partition already holds rows for this month;
+        # those rows stay there and the rest of the run carries on
+        cursor.execute('SAVEPOINT create_partition')
+        try:
+            cursor.execute(f'''
+            CREATE TABLE IF NOT EXISTS {name} PARTITION OF performance_history
+                FOR VALUES FROM (%s) TO (%s)
+            ''', (month, _next_month(month)))
+            cursor.execute('RELEASE SAVEPOINT create_partition')
+            created.append(name)
+        except Exception as e:
+            cursor.execute('ROLLBACK TO SAVEPOINT create_partition')
+            print(f"Could not create partition {name}: {e}")
+        month = _next_month(month)
+    return created
+
+def drop_history_partitions(cursor, retain_months):
+    """Drop monthly partitions entirely older than retain_months; returns their names"""
+    cutoff = _month_start(datetime.date.today())
+    for _ in range(retain_months):
+        cutoff = datetime.date(cutoff.year - (cutoff.month == 1), (cutoff.month - 2) % 12 + 1, 1)
+
+    cursor.execute('''
+    SELECT child.relname FROM pg_inherits
+    JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+    JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+    WHERE parent.relname = 'performance_history' AND child.relname LIKE 'performance_history_y%'
+    ''')
+    dropped = []
+    for (name,) in cursor.fetchall():
+        month = datetime.date(int(name[-7:-3]), int(name[-2:]), 1)
+        if month < cutoff:
+            cursor.execute(f'DROP TABLE {name}')
+            dropped.append(name)
+    return dropped
+
+def _initial_schema(cursor):
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS students (
+        id SERIAL PRIMARY KEY,
+        student_id VARCHAR(20) UNIQUE NOT NULL,
+        impairment_type INTEGER NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+
+    # Profile fields without their own tables, and a version for change detection
+    cursor.execute('''
+    ALTER TABLE students
+        ADD COLUMN IF NOT EXISTS profile JSONB NOT NULL DEFAULT '{}',
+        ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 0,
+        ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP
+    ''')
+
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS progress (
+        id SERIAL PRIMARY KEY,
+        student_id VARCHAR(20) REFERENCES students(student_id),
+        topic VARCHAR(50) NOT NULL,
+        level FLOAT NOT NULL,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+
+    # One row per student and topic, so progress can be upserted
+    cursor.execute('''
+    CREATE UNIQUE INDEX IF NOT EXISTS progress_student_topic
+        ON progress (student_id, topic)
+    ''')
+
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS performance_history (
+        id SERIAL PRIMARY KEY,
+        student_id VARCHAR(20) REFERENCES students(student_id),
+        topic VARCHAR(50) NOT NULL,
+        question_type VARCHAR(50) NOT NULL,
+        difficulty INTEGER NOT NULL,
+        is_correct BOOLEAN NOT NULL,
+        response_time FLOAT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+
+def _partition_history(cursor):
+    """Rebuild performance_history as a table range-partitioned by month
+
+    The primary key has to include the partition key, so it becomes
+    (id, created_at). Existing rows are copied into their month's partition.
+    """
+    cursor.execute('ALTER TABLE performance_history RENAME TO performance_history_unpartitioned')
+    cursor.execute('ALTER SEQUENCE performance_history_id_seq OWNED BY NONE')
+
+    cursor.execute('''
+    CREATE TABLE performance_history (
+        id BIGINT NOT NULL DEFAULT nextval('performance_history_id_seq'),
+        student_id VARCHAR(20) REFERENCES students(student_id),
+        topic VARCHAR(50) NOT NULL,
+        question_type VARCHAR(50) NOT NULL,
+        difficulty INTEGER NOT NULL,
+        is_correct BOOLEAN NOT NULL,
+        response_time FLOAT,
+        created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (id, created_at)
+    ) PARTITION BY RANGE (created_at)
+    ''')
+    cursor.execute('ALTER SEQUENCE performance_history_id_seq OWNED BY performance_history.id')
+
+    # Rows outside every monthly partition land here instead of failing
+    cursor.execute('''
+    CREATE TABLE performance_history_default PARTITION OF performance_history DEFAULT
+    ''')
+
+    cursor.execute('SELECT MIN(created_at) FROM performance_history_unpartitioned')
+    oldest = cursor.fetchone()[0]
+    ensure_history_partitions(cursor, start=oldest.date() if oldest else None)
+
+    cursor.execute('''
+    INSERT INTO performance_history
+    SELECT id, student_id, topic, question_type, difficulty, is_correct, response_time,
+           COALESCE(created_at, CURRENT_TIMESTAMP)
+    FROM performance_history_unpartitioned
+    ''')
+    cursor.execute('DROP TABLE performance_history_unpartitioned')
+
+def _history_indexes(cursor):
+    # Per-student history by topic and time: reports, tails and windows
+    cursor.execute('''
+    CREATE INDEX IF NOT EXISTS performance_history_student_topic_created
+        ON performance_history (student_id, topic, created_at)
+    ''')
+    # Incremental reads after a known id
+    cursor.execute('''
+    CREATE INDEX IF NOT EXISTS performance_history_student_id
+        ON performance_history (student_id, id)
+    ''')
+    # Cross-student questions such as the weakest students on a topic
+    cursor.execute('''
+    CREATE INDEX IF NOT EXISTS progress_topic_level ON progress (topic, level)
+    ''')
+
+def _daily_rollup(cursor):
+    cursor.execute('''
+    CREATE MATERIALIZED VIEW IF NOT EXISTS performance_daily AS
+    SELECT student_id,
+           topic,
+           created_at::date AS day,
+           COUNT(*) AS attempts,
+           COUNT(*) FILTER (WHERE is_correct) AS correct,
+           AVG(response_time) AS mean_response_time
+    FROM performance_history
+    GROUP BY student_id, topic, created_at::date
+    ''')
+    # REFRESH ... CONCURRENTLY needs a unique index over every row
+    cursor.execute('''
+    CREATE UNIQUE INDEX IF NOT EXISTS performance_daily_key
+        ON performance_daily (student_id, topic, day)
+    ''')
+
+# (version, name, step); steps run in order, each in its own transaction
+MIGRATIONS = [
+    (1, 'initial schema', _initial_schema),
+    (2, 'partition performance_history by month', _partition_history),
+    (3, 'composite indexes', _history_indexes),
+    (4, 'daily performance rollup', _daily_rollup),
+]
+
+def applied_versions(cursor):
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        version INTEGER PRIMARY KEY,
+        name VARCHAR(100) NOT NULL,
+        applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+    cursor.execute('SELECT version FROM schema_migrations')
+    return {row[0] for row in cursor.fetchall()}
+
+def migrate(db):
+    """Apply pending migrations; returns the versions applied"""
+    applied = []
+    with db.lock(MIGRATION_LOCK_KEY):
+        with db.cursor() as cursor:
+            done = applied_versions(cursor)
+        for version, name, step in MIGRATIONS:
+            if version in done:
+                continue
+            with db.cursor() as cursor:
+                step(cursor)
+                cursor.execute('INSERT INTO schema_migrations (version, name) VALUES (%s, %s)',
+                               (version, name))
+            applied.append(version)
+
+        # Keep next months' partitions in place on every start
+        with db.cursor() as cursor:
+            ensure_history_partitions(cursor)
+    return applied
+
+def refresh_rollups(db):
+    """Refresh the daily rollup without blocking readers"""
+    with db.cursor() as cursor:
+        cursor.execute('REFRESH MATERIALIZED VIEW CONCURRENTLY performance_daily')
+
+def main():
+    from .database import Database
+
+    parser = argparse.ArgumentParser(description="Schema migrations and history maintenance")
+    parser.add_argument("--dsn", help="database URL (default: config.DATABASE_URL)")
+    parser.add_argument("--refresh", action="store_true", help="refresh the daily rollup view")
+    parser.add_argument("--retain-months", type=int,
+                        help="drop history partitions older than this many months")
+    args = parser.parse_args()
+
+    db = Database(dsn=args.dsn)
+    if db.pool is None:
+        return
+    if args.refresh:
+        refresh_rollups(db)
+        print("Refreshed performance_daily")
+    if args.retain_months is not None:
+        with db.cursor() as cursor:
+            dropped = drop_history_partitions(cursor, args.retain_months)
+        print(f"Dropped {len(dropped)} partitions: {', '.join(dropped) or 'none'}")
+    db.close()
+
+if __name__ == "__main__":
+    main()
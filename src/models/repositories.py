@@ -0,0 +1,231 @@
+import argparse
+import datetime
+import io
+import time
+
+from psycopg2.extras import Json, execute_values
+
+# Batches at least this large go through COPY instead of a multi-row INSERT
+COPY_THRESHOLD = 1000
+
+class StudentRepository:
+    def __init__(self, db):
+        self.db = db
+
+    def ensure(self, cursor, student_id, impairment_type=1):
+        """Create the student row if it is missing, inside the caller's transaction"""
+        cursor.execute('''
+        INSERT INTO students (student_id, impairment_type) VALUES (%s, %s)
+        ON CONFLICT (student_id) DO NOTHING
+        ''', (student_id, impairment_type))
+
+    def ensure_many(self, cursor, student_ids, impairment_type=1):
+        """Create any missing student rows in one statement"""
+        execute_values(cursor, '''
+        INSERT INTO students (student_id, impairment_type) VALUES %s
+        ON CONFLICT (student_id) DO NOTHING
+        ''', [(student_id, impairment_type) for student_id in student_ids])
+
+    def get(self, student_id):
+        with self.db.cursor(dict_rows=True) as cursor:
+            cursor.execute('''
+            SELECT student_id, impairment_type, profile, version, updated_at
+            FROM students WHERE student_id = %s
+            ''', (student_id,))
+            return cursor.fetchone()
+
+    def save(self, cursor, student_id, impairment_type, profile, updated_at=None):
+        """Upsert a student and bump its version; returns the new version"""
+        cursor.execute('''
+        INSERT INTO students (student_id, impairment_type, profile, version, updated_at)
+        VALUES (%s, %s, %s, 1, %s)
+        ON CONFLICT (student_id) DO UPDATE SET
+            impairment_type = EXCLUDED.impairment_type,
+            profile = EXCLUDED.profile,
+            version = students.version + 1,
+            updated_at = EXCLUDED.updated_at
+        RETURNING version
+        ''', (student_id, impairment_type, Json(profile), updated_at))
+        return cursor.fetchone()[0]
+
+    def version(self, student_id):
+        with self.db.cursor() as cursor:
+            cursor.execute('SELECT version FROM students WHERE student_id = %s', (student_id,))
+            row = cursor.fetchone()
+            return row[0] if row else None
+
+    def ids(self):
+        with self.db.cursor() as cursor:
+            cursor.execute('SELECT student_id FROM students')
+            return [row[0] for row in cursor.fetchall()]
+
+class ProgressRepository:
+    def __init__(self, db):
+        self.db = db
+
+    def upsert_many(self, cursor, student_id, levels, updated_at=None):
+        """Write every topic level for a student in one statement"""
+        if not levels:
+            return
+        execute_values(cursor, '''
+        INSERT INTO progress (student_id, topic, level, updated_at) VALUES %s
+        ON CONFLICT (student_id, topic) DO UPDATE SET
+            level = EXCLUDED.level,
+            updated_at = EXCLUDED.updated_at
+        ''', [(student_id, topic, level, updated_at) for topic, level in levels.items()],
+            template='(%s, %s, %s, COALESCE(%s::timestamp, CURRENT_TIMESTAMP))')
+
+    def get(self, student_id):
+        with self.db.cursor() as cursor:
+            cursor.execute('SELECT topic, level FROM progress WHERE student_id = %s', (student_id,))
+            return dict(cursor.fetchall())
+
+    def weakest(self, topic, limit=10):
+        with self.db.cursor() as cursor:
+            cursor.execute('''
+            SELECT student_id, level FROM progress WHERE topic = %s ORDER BY level LIMIT %s
+            ''', (topic, limit))
+            return [tuple(row) for row in cursor.fetchall()]
+
+class PerformanceRepository:
+    COLUMNS = ('student_id', 'topic', 'question_type', 'difficulty', 'is_correct',
+               'response_time', 'created_at')
+
+    def __init__(self, db):
+        self.db = db
+
+    def _rows(self, student_id, records):
+        return [(
+            student_id,
+            record.get('topic') or '',
+            record.get('subtopic') or '',
+            record.get('difficulty') or 0,
+            bool(record.get('is_correct')),
+            record.get('response_time'),
+            record.get('timestamp')
+        ) for record in records]
+
+    def add_many(self, cursor, student_id, records):
+        """Insert answer records in bulk: COPY for large batches, multi-row INSERT otherwise"""
+        self._insert(cursor, self._rows(student_id, records))
+
+    def add_batches(self, cursor, batches):
+        """Insert {student_id: records} for many students in one bulk write"""
+        rows = []
+        for student_id, records in batches.items():
+            rows.extend(self._rows(student_id, records))
+        self._insert(cursor, rows)
+
+    def _insert(self, cursor, rows):
+        if not rows:
+            return
+        if len(rows) >= COPY_THRESHOLD:
+            self._copy(cursor, rows)
+        else:
+            execute_values(cursor, f'''
+            INSERT INTO performance_history ({', '.join(self.COLUMNS)}) VALUES %s
+            ''', rows, template='(%s, %s, %s, %s, %s, %s, COALESCE(%s::timestamp, CURRENT_TIMESTAMP))')
+
+    def _copy(self, cursor, rows):
+        buffer = io.StringIO()
+        for row in rows:
+            buffer.write('\t'.join(self._copy_value(value) for value in row) + '\n')
+        buffer.seek(0)
+        cursor.copy_expert(
+            f"COPY performance_history ({', '.join(self.COLUMNS)}) FROM STDIN", buffer)
+
+    @staticmethod
+    def _copy_value(value):
+        if value is None:
+            return '\\N'
+        if isinstance(value, bool):
+            return 't' if value else 'f'
+        text = str(value)
+        return text.replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+
+    @staticmethod
+    def _record(row):
+        return {
+            'timestamp': row['created_at'].isoformat(),
+            'topic': row['topic'],
+            'subtopic': row['question_type'] or None,
+            'difficulty': row['difficulty'],
+            'is_correct': row['is_correct'],
+            'response_time': row['response_time']
+        }
+
+    def exists(self, student_id):
+        with self.db.cursor() as cursor:
+            cursor.execute('SELECT 1 FROM performance_history WHERE student_id = %s LIMIT 1',
+                           (student_id,))
+            return cursor.fetchone() is not None
+
+    def recent(self, student_id, limit):
+        """The last `limit` records, oldest first"""
+        with self.db.cursor(dict_rows=True) as cursor:
+            cursor.execute('''
+            SELECT * FROM performance_history WHERE student_id = %s ORDER BY id DESC LIMIT %s
+            ''', (student_id, limit))
+            return [self._record(row) for row in reversed(cursor.fetchall())]
+
+    def daily(self, student_id, since=None):
+        """Per-topic daily totals from the performance_daily rollup view"""
+        with self.db.cursor(dict_rows=True) as cursor:
+            cursor.execute('''
+            SELECT topic, day, attempts, correct, mean_response_time FROM performance_daily
+            WHERE student_id = %s AND day >= COALESCE(%s, '-infinity'::date)
+            ORDER BY day, topic
+            ''', (student_id, since))
+            return cursor.fetchall()
+
+    def after(self, student_id, last_id=0):
+        """Records with id greater than last_id, and the largest id returned"""
+        with self.db.cursor(dict_rows=True) as cursor:
+            cursor.execute('''
+            SELECT * FROM performance_history WHERE student_id = %s AND id > %s ORDER BY id
+            ''', (student_id, last_id))
+            rows = cursor.fetchall()
+        if rows:
+            last_id = rows[-1]['id']
+        return [self._record(row) for row in rows], last_id
+
+def main():
+    """Round-trip a batch through the repositories on a throwaway database"""
+    from .database import Database
+
+    parser = argparse.ArgumentParser(description="Repository layer smoke check")
+    parser.add_argument("--dsn", required=True, help="throwaway PostgreSQL database")
+    parser.add_argument("--records", type=int, default=5000)
+    args = parser.parse_args()
+
+    db = Database(dsn=args.dsn)
+    students = StudentRepository(db)
+    progress = ProgressRepository(db)
+    performance = PerformanceRepository(db)
+
+    student_id = f"smoke-{int(time.time())}"
+    now = datetime.datetime.now()
+    records = [{
+        'timestamp': (now - datetime.timedelta(seconds=i)).isoformat(),
+        'topic': 'division',
+        'subtopic': 'long_division',
+        'is_correct': i % 3 != 0,
+        'response_time': 4.5
+    } for i in range(args.records)]
+
+    started = time.perf_counter()
+    with db.cursor() as cursor:
+        students.save(cursor, student_id, 1, {})
+        progress.upsert_many(cursor, student_id, {'division': 2.5, 'addition': 6.0})
+        performance.add_many(cursor, student_id, records)
+    elapsed = time.perf_counter() - started
+
+    stored, _ = performance.after(student_id)
+    assert len(stored) == args.records, f"expected {args.records} records, got {len(stored)}"
+    assert progress.get(student_id) == {'division': 2.5, 'addition': 6.0}
+    print(f"Wrote {args.records} records in {elapsed * 1000:.1f} ms; "
+          f"weakest in division: {progress.weakest('division', 3)}")
+    db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# src/nlp/aho_corasick.py
+
+from collections import deque
+
+
+class AhoCorasick:
+    """Multi-pattern string matcher built once from a set of patterns
+
+    Scanning is a single linear pass over the text regardless of how many
+    patterns there are. Each pattern can carry a value (for example the
+    English name of a Sinhala term) that is returned with its matches.
+    """
+
+    def __init__(self, patterns):
+        # patterns: mapping of pattern string -> value
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [None]      # (length, value) of the pattern ending here
+        self._dict_link = [0]      # nearest proper suffix node with an output
+
+        for pattern, value in patterns.items():
+            if pattern:
+                self._add(pattern, value)
+        self._build_links()
+
+    def _add(self, pattern, value):
+        node = 0
+        for char in pattern:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][char] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(None)
+                self._dict_link.append(0)
+            node = next_node
+        if self._output[node] is None:
+            self._output[node] = (len(pattern), value)
+
+    def _build_links(self):
+        """Breadth-first pass filling failure and dictionary-suffix links"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+
+                suffix = self._fail[child]
+                self._dict_link[child] = suffix if self._output[suffix] else self._dict_link[suffix]
+
+    def __len__(self):
+        return sum(1 for output in self._output if output)
+
+    def iter_matches(self, text):
+        """Yield (start, end, value) for every occurrence, overlaps included"""
+        goto, fail, output, dict_link = self._goto, self._fail, self._output, self._dict_link
+        node = 0
+        for index, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+
+            match = node if output[node] else dict_link[node]
+            while match:
+                length, value = output[match]
+                yield index + 1 - length, index + 1, value
+                match = dict_link[match]
+
+    def find_longest(self, text):
+        """Return leftmost non-overlapping matches, longest first at each position
+
+        A term embedded in a longer one (කෝණය inside ත්‍රිකෝණය) is only
+        reported when it is not covered by the longer match.
+        """
+        matches = sorted(self.iter_matches(text), key=lambda m: (m[0], m[0] - m[1]))
+        selected = []
+        covered_until = 0
+        for start, end, value in matches:
+            if start >= covered_until:
+                selected.append((start, end, value))
+                covered_until = end
+        return selected
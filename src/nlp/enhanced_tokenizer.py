@@ -3,6 +3,9 @@
 import re
 import json
 import os
+from .scanner import TokenScanner
+from .token_stream import TokenStream
+from .aho_corasick import AhoCorasick
 
 class EnhancedSinhalaTokenizer:
     def __init__(self):
@@ -11,11 +14,37 @@ class EnhancedSinhalaTokenizer:
         self.math_symbol_pattern = r'[+\-*/=^()]'
         self.variable_pattern = r'[a-zA-Z]'
         
+        # One compiled scanner over all token types
+        self.scanner = TokenScanner([
+            ("sinhala", self.sinhala_pattern),
+            ("number", self.number_pattern),
+            ("symbol", self.math_symbol_pattern),
+            ("variable", self.variable_pattern)
+        ])
+        
         # Load Sinhala mathematical terms dictionary
         self.math_terms = self._load_math_terms()
+        self.term_matcher = self._build_term_matcher()
         
     def _load_math_terms(self):
         """Load Sinhala mathematical terminology"""
+        # Basic dictionary, extended by the curriculum lexicon if present
+        terms = {
+            "denominator": "හරය",
+            "numerator": "ලවය",
+            "square root": "වර්ගමූලය",
+            "equation": "සමීකරණය",
+            "angle": "කෝණය",
+            "triangle": "ත්‍රිකෝණය",
+            "circle": "වෘත්තය",
+            "rectangle": "ආයතය",
+            "square": "වර්ගය",
+            "addition": "එකතු කිරීම",
+            "subtraction": "අඩු කිරීම",
+            "multiplication": "ගුණ කිරීම",
+            "division": "බෙදීම"
+        }
+        
         try:
             # Path to the JSON file containing math terms
             file_path = os.path.join(os.path.dirname(__file__), 
@@ -23,77 +52,68 @@ class EnhancedSinhalaTokenizer:
             
             if os.path.exists(file_path):
                 with open(file_path, 'r', encoding='utf-8') as file:
-                    return json.load(file)
-            else:
-                # Create a basic dictionary if file doesn't exist
-                return {
-                    "denominator": "හරය",
-                    "numerator": "ලවය",
-                    "square root": "වර්ගමූලය",
-                    "equation": "සමීකරණය",
-                    "angle": "කෝණය",
-                    "triangle": "ත්‍රිකෝණය",
-                    "circle": "වෘත්තය",
-                    "rectangle": "ආයතය",
-                    "square": "වර්ගය",
-                    "addition": "එකතු කිරීම",
-                    "subtraction": "අඩු කිරීම",
-                    "multiplication": "ගුණ කිරීම",
-                    "division": "බෙදීම"
-                }
+                    terms.update(json.load(file))
         except Exception as e:
             print(f"Error loading math terms: {e}")
-            return {}
+        
+        return terms
+    
+    def _build_term_matcher(self):
+        """Build the multi-pattern matcher over the Sinhala terms once"""
+        patterns = {}
+        for eng_term, si_term in self.math_terms.items():
+            patterns.setdefault(si_term, eng_term)
+        return AhoCorasick(patterns)
     
     def tokenize(self, text):
         """Enhanced tokenization for Sinhala text with math expressions"""
-        tokens = []
-        
-        # Find all Sinhala words
-        sinhala_words = [(m.group(), m.start(), m.end()) 
-                        for m in re.finditer(self.sinhala_pattern, text)]
-        
-        # Find all numbers
-        numbers = [(m.group(), m.start(), m.end()) 
-                  for m in re.finditer(self.number_pattern, text)]
-        
-        # Find all mathematical symbols
-        symbols = [(m.group(), m.start(), m.end()) 
-                  for m in re.finditer(self.math_symbol_pattern, text)]
-        
-        # Find all variables
-        variables = [(m.group(), m.start(), m.end()) 
-                    for m in re.finditer(self.variable_pattern, text)]
-        
-        # Combine all tokens and sort by position
-        all_tokens = sinhala_words + numbers + symbols + variables
-        all_tokens.sort(key=lambda x: x[1])
-        
-        # Extract just the token text
-        tokens = [token[0] for token in all_tokens]
-        
-        return tokens
+        return self.scanner.texts(text)
+    
+    def tokenize_iter(self, text):
+        """Yield (type, text, start, end) tokens in order of position"""
+        return self.scanner.iter_tokens(text)
+    
+    def tokenize_many(self, texts):
+        """Tokenize a batch of texts"""
+        scan = self.scanner.texts
+        return [scan(text) for text in texts]
+    
+    def tokenize_stream(self, text):
+        """Tokenize into a TokenStream of type codes and offsets over text"""
+        return TokenStream.from_scanner(self.scanner, text)
+    
+    def tokenize_stream_many(self, texts):
+        """Tokenize a batch of texts into TokenStreams"""
+        return [TokenStream.from_scanner(self.scanner, text) for text in texts]
     
     def identify_math_terms(self, text):
-        """Identify Sinhala mathematical terms in text"""
-        identified_terms = []
+        """Identify Sinhala mathematical terms in text
         
-        # Check for each math term in the text
-        for eng_term, si_term in self.math_terms.items():
-            if si_term in text:
-                identified_terms.append({
-                    "term": si_term,
-                    "english_equivalent": eng_term,
-                    "position": text.find(si_term)
-                })
-        
-        # Sort by position in text
-        identified_terms.sort(key=lambda x: x["position"])
-        
-        return identified_terms
+        Every occurrence is reported in one pass over the text; where terms
+        overlap (කෝණය inside ත්‍රිකෝණය) only the longest is kept.
+        """
+        return [
+            {
+                "term": text[start:end],
+                "english_equivalent": eng_term,
+                "position": start
+            }
+            for start, end, eng_term in self.term_matcher.find_longest(text)
+        ]
+    
+    def identify_math_terms_many(self, texts):
+        """Identify math terms in a batch of documents"""
+        return [self.identify_math_terms(text) for text in texts]
     
     def resolve_ambiguity(self, term, context):
-        """Resolve ambiguity for terms with multiple meanings"""
+        """Resolve ambiguity for terms with multiple meanings
+        
+        context is either raw text or a TokenStream window around the term,
+        e.g. stream.window(index), in which case only that span is searched.
+        """
+        if isinstance(context, TokenStream):
+            context = context.context_text()
+        
         # Example: කෝණය can mean "angle" or "corner"
         if term == "කෝණය":
             # Check if geometric context
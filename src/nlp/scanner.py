@@ -0,0 +1,53 @@
+# src/nlp/scanner.py
+
+import re
+from collections import namedtuple
+
+Token = namedtuple('Token', ['type', 'text', 'start', 'end'])
+
+# Sinhala lith digits are matched by both \d and the Sinhala block, the only
+# place where the per-pattern passes used to produce overlapping tokens
+_SINHALA_DIGITS = re.compile(r'[\u0DE6-\u0DEF]')
+
+
+class TokenScanner:
+    """Single precompiled alternation over named token patterns
+
+    Tokens come out in text order from one finditer pass. Patterns are
+    tried in the order given, which matches the tie-breaking of the old
+    "find each pattern, then stable-sort by start" approach.
+    """
+
+    def __init__(self, patterns):
+        self.patterns = list(patterns)
+        self.regex = re.compile("|".join(f"(?P<{name}>{pattern})"
+                                         for name, pattern in self.patterns))
+        self._separate = [(name, re.compile(pattern)) for name, pattern in self.patterns]
+
+    def needs_separate_passes(self, text):
+        """True when patterns can overlap in text (Sinhala digits)"""
+        return _SINHALA_DIGITS.search(text) is not None
+
+    def iter_tokens(self, text):
+        """Yield Token tuples in order of position"""
+        if self.needs_separate_passes(text):
+            yield from self._iter_separate(text)
+            return
+
+        for match in self.regex.finditer(text):
+            yield Token(match.lastgroup, match.group(), match.start(), match.end())
+
+    def texts(self, text):
+        """Return only the token strings, in order"""
+        if self.needs_separate_passes(text):
+            return [token.text for token in self._iter_separate(text)]
+        return [match.group() for match in self.regex.finditer(text)]
+
+    def _iter_separate(self, text):
+        """One pass per pattern, merged by start position"""
+        tokens = []
+        for name, regex in self._separate:
+            tokens.extend(Token(name, m.group(), m.start(), m.end())
+                          for m in regex.finditer(text))
+        tokens.sort(key=lambda token: token.start)
+        return iter(tokens)
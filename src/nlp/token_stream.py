@@ -0,0 +1,125 @@
+# src/nlp/token_stream.py
+
+from array import array
+
+from .scanner import Token
+
+
+class TokenStream:
+    """Tokens of one string stored as parallel arrays over the source text
+
+    Type codes and start/end offsets live in compact ``array`` buffers and
+    token text is only sliced out of the source when asked for. Slicing a
+    stream returns a view on the same buffers, so windows and sub-ranges
+    cost no copying.
+    """
+
+    __slots__ = ('source', 'type_names', 'types', 'starts', 'ends', '_lo', '_hi')
+
+    def __init__(self, source, type_names, types, starts, ends, lo=0, hi=None):
+        self.source = source
+        self.type_names = type_names
+        self.types = types
+        self.starts = starts
+        self.ends = ends
+        self._lo = lo
+        self._hi = len(types) if hi is None else hi
+
+    @classmethod
+    def from_scanner(cls, scanner, text):
+        """Scan text once and record token types and offsets"""
+        type_names = tuple(name for name, _ in scanner.patterns)
+        codes = {name: code for code, name in enumerate(type_names)}
+        types = array('B')
+        starts = array('I')
+        ends = array('I')
+
+        if scanner.needs_separate_passes(text):
+            for token in scanner.iter_tokens(text):
+                types.append(codes[token.type])
+                starts.append(token.start)
+                ends.append(token.end)
+        else:
+            add_type, add_start, add_end = types.append, starts.append, ends.append
+            for match in scanner.regex.finditer(text):
+                add_type(codes[match.lastgroup])
+                add_start(match.start())
+                add_end(match.end())
+
+        return cls(text, type_names, types, starts, ends)
+
+    def __len__(self):
+        return self._hi - self._lo
+
+    def _index(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("token index out of range")
+        return self._lo + i
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            start, stop, step = item.indices(len(self))
+            if step != 1:
+                raise ValueError("TokenStream slices must be contiguous")
+            return TokenStream(self.source, self.type_names, self.types, self.starts,
+                               self.ends, self._lo + start, self._lo + max(start, stop))
+
+        i = self._index(item)
+        start, end = self.starts[i], self.ends[i]
+        return Token(self.type_names[self.types[i]], self.source[start:end], start, end)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def text(self, i):
+        """Token text, sliced from the source on demand"""
+        i = self._index(i)
+        return self.source[self.starts[i]:self.ends[i]]
+
+    def type(self, i):
+        return self.type_names[self.types[self._index(i)]]
+
+    def span(self, i):
+        i = self._index(i)
+        return self.starts[i], self.ends[i]
+
+    def texts(self):
+        """Materialize every token string in the stream"""
+        source, starts, ends = self.source, self.starts, self.ends
+        return [source[starts[i]:ends[i]] for i in range(self._lo, self._hi)]
+
+    def of_type(self, type_name):
+        """Indices (relative to this stream) of tokens with the given type"""
+        code = self.type_names.index(type_name)
+        types = self.types
+        return [i - self._lo for i in range(self._lo, self._hi) if types[i] == code]
+
+    def window(self, i, before=5, after=5):
+        """View of up to `before` tokens before and `after` tokens after token i"""
+        i = self._index(i) - self._lo
+        return self[max(0, i - before):i + after + 1]
+
+    def context_text(self):
+        """Source text covered by this stream, from the first to the last token"""
+        if len(self) == 0:
+            return ""
+        return self.source[self.starts[self._lo]:self.ends[self._hi - 1]]
+
+    def find(self, token_text, start=0):
+        """Index of the first token equal to token_text, or -1"""
+        source, starts, ends = self.source, self.starts, self.ends
+        length = len(token_text)
+        for i in range(self._lo + start, self._hi):
+            if ends[i] - starts[i] == length and source.startswith(token_text, starts[i]):
+                return i - self._lo
+        return -1
+
+    def nbytes(self):
+        """Memory used by the offset and type buffers"""
+        return sum(buffer.itemsize * len(buffer) for buffer in (self.types, self.starts, self.ends))
+
+    def __repr__(self):
+        return f"TokenStream({len(self)} tokens)"
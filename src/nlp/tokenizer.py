@@ -1,4 +1,5 @@
-import re
+from .scanner import TokenScanner
+from .token_stream import TokenStream
 
 class SinhalaTokenizer:
     def __init__(self):
@@ -7,27 +8,29 @@ class SinhalaTokenizer:
         self.number_pattern = r'\d+(?:\.\d+)?'
         self.math_symbol_pattern = r'[+\-*/=^()]'
         
+        self.scanner = TokenScanner([
+            ("sinhala", self.sinhala_pattern),
+            ("number", self.number_pattern),
+            ("symbol", self.math_symbol_pattern)
+        ])
+        
     def tokenize(self, text):
         """Tokenize Sinhala text with mathematical expressions"""
-        tokens = []
-        
-        # Find all Sinhala words
-        sinhala_words = [(m.group(), m.start(), m.end()) 
-                        for m in re.finditer(self.sinhala_pattern, text)]
-        
-        # Find all numbers
-        numbers = [(m.group(), m.start(), m.end()) 
-                  for m in re.finditer(self.number_pattern, text)]
-        
-        # Find all mathematical symbols
-        symbols = [(m.group(), m.start(), m.end()) 
-                  for m in re.finditer(self.math_symbol_pattern, text)]
-        
-        # Combine all tokens and sort by position
-        all_tokens = sinhala_words + numbers + symbols
-        all_tokens.sort(key=lambda x: x[1])
-        
-        # Extract just the token text
-        tokens = [token[0] for token in all_tokens]
-        
-        return tokens
\ No newline at end of file
+        return self.scanner.texts(text)
+    
+    def tokenize_iter(self, text):
+        """Yield (type, text, start, end) tokens in order of position"""
+        return self.scanner.iter_tokens(text)
+    
+    def tokenize_many(self, texts):
+        """Tokenize a batch of texts"""
+        scan = self.scanner.texts
+        return [scan(text) for text in texts]
+    
+    def tokenize_stream(self, text):
+        """Tokenize into a TokenStream of type codes and offsets over text"""
+        return TokenStream.from_scanner(self.scanner, text)
+    
+    def tokenize_stream_many(self, texts):
+        """Tokenize a batch of texts into TokenStreams"""
+        return [TokenStream.from_scanner(self.scanner, text) for text in texts]
\ No newline at end of file
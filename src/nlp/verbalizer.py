@@ -0,0 +1,315 @@
+# src/nlp/verbalizer.py
+
+import argparse
+import random
+import re
+import time
+from collections import namedtuple
+from functools import lru_cache
+
+# Spoken words per language for operators and symbols
+VOCABULARY = {
+    "si": {
+        "+": "එකතු",
+        "-": "අඩු",
+        "*": "ගුණ",
+        "/": "බෙදා",
+        "=": "සමානයි",
+        "^": "න්තු",
+        "√": "වර්ගමූලය",
+        "(": "වරහන ආරම්භය",
+        ")": "වරහන අවසානය",
+        "neg": "ඍණ",
+        "x": "එක්ස්",
+        "y": "වයි",
+        "z": "සෙඩ්"
+    },
+    "en": {
+        "+": "plus",
+        "-": "minus",
+        "*": "times",
+        "/": "divided by",
+        "over": "over",
+        "=": "equals",
+        "^": "to the power of",
+        "squared": "squared",
+        "cubed": "cubed",
+        "√": "the square root of",
+        "(": "open bracket",
+        ")": "close bracket",
+        "neg": "negative"
+    }
+}
+
+Token = namedtuple('Token', ['kind', 'text'])
+
+# AST nodes
+Number = namedtuple('Number', ['text'])
+Variable = namedtuple('Variable', ['name'])
+Word = namedtuple('Word', ['text'])
+Group = namedtuple('Group', ['body'])
+Negate = namedtuple('Negate', ['operand'])
+Root = namedtuple('Root', ['operand'])
+Power = namedtuple('Power', ['base', 'exponent'])
+BinaryOp = namedtuple('BinaryOp', ['op', 'left', 'right'])
+
+_TOKEN_PATTERN = re.compile(
+    r'(?P<number>\d+(?:\.\d+)?)'
+    r'|(?P<variable>[a-zA-Z])'
+    r'|(?P<op>[+\-*/=^√()×÷])'
+    r'|(?P<space>\s+)'
+    r'|(?P<word>[^\s\da-zA-Z+\-*/=^√()×÷]+)'
+)
+
+_OPERATOR_ALIASES = {"×": "*", "÷": "/"}
+
+
+def tokenize(expression):
+    """Split an expression into number, variable, operator and word tokens"""
+    tokens = []
+    for match in _TOKEN_PATTERN.finditer(expression):
+        kind = match.lastgroup
+        if kind == 'space':
+            continue
+        text = match.group()
+        if kind == 'op':
+            text = _OPERATOR_ALIASES.get(text, text)
+        tokens.append(Token(kind, text))
+    return tokens
+
+
+class ParseError(ValueError):
+    pass
+
+
+class _Parser:
+    """Recursive-descent parser with the usual arithmetic precedence
+
+    equation := expr ('=' expr)*
+    expr     := term (('+' | '-') term)*
+    term     := unary (('*' | '/') unary | implicit-multiply unary)*
+    unary    := ('-' | '+') unary | power
+    power    := atom ('^' unary)?
+    atom     := number | variable | word | '(' expr ')' | '√' unary
+    """
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.position = 0
+
+    def peek(self):
+        if self.position < len(self.tokens):
+            return self.tokens[self.position]
+        return None
+
+    def advance(self):
+        token = self.tokens[self.position]
+        self.position += 1
+        return token
+
+    def accept(self, *ops):
+        token = self.peek()
+        if token is not None and token.kind == 'op' and token.text in ops:
+            self.position += 1
+            return token
+        return None
+
+    def parse(self):
+        node = self.expr()
+        while self.accept('='):
+            node = BinaryOp('=', node, self.expr())
+        if self.peek() is not None:
+            raise ParseError(f"Unexpected token {self.peek().text!r}")
+        return node
+
+    def expr(self):
+        node = self.term()
+        while True:
+            token = self.accept('+', '-')
+            if token is None:
+                return node
+            node = BinaryOp(token.text, node, self.term())
+
+    def term(self):
+        node = self.unary()
+        while True:
+            token = self.accept('*', '/')
+            if token is not None:
+                node = BinaryOp(token.text, node, self.unary())
+                continue
+
+            # Implicit multiplication such as 3x or 2(x + 1)
+            following = self.peek()
+            if following is not None and (following.kind in ('number', 'variable')
+                                          or following.text in ('(', '√')):
+                node = BinaryOp('', node, self.unary())
+                continue
+            return node
+
+    def unary(self):
+        if self.accept('-'):
+            return Negate(self.unary())
+        if self.accept('+'):
+            return self.unary()
+        return self.power()
+
+    def power(self):
+        base = self.atom()
+        if self.accept('^'):
+            return Power(base, self.unary())
+        return base
+
+    def atom(self):
+        token = self.peek()
+        if token is None:
+            raise ParseError("Unexpected end of expression")
+
+        if token.kind == 'op':
+            if self.accept('('):
+                body = self.expr()
+                if not self.accept(')'):
+                    raise ParseError("Missing closing bracket")
+                return Group(body)
+            if self.accept('√'):
+                return Root(self.unary())
+            raise ParseError(f"Unexpected operator {token.text!r}")
+
+        self.advance()
+        if token.kind == 'number':
+            return Number(token.text)
+        if token.kind == 'variable':
+            return Variable(token.text)
+        return Word(token.text)
+
+
+def parse(expression):
+    """Parse an expression string into an AST"""
+    return _Parser(tokenize(expression)).parse()
+
+
+def _reads_as_one(node):
+    """Whether node is spoken as a single unit, so nothing said after it can run into it"""
+    if isinstance(node, Negate):
+        return _reads_as_one(node.operand)
+    return isinstance(node, (Number, Variable, Word, Group))
+
+
+def _emit(node, words, parts):
+    """Append the spoken form of node to parts, in reading order"""
+    if isinstance(node, Number):
+        parts.append(node.text)
+    elif isinstance(node, Variable):
+        parts.append(words.get(node.name, node.name))
+    elif isinstance(node, Word):
+        parts.append(node.text)
+    elif isinstance(node, Group):
+        parts.append(words["("])
+        _emit(node.body, words, parts)
+        parts.append(words[")"])
+    elif isinstance(node, Negate):
+        parts.append(words["neg"])
+        _emit(node.operand, words, parts)
+    elif isinstance(node, Root):
+        parts.append(words["√"])
+        _emit(node.operand, words, parts)
+    elif isinstance(node, Power):
+        _emit(node.base, words, parts)
+        exponent = node.exponent
+        if isinstance(exponent, Number) and exponent.text in ("2", "3") and "squared" in words:
+            parts.append(words["squared" if exponent.text == "2" else "cubed"])
+        else:
+            parts.append(words["^"])
+            # A compound exponent is bracketed: "2^3^2" must not read as "(2^3) squared"
+            _emit(exponent if _reads_as_one(exponent) else Group(exponent), words, parts)
+    elif isinstance(node, BinaryOp):
+        _emit(node.left, words, parts)
+        if node.op == '/' and isinstance(node.left, Number) and isinstance(node.right, Number):
+            # Numeric fractions read as "3 over 4" where the language has the form
+            parts.append(words.get("over", words["/"]))
+        elif node.op:
+            parts.append(words[node.op])
+        _emit(node.right, words, parts)
+
+
+def _verbalize_tokens(expression, words):
+    """Fallback for text that does not parse: map tokens one by one"""
+    return [words.get(token.text, token.text) for token in tokenize(expression)]
+
+
+@lru_cache(maxsize=8192)
+def verbalize(expression, language="si"):
+    """Return speech text for a math expression in a single parse-and-emit pass"""
+    words = VOCABULARY.get(language, VOCABULARY["si"])
+    try:
+        parts = []
+        _emit(parse(expression), words, parts)
+    except (ParseError, RecursionError):
+        parts = _verbalize_tokens(expression, words)
+    return " ".join(parts)
+
+
+def spoken_terms(language="si"):
+    """Every word the verbalizer can emit for operators and symbols"""
+    return list(dict.fromkeys(VOCABULARY.get(language, VOCABULARY["si"]).values()))
+
+
+def generate_equations(count, seed=0):
+    """Random equations covering powers, roots, fractions and brackets"""
+    rng = random.Random(seed)
+    variables = "xyzab"
+
+    def operand(depth):
+        choice = rng.random()
+        if depth < 2 and choice < 0.15:
+            return f"({expression(depth + 1)})"
+        if depth < 2 and choice < 0.25:
+            return f"√{operand(depth + 1)}"
+        if choice < 0.45:
+            return f"{rng.randint(1, 9)}{rng.choice(variables)}"
+        if choice < 0.55:
+            return f"{rng.choice(variables)}^{rng.randint(2, 4)}"
+        if choice < 0.65:
+            return f"{rng.randint(1, 9)}/{rng.randint(2, 12)}"
+        return str(rng.randint(0, 999))
+
+    def expression(depth=0):
+        parts = [operand(depth)]
+        for _ in range(rng.randint(1, 3)):
+            parts.append(rng.choice("+-*/"))
+            parts.append(operand(depth))
+        return " ".join(parts)
+
+    return [f"{expression()} = {operand(1)}" for _ in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verbalizer throughput benchmark")
+    parser.add_argument("--count", type=int, default=100000)
+    parser.add_argument("--language", default="si")
+    args = parser.parse_args()
+
+    equations = generate_equations(args.count)
+
+    started = time.perf_counter()
+    for equation in equations:
+        verbalize.__wrapped__(equation, args.language)
+    uncached = time.perf_counter() - started
+
+    # Hot set that fits in the memo table, looked up count times
+    hot_set = equations[:verbalize.cache_info().maxsize]
+    verbalize.cache_clear()
+    for equation in hot_set:
+        verbalize(equation, args.language)
+    started = time.perf_counter()
+    for i in range(args.count):
+        verbalize(hot_set[i % len(hot_set)], args.language)
+    cached = time.perf_counter() - started
+
+    print(f"{args.count} equations")
+    print(f"uncached: {args.count / uncached:,.0f} eq/s ({uncached * 1e6 / args.count:.1f} µs/eq)")
+    print(f"cached:   {args.count / cached:,.0f} eq/s ({cached * 1e6 / args.count:.2f} µs/eq)")
+    print(f"example:  {equations[0]!r} -> {verbalize(equations[0], args.language)!r}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+# src/tts/audio_cache.py
+
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+import config
+
+
+def make_cache_key(text, language, engine, speed):
+    """Hash everything that changes the synthesized audio into a cache key"""
+    payload = "\x1f".join([text, language, engine, f"{float(speed):.3f}"])
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def guess_audio_mimetype(audio):
+    """Sniff the container format of encoded audio bytes"""
+    if audio[:4] == b'RIFF' and audio[8:12] == b'WAVE':
+        return 'audio/wav'
+    if audio[:4] == b'OggS':
+        return 'audio/ogg'
+    return 'audio/mpeg'
+
+
+def audio_namehint(audio):
+    """File type hint for pygame.mixer.music.load: 'wav', 'ogg' or 'mp3'"""
+    return {'audio/wav': 'wav', 'audio/ogg': 'ogg'}.get(guess_audio_mimetype(audio), 'mp3')
+
+
+class AudioCache:
+    """Two-tier cache for synthesized speech.
+
+    An in-memory LRU of recently used clips sits in front of a size-bounded
+    directory of audio files. Disk entries are evicted oldest-access first
+    once the directory grows past max_disk_bytes.
+    """
+
+    FILE_SUFFIX = '.audio'
+
+    def __init__(self, cache_dir=None, max_memory_items=256,
+                 max_disk_bytes=512 * 1024 * 1024, warm=False):
+        self.cache_dir = cache_dir
+        self.max_memory_items = max_memory_items
+        self.max_disk_bytes = max_disk_bytes
+
+        self._memory = OrderedDict()
+        self._disk_index = OrderedDict()  # key -> size, oldest access first
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.memory_evictions = 0
+        self.disk_evictions = 0
+
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            self._scan_disk()
+            if warm:
+                self.warm()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + self.FILE_SUFFIX)
+
+    def _scan_disk(self):
+        """Rebuild the disk index from the files already in the cache directory"""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(self.FILE_SUFFIX):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.cache_dir, name))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, name[:-len(self.FILE_SUFFIX)], stat.st_size))
+
+        entries.sort()
+        for _, key, size in entries:
+            self._disk_index[key] = size
+            self._disk_bytes += size
+
+    def warm(self):
+        """Load the most recently used disk entries into memory"""
+        with self._lock:
+            recent = list(self._disk_index.keys())[-self.max_memory_items:]
+        for key in recent:
+            audio = self._read_disk(key)
+            if audio is not None:
+                with self._lock:
+                    self._remember(key, audio)
+
+    def _read_disk(self, key):
+        try:
+            with open(self._path(key), 'rb') as file:
+                return file.read()
+        except OSError:
+            return None
+
+    def _remember(self, key, audio):
+        """Insert into the memory tier, dropping the least recently used entry"""
+        self._memory[key] = audio
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+            self.memory_evictions += 1
+
+    def remember(self, key, audio):
+        """Keep audio held elsewhere on disk (e.g. the audio pack) in the memory tier only"""
+        with self._lock:
+            self._remember(key, audio)
+
+    def get(self, key):
+        """Return cached audio bytes for key, or None on a miss"""
+        with self._lock:
+            audio = self._memory.get(key)
+            if audio is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                self.memory_hits += 1
+                return audio
+            on_disk = self.cache_dir and key in self._disk_index
+
+        if on_disk:
+            audio = self._read_disk(key)
+            with self._lock:
+                if audio is not None:
+                    if key in self._disk_index:
+                        self._disk_index.move_to_end(key)
+                    self._remember(key, audio)
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return audio
+                self._forget_disk(key)
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key, audio):
+        """Store audio bytes in both tiers"""
+        with self._lock:
+            self._remember(key, audio)
+            # Keys are content hashes, so an existing file already holds this audio
+            if not self.cache_dir or key in self._disk_index:
+                return
+
+        try:
+            # Write to a temp file first so readers never see a partial clip
+            fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        except OSError as e:
+            print(f"Error writing audio cache entry: {e}")
+            return
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                file.write(audio)
+            os.replace(temp_path, self._path(key))
+        except OSError as e:
+            print(f"Error writing audio cache entry: {e}")
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+            return
+
+        with self._lock:
+            self._disk_bytes -= self._disk_index.pop(key, 0)
+            self._disk_index[key] = len(audio)
+            self._disk_bytes += len(audio)
+            self._evict_disk()
+
+    def path_for(self, key):
+        """Return the on-disk path of a cached entry, or None"""
+        with self._lock:
+            if self.cache_dir and key in self._disk_index:
+                return self._path(key)
+        return None
+
+    def _forget_disk(self, key):
+        self._disk_bytes -= self._disk_index.pop(key, 0)
+
+    def _evict_disk(self):
+        """Remove least recently used files until the store fits its budget"""
+        while self._disk_bytes > self.max_disk_bytes and len(self._disk_index) > 1:
+            key, size = self._disk_index.popitem(last=False)
+            self._disk_bytes -= size
+            self.disk_evictions += 1
+            try:
+                os.unlink(self._path(key))
+            except OSError:
+                pass
+
+    def clear(self):
+        """Drop every cached entry from memory and disk"""
+        with self._lock:
+            self._memory.clear()
+            keys = list(self._disk_index.keys())
+            self._disk_index.clear()
+            self._disk_bytes = 0
+        for key in keys:
+            try:
+                os.unlink(self._path(key))
+            except OSError:
+                pass
+
+    def stats(self):
+        """Return hit/miss counters and current tier sizes"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "memory_evictions": self.memory_evictions,
+                "disk_evictions": self.disk_evictions,
+                "memory_items": len(self._memory),
+                "disk_items": len(self._disk_index),
+                "disk_bytes": self._disk_bytes
+            }
+
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_shared_cache():
+    """Return the process-wide audio cache shared by all speech engines"""
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = AudioCache(
+                cache_dir=config.TTS_CACHE_DIR,
+                max_memory_items=config.TTS_CACHE_MEMORY_ITEMS,
+                max_disk_bytes=config.TTS_CACHE_DISK_MB * 1024 * 1024,
+                warm=config.TTS_CACHE_WARM
+            )
+        return _shared_cache
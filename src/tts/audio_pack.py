@@ -0,0 +1,214 @@
+# src/tts/audio_pack.py
+
+import argparse
+import datetime
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import config
+from .audio_cache import make_cache_key, guess_audio_mimetype
+
+FILE_EXTENSIONS = {
+    'audio/mpeg': '.mp3',
+    'audio/wav': '.wav',
+    'audio/ogg': '.ogg'
+}
+
+
+class AudioPack:
+    """Versioned directory of pre-rendered audio for fixed phrases.
+
+    The pack is a manifest.json plus one audio file per phrase. Entries are
+    keyed with make_cache_key so engines can look them up exactly like
+    cache entries.
+    """
+
+    MANIFEST = 'manifest.json'
+
+    def __init__(self, pack_dir):
+        self.pack_dir = pack_dir
+        self.manifest = self._load_manifest()
+
+    def _load_manifest(self):
+        manifest_path = os.path.join(self.pack_dir, self.MANIFEST)
+        if os.path.exists(manifest_path):
+            try:
+                with open(manifest_path, 'r', encoding='utf-8') as file:
+                    return json.load(file)
+            except Exception as e:
+                print(f"Error loading audio pack manifest: {e}")
+        return {"version": 0, "entries": {}}
+
+    @property
+    def version(self):
+        return self.manifest.get("version", 0)
+
+    def __contains__(self, key):
+        return key in self.manifest["entries"]
+
+    def __len__(self):
+        return len(self.manifest["entries"])
+
+    def path_for(self, key):
+        """Return the path of the clip for key, or None if it is not packed"""
+        entry = self.manifest["entries"].get(key)
+        if entry is None:
+            return None
+        return os.path.join(self.pack_dir, entry["file"])
+
+    def get(self, key):
+        """Return packed audio bytes for key, or None"""
+        path = self.path_for(key)
+        if path is None:
+            return None
+        try:
+            with open(path, 'rb') as file:
+                return file.read()
+        except OSError:
+            return None
+
+
+_shared_pack = None
+_shared_pack_lock = threading.Lock()
+
+
+def get_shared_audio_pack():
+    """Return the audio pack configured for this deployment"""
+    global _shared_pack
+    with _shared_pack_lock:
+        if _shared_pack is None:
+            _shared_pack = AudioPack(config.TTS_AUDIO_PACK_DIR)
+        return _shared_pack
+
+
+def collect_static_phrases(speech_engine):
+    """Walk every component that emits fixed text and return its phrases"""
+    from ..feedback.feedback_engine import FeedbackEngine
+    from ..learning.lesson_generator import AdaptiveLessonGenerator
+
+    phrases = []
+    phrases.extend(FeedbackEngine(None, language=speech_engine.language).static_phrases())
+    phrases.extend(AdaptiveLessonGenerator().static_phrases())
+
+    # Token clips used to assemble equation speech
+    if getattr(speech_engine, 'equation_mode', None) == 'clips':
+        from .equation_audio import ClipBank
+        phrases.extend(ClipBank.static_units(speech_engine.language))
+
+    return list(dict.fromkeys(phrases))
+
+
+def _write_atomic(path, data):
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    with os.fdopen(fd, 'wb') as file:
+        file.write(data)
+    os.replace(temp_path, path)
+
+
+def build_audio_pack(pack_dir, speech_engine, phrases=None, max_workers=8):
+    """Pre-render phrases into pack_dir, synthesizing only what changed
+
+    Entries whose key is already in the manifest and whose file is present
+    are kept as-is, phrases that are no longer emitted are removed, and the
+    pack version is bumped whenever the contents change.
+    """
+    os.makedirs(pack_dir, exist_ok=True)
+    if phrases is None:
+        phrases = collect_static_phrases(speech_engine)
+
+    pack = AudioPack(pack_dir)
+    old_entries = pack.manifest.get("entries", {})
+
+    wanted = {}
+    for text in phrases:
+        key = make_cache_key(text, speech_engine.language,
+                             speech_engine.engine_name, speech_engine.speed)
+        wanted[key] = text
+
+    entries = {}
+    missing = []
+    for key, text in wanted.items():
+        entry = old_entries.get(key)
+        if entry and os.path.exists(os.path.join(pack_dir, entry["file"])):
+            entries[key] = entry
+        else:
+            missing.append(key)
+
+    failed = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(speech_engine.render, wanted[key]): key
+                   for key in missing}
+        for future in as_completed(futures):
+            key = futures[future]
+            try:
+                audio = future.result()
+            except Exception as e:
+                print(f"Error rendering phrase {wanted[key]!r}: {e}")
+                failed.append(key)
+                continue
+
+            file_name = key + FILE_EXTENSIONS.get(guess_audio_mimetype(audio), '.audio')
+            _write_atomic(os.path.join(pack_dir, file_name), audio)
+            entries[key] = {
+                "text": wanted[key],
+                "file": file_name,
+                "bytes": len(audio),
+                "sha256": hashlib.sha256(audio).hexdigest()
+            }
+
+    # Drop clips for phrases the app no longer emits
+    stale = [key for key in old_entries if key not in wanted]
+    for key in stale:
+        try:
+            os.unlink(os.path.join(pack_dir, old_entries[key]["file"]))
+        except OSError:
+            pass
+
+    rendered = len(missing) - len(failed)
+    changed = rendered > 0 or bool(stale)
+    manifest = {
+        "version": pack.version + 1 if changed else pack.version,
+        "language": speech_engine.language,
+        "engine": speech_engine.engine_name,
+        "speed": speech_engine.speed,
+        "built_at": datetime.datetime.now().isoformat() if changed
+        else pack.manifest.get("built_at"),
+        "entries": dict(sorted(entries.items()))
+    }
+    _write_atomic(os.path.join(pack_dir, AudioPack.MANIFEST),
+                  json.dumps(manifest, ensure_ascii=False, indent=2).encode('utf-8'))
+
+    return {
+        "version": manifest["version"],
+        "phrases": len(wanted),
+        "rendered": rendered,
+        "reused": len(wanted) - len(missing),
+        "removed": len(stale),
+        "failed": len(failed)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-render fixed phrases into an audio pack")
+    parser.add_argument("--pack-dir", default=config.TTS_AUDIO_PACK_DIR)
+    parser.add_argument("--language", default=config.LANGUAGE)
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    from .enhanced_speech_engine import EnhancedSpeechEngine
+    from .backends import get_backend
+    # One warm backend instance per worker, or the pool serializes the render
+    engine = EnhancedSpeechEngine(language=args.language, audio_pack=AudioPack(args.pack_dir),
+                                  backend=get_backend(pool_size=args.workers))
+
+    result = build_audio_pack(args.pack_dir, engine, max_workers=args.workers)
+    print(f"Audio pack v{result['version']}: {result['rendered']} rendered, "
+          f"{result['reused']} reused, {result['removed']} removed, {result['failed']} failed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+# src/tts/backends.py
+
+import array
+import hashlib
+import io
+import math
+import queue
+import shutil
+import subprocess
+import wave
+from contextlib import contextmanager
+
+import config
+
+# Registered backend classes by TTS_ENGINE name
+BACKENDS = {}
+
+
+def register_backend(name):
+    """Class decorator adding a backend to the registry under name"""
+    def decorator(cls):
+        cls.name = name
+        BACKENDS[name] = cls
+        return cls
+    return decorator
+
+
+def _wav_bytes(samples, rate):
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(samples.tobytes())
+    return buffer.getvalue()
+
+
+@register_backend('gtts')
+class GTTSBackend:
+    """Google Translate TTS; returns MP3 and needs network access"""
+
+    def synthesize(self, text, language, speed=1.0):
+        return b"".join(self.stream(text, language, speed))
+
+    def stream(self, text, language, speed=1.0):
+        """Yield MP3 chunks as gTTS receives them"""
+        from gtts import gTTS
+
+        tts = gTTS(text=text, lang=language, slow=speed < 1.0)
+        yield from tts.stream()
+
+
+@register_backend('espeak')
+class EspeakBackend:
+    """Offline synthesis through the espeak-ng command line tool; returns WAV"""
+
+    # espeak-ng's default speaking rate in words per minute
+    BASE_RATE = 175
+
+    def __init__(self, executable=None):
+        self.executable = executable or shutil.which('espeak-ng') or shutil.which('espeak')
+        if not self.executable:
+            raise RuntimeError("espeak-ng is not installed")
+
+    def synthesize(self, text, language, speed=1.0):
+        result = subprocess.run(
+            [self.executable, '-v', language, '-s', str(int(self.BASE_RATE * speed)),
+             '--stdout', text],
+            capture_output=True, check=True
+        )
+        return result.stdout
+
+
+@register_backend('sine')
+class SineBackend:
+    """Deterministic tone per text for tests and offline development; returns WAV"""
+
+    SAMPLE_RATE = 16000
+    SECONDS_PER_CHAR = 0.06
+
+    def synthesize(self, text, language, speed=1.0):
+        digest = hashlib.sha256(text.encode('utf-8')).digest()
+        frequency = 220 + digest[0] * 2
+        length = int(self.SAMPLE_RATE * self.SECONDS_PER_CHAR * max(len(text), 1) / speed)
+        step = 2 * math.pi * frequency / self.SAMPLE_RATE
+
+        samples = array.array('h', (int(8000 * math.sin(step * i)) for i in range(length)))
+        return _wav_bytes(samples, self.SAMPLE_RATE)
+
+
+@register_backend('null')
+class NullBackend(SineBackend):
+    """Silent audio of the same length SineBackend would produce"""
+
+    def synthesize(self, text, language, speed=1.0):
+        length = int(self.SAMPLE_RATE * self.SECONDS_PER_CHAR * max(len(text), 1) / speed)
+        return _wav_bytes(array.array('h', bytes(2 * length)), self.SAMPLE_RATE)
+
+
+class PooledBackend:
+    """A fixed set of warm backend instances shared by worker threads"""
+
+    def __init__(self, backend_class, size=1):
+        self.name = backend_class.name
+        self.size = size
+        self._instances = queue.Queue()
+        for _ in range(size):
+            self._instances.put(backend_class())
+
+    @contextmanager
+    def acquire(self):
+        instance = self._instances.get()
+        try:
+            yield instance
+        finally:
+            self._instances.put(instance)
+
+    def synthesize(self, text, language, speed=1.0):
+        with self.acquire() as backend:
+            return backend.synthesize(text, language, speed)
+
+    def stream(self, text, language, speed=1.0):
+        with self.acquire() as backend:
+            if hasattr(backend, 'stream'):
+                yield from backend.stream(text, language, speed)
+            else:
+                yield backend.synthesize(text, language, speed)
+
+
+def get_backend(name=None, pool_size=1):
+    """Create a pool of warm instances of the backend registered as name"""
+    name = name or config.TTS_ENGINE
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown TTS engine {name!r}; available: {', '.join(sorted(BACKENDS))}")
+    return PooledBackend(BACKENDS[name], size=pool_size)
@@ -0,0 +1,117 @@
+# src/tts/benchmark.py
+
+import argparse
+import json
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import config
+from .backends import BACKENDS, get_backend
+
+
+def build_corpus(num_questions=20, seed=0):
+    """Fixed lesson-text corpus: fixed phrases plus seeded problem questions"""
+    from ..feedback.feedback_engine import FeedbackEngine
+    from ..learning.lesson_generator import AdaptiveLessonGenerator
+    from ..cultural.problem_generator import CulturalProblemGenerator
+
+    corpus = AdaptiveLessonGenerator().static_phrases()
+    corpus.extend(FeedbackEngine(None).static_phrases())
+
+    state = random.getstate()
+    random.seed(seed)
+    try:
+        generator = CulturalProblemGenerator()
+        topics = ["addition", "subtraction", "multiplication", "division"]
+        for i in range(num_questions):
+            problem = generator.generate_problem(topics[i % len(topics)], 1 + i % 10)
+            corpus.append(problem["question"])
+    finally:
+        random.setstate(state)
+
+    return corpus
+
+
+def audio_duration(audio):
+    """Length of encoded audio in seconds, or None if it cannot be decoded"""
+    try:
+        from .equation_audio import decode_audio
+        rate, samples = decode_audio(audio)
+        return len(samples) / rate
+    except Exception:
+        return None
+
+
+def benchmark_backend(name, corpus, language, concurrency=4):
+    """Time a backend over the corpus and return summary numbers"""
+    backend = get_backend(name, pool_size=concurrency)
+
+    ttfb = []
+    synth_times = []
+    audio_seconds = 0.0
+    for text in corpus:
+        started = time.perf_counter()
+        first_byte = None
+        chunks = []
+        for chunk in backend.stream(text, language):
+            if first_byte is None:
+                first_byte = time.perf_counter() - started
+            chunks.append(chunk)
+        synth_times.append(time.perf_counter() - started)
+        ttfb.append(first_byte if first_byte is not None else synth_times[-1])
+
+        duration = audio_duration(b"".join(chunks))
+        if duration:
+            audio_seconds += duration
+
+    # Throughput with the pool saturated
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(lambda text: backend.synthesize(text, language), corpus))
+    wall = time.perf_counter() - started
+
+    ttfb.sort()
+    return {
+        "backend": name,
+        "utterances": len(corpus),
+        "ttfb_ms_p50": ttfb[len(ttfb) // 2] * 1000,
+        "ttfb_ms_p95": ttfb[min(len(ttfb) - 1, int(len(ttfb) * 0.95))] * 1000,
+        "real_time_factor": sum(synth_times) / audio_seconds if audio_seconds else None,
+        "utterances_per_sec": len(corpus) / wall,
+        "chars_per_sec": sum(len(text) for text in corpus) / wall,
+        "concurrency": concurrency
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark TTS backends on lesson text")
+    parser.add_argument("--backends", nargs="+", default=[config.TTS_ENGINE],
+                        help=f"any of: {', '.join(sorted(BACKENDS))}")
+    parser.add_argument("--language", default=config.LANGUAGE)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--questions", type=int, default=20)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.questions)
+    results = []
+    for name in args.backends:
+        try:
+            results.append(benchmark_backend(name, corpus, args.language, args.concurrency))
+        except Exception as e:
+            print(f"Skipping {name}: {e}")
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'backend':<10}{'ttfb p50':>10}{'ttfb p95':>10}{'RTF':>8}{'utt/s':>9}{'chars/s':>10}")
+    for r in results:
+        rtf = f"{r['real_time_factor']:.3f}" if r["real_time_factor"] is not None else "n/a"
+        print(f"{r['backend']:<10}{r['ttfb_ms_p50']:>8.1f}ms{r['ttfb_ms_p95']:>8.1f}ms{rtf:>8}"
+              f"{r['utterances_per_sec']:>9.1f}{r['chars_per_sec']:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,75 +1,128 @@
 # src/tts/enhanced_speech_engine.py
 
-import os
-import tempfile
-from gtts import gTTS
+import io
+import threading
 import pygame
-import re
+import config
+from ..nlp.verbalizer import verbalize, VOCABULARY
+from .audio_cache import get_shared_cache, make_cache_key, audio_namehint
+from .audio_pack import get_shared_audio_pack
+from .backends import get_backend
 
 class EnhancedSpeechEngine:
-    def __init__(self, language='si'):
+    def __init__(self, language='si', cache=None, speed=1.0, audio_pack=None,
+                 equation_mode=None, backend=None, synthesis_service=None):
         self.language = language
-        pygame.mixer.init()
+        self.synthesis_service = synthesis_service
+        if backend is None:
+            backend = synthesis_service.backend if synthesis_service else get_backend()
+        self.backend = backend
+        self.engine_name = backend.name
+        self.speed = speed
+        self.cache = cache if cache is not None else get_shared_cache()
+        self.audio_pack = audio_pack if audio_pack is not None else get_shared_audio_pack()
+        
+        # "synthesize" speaks whole equations, "clips" joins pre-rendered tokens
+        self.equation_mode = equation_mode or config.TTS_EQUATION_MODE
+        self._clip_bank = None
+        self._clip_bank_lock = threading.Lock()
         
         # Math terminology mapping
-        self.math_terms = {
-            "+": "එකතු",
-            "-": "අඩු",
-            "*": "ගුණ",
-            "/": "බෙදා",
-            "=": "සමානයි",
-            "^": "න්තු",
-            "x": "එක්ස්",
-            "y": "වයි",
-            "z": "සෙඩ්",
-            "√": "වර්ගමූලය",
-            "(": "වරහන ආරම්භය",
-            ")": "වරහන අවසානය"
-        }
+        self.math_terms = VOCABULARY.get(language, VOCABULARY["si"])
     
     def _preprocess_math_equation(self, text):
         """Process mathematical equations for better speech output"""
-        # Replace mathematical symbols with words
-        for symbol, word in self.math_terms.items():
-            text = text.replace(symbol, f" {word} ")
-        
-        # Handle superscripts for powers
-        text = re.sub(r'(\d+)\^(\d+)', r'\1 න්තු \2', text)
+        # Parsed once with precedence, roots, powers and fractions (memoized)
+        return verbalize(text, self.language)
+    
+    def render(self, text):
+        """Run the TTS backend directly, bypassing the pack and cache"""
+        return self.backend.synthesize(text, self.language, self.speed)
+    
+    def synthesize_with_key(self, text, is_equation=False):
+        """Return (cache key, audio bytes), synthesizing only on a cache miss"""
+        # Preprocess if it's an equation
+        if is_equation:
+            text = self._preprocess_math_equation(text)
+            if self.equation_mode == 'clips':
+                return self.synthesize_clips(text)
         
-        # Handle fractions (simplified approach)
-        text = re.sub(r'(\d+)/(\d+)', r'\1 බෙදා \2', text)
+        key = make_cache_key(text, self.language, self.engine_name, self.speed)
         
-        # Handle square roots
-        text = re.sub(r'√(\d+)', r'වර්ගමූලය \1', text)
+        # Hot phrases come from the memory tier; fixed phrases otherwise from
+        # the pre-rendered pack, kept in memory (not copied to disk) once read
+        audio = self.cache.get(key)
+        if audio is not None:
+            return key, audio
         
-        # Clean up excess spaces
-        text = re.sub(r'\s+', ' ', text).strip()
+        audio = self.audio_pack.get(key)
+        if audio is not None:
+            self.cache.remember(key, audio)
+            return key, audio
         
-        return text
+        if self.synthesis_service is not None:
+            # Runs on the worker pool; identical concurrent requests share one job
+            audio = self.synthesis_service.synthesize(text, self.language, self.speed)
+        else:
+            audio = self.render(text)
+        self.cache.put(key, audio)
+        return key, audio
+    
+    @property
+    def clip_bank(self):
+        """Token clip bank for equation speech; clips not yet pre-rendered are made on demand"""
+        with self._clip_bank_lock:
+            if self._clip_bank is None:
+                from .equation_audio import ClipBank
+                self._clip_bank = ClipBank(self)
+            return self._clip_bank
+    
+    def prerender_clips(self, background=True):
+        """Pre-render the clip bank at startup, off the request path"""
+        if not background:
+            return self.clip_bank.prerender()
+        thread = threading.Thread(target=self._prerender_clips, name='clip-prerender', daemon=True)
+        thread.start()
+        return thread
+    
+    def _prerender_clips(self):
+        try:
+            count = self.clip_bank.prerender()
+            print(f"Pre-rendered {count} equation clips")
+        except Exception as e:
+            print(f"Error pre-rendering equation clips: {e}")
+    
+    def synthesize_clips(self, speech_text):
+        """Return (cache key, WAV bytes) for verbalized equation text built from token clips"""
+        key = make_cache_key(speech_text, self.language, f"{self.engine_name}+clips", self.speed)
+        audio = self.cache.get(key)
+        if audio is None:
+            audio = self.clip_bank.render(speech_text)
+            self.cache.put(key, audio)
+        return key, audio
+    
+    def audio_path(self, key):
+        """Return the file holding audio for key, from the pack or the cache"""
+        return self.audio_pack.path_for(key) or self.cache.path_for(key)
+    
+    def synthesize(self, text, is_equation=False):
+        """Return encoded audio for text without playing it"""
+        return self.synthesize_with_key(text, is_equation)[1]
+    
+    def play(self, audio):
+        """Play encoded audio bytes on the local device (kiosk use only)"""
+        if not pygame.mixer.get_init():
+            pygame.mixer.init()
+        pygame.mixer.music.load(io.BytesIO(audio), audio_namehint(audio))
+        pygame.mixer.music.play()
+        while pygame.mixer.music.get_busy():
+            pygame.time.Clock().tick(10)
     
     def speak(self, text, is_equation=False):
-        """Convert text to speech and play it"""
+        """Convert text to speech and play it on the server"""
         try:
-            # Preprocess if it's an equation
-            if is_equation:
-                text = self._preprocess_math_equation(text)
-            
-            # Create a temporary file
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.mp3') as fp:
-                temp_filename = fp.name
-                
-            # Generate speech
-            tts = gTTS(text=text, lang=self.language, slow=False)
-            tts.save(temp_filename)
-            
-            # Play the audio
-            pygame.mixer.music.load(temp_filename)
-            pygame.mixer.music.play()
-            while pygame.mixer.music.get_busy():
-                pygame.time.Clock().tick(10)
-                
-            # Clean up temp file
-            os.unlink(temp_filename)
+            audio = self.synthesize(text, is_equation)
+            self.play(audio)
             return True
         except Exception as e:
             print(f"Error in TTS: {e}")
@@ -0,0 +1,204 @@
+# src/tts/equation_audio.py
+
+import io
+import os
+import re
+import threading
+import wave
+
+import numpy as np
+
+from ..nlp.verbalizer import spoken_terms
+
+# Spoken form of the decimal point in numbers such as 2.5
+DECIMAL_POINT = {
+    "si": "දශම",
+    "en": "point"
+}
+
+
+def decode_audio(audio):
+    """Decode encoded audio bytes into (sample_rate, mono float32 samples)"""
+    if audio[:4] == b'RIFF' and audio[8:12] == b'WAVE':
+        return _decode_wav(audio)
+    return _decode_with_pygame(audio)
+
+
+def _decode_wav(audio):
+    with wave.open(io.BytesIO(audio), 'rb') as wav:
+        rate = wav.getframerate()
+        channels = wav.getnchannels()
+        width = wav.getsampwidth()
+        frames = wav.readframes(wav.getnframes())
+
+    if width == 1:
+        samples = (np.frombuffer(frames, dtype=np.uint8).astype(np.float32) - 128) / 128
+    elif width == 2:
+        samples = np.frombuffer(frames, dtype='<i2').astype(np.float32) / 32768
+    elif width == 4:
+        samples = np.frombuffer(frames, dtype='<i4').astype(np.float32) / 2147483648
+    else:
+        raise ValueError(f"Unsupported WAV sample width: {width}")
+
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1)
+    return rate, samples
+
+
+def _decode_with_pygame(audio):
+    """Decode compressed audio (MP3/OGG) through SDL_mixer"""
+    import pygame
+
+    if not pygame.mixer.get_init():
+        try:
+            pygame.mixer.init()
+        except pygame.error:
+            # Headless server: decode without an output device
+            os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+            pygame.mixer.init()
+
+    rate, sample_format, channels = pygame.mixer.get_init()
+    sound = pygame.mixer.Sound(file=io.BytesIO(audio))
+    samples = pygame.sndarray.array(sound).astype(np.float32)
+    samples /= float(2 ** (abs(sample_format) - 1))
+
+    if samples.ndim > 1:
+        samples = samples.mean(axis=1)
+    return rate, samples
+
+
+def encode_wav(samples, rate):
+    """Encode mono float32 samples in [-1, 1] as 16-bit PCM WAV bytes"""
+    pcm = (np.clip(samples, -1.0, 1.0) * 32767).astype('<i2')
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(pcm.tobytes())
+    return buffer.getvalue()
+
+
+def _resample(samples, source_rate, target_rate):
+    if source_rate == target_rate or len(samples) == 0:
+        return samples
+    target_length = int(round(len(samples) * target_rate / source_rate))
+    positions = np.linspace(0, len(samples) - 1, target_length)
+    return np.interp(positions, np.arange(len(samples)), samples).astype(np.float32)
+
+
+def _trim_silence(samples, rate, threshold=0.02, padding=0.02):
+    """Cut leading/trailing silence so joined clips do not leave gaps"""
+    loud = np.flatnonzero(np.abs(samples) > threshold * max(np.abs(samples).max(initial=0), 1e-9))
+    if len(loud) == 0:
+        return samples[:0]
+    pad = int(rate * padding)
+    return samples[max(0, loud[0] - pad):loud[-1] + pad + 1]
+
+
+class ClipBank:
+    """Pre-rendered token clips joined into equation audio.
+
+    Every number word, digit and math term the verbalizer can emit is
+    synthesized once (through the engine, so the audio pack and cache
+    apply), decoded to PCM, trimmed and given short fade ramps.
+    Speaking an equation is then a lookup of its units plus one
+    overlap-add and a single WAV encode.
+    """
+
+    def __init__(self, speech_engine, max_number=100, crossfade=0.015):
+        self.speech_engine = speech_engine
+        self.max_number = max_number
+        self.crossfade = crossfade
+        self.decimal_point = DECIMAL_POINT.get(speech_engine.language, DECIMAL_POINT["en"])
+
+        self.rate = None
+        self.clips = {}
+        self._lock = threading.Lock()
+
+        # Longest phrases first so multi-word terms win over their parts
+        phrases = sorted(set(spoken_terms(speech_engine.language)), key=len, reverse=True)
+        self._unit_pattern = re.compile(
+            "|".join([re.escape(p) for p in phrases] + [r'\d+(?:\.\d+)?', r'\S+'])
+        )
+
+    @classmethod
+    def static_units(cls, language, max_number=100):
+        """Return the text of every clip the bank pre-renders"""
+        units = [str(n) for n in range(max_number + 1)]
+        units.extend(spoken_terms(language))
+        units.append(DECIMAL_POINT.get(language, DECIMAL_POINT["en"]))
+        return list(dict.fromkeys(units))
+
+    def prerender(self):
+        """Synthesize and decode every static unit"""
+        for unit in self.static_units(self.speech_engine.language, self.max_number):
+            self._clip(unit)
+        return len(self.clips)
+
+    def _clip(self, unit):
+        clip = self.clips.get(unit)
+        if clip is not None:
+            return clip
+
+        rate, samples = decode_audio(self.speech_engine.synthesize(unit))
+        with self._lock:
+            if self.rate is None:
+                self.rate = rate
+        samples = _trim_silence(_resample(samples, rate, self.rate), self.rate)
+
+        # Fade both ends; overlap-adding neighbours then gives a crossfade
+        ramp_length = min(int(self.rate * self.crossfade), len(samples) // 2)
+        if ramp_length:
+            samples = samples.copy()
+            ramp = np.linspace(0.0, 1.0, ramp_length, dtype=np.float32)
+            samples[:ramp_length] *= ramp
+            samples[-ramp_length:] *= ramp[::-1]
+
+        with self._lock:
+            self.clips[unit] = samples
+        return samples
+
+    def split_units(self, speech_text):
+        """Split preprocessed equation text into clip units"""
+        units = []
+        for match in self._unit_pattern.finditer(speech_text):
+            token = match.group()
+            if token[0].isdigit():
+                units.extend(self._number_units(token))
+            else:
+                units.append(token)
+        return units
+
+    def _number_units(self, number):
+        whole, _, fraction = number.partition('.')
+        units = [whole] if int(whole) <= self.max_number else list(whole)
+        if fraction:
+            units.append(self.decimal_point)
+            units.extend(fraction)
+        return units
+
+    def join(self, units):
+        """Overlap-add the clips for units and return mono float32 samples"""
+        clips = [self._clip(unit) for unit in units]
+        clips = [clip for clip in clips if len(clip)]
+        if not clips:
+            return np.zeros(0, dtype=np.float32)
+
+        overlap = int(self.rate * self.crossfade)
+        offsets = []
+        position = 0
+        for clip in clips:
+            offsets.append(position)
+            position += max(len(clip) - overlap, 1)
+        total = offsets[-1] + len(clips[-1])
+
+        output = np.zeros(total, dtype=np.float32)
+        for offset, clip in zip(offsets, clips):
+            output[offset:offset + len(clip)] += clip
+        return output
+
+    def render(self, speech_text):
+        """Return WAV bytes for already-verbalized equation text"""
+        samples = self.join(self.split_units(speech_text))
+        return encode_wav(samples, self.rate or 24000)
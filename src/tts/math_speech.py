@@ -4,9 +4,22 @@ class MathSpeech:
     def __init__(self, speech_engine):
         self.speech_engine = speech_engine
         self.math_processor = MathProcessor()
+        # Equations share the engine's audio cache
+        self.cache = speech_engine.cache
         
     def speak_equation(self, equation):
         """Convert equation to speech and speak it"""
         speech_text = self.math_processor.equation_to_speech(equation, 
                                                             language=self.speech_engine.language)
+        
+        # Join pre-rendered token clips instead of synthesizing the whole equation
+        if getattr(self.speech_engine, 'equation_mode', None) == 'clips':
+            try:
+                _, audio = self.speech_engine.synthesize_clips(speech_text)
+                self.speech_engine.play(audio)
+                return True
+            except Exception as e:
+                print(f"Error in TTS: {e}")
+                return False
+        
         return self.speech_engine.speak(speech_text)
\ No newline at end of file
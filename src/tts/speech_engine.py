@@ -1,32 +1,62 @@
-import os
-import tempfile
-from gtts import gTTS
+import io
 import pygame
+from .audio_cache import get_shared_cache, make_cache_key, audio_namehint
+from .audio_pack import get_shared_audio_pack
+from .backends import get_backend
 
 class SpeechEngine:
-    def __init__(self, language='si'):
+    def __init__(self, language='si', cache=None, speed=1.0, audio_pack=None,
+                 backend=None, synthesis_service=None):
         self.language = language
-        pygame.mixer.init()
+        self.synthesis_service = synthesis_service
+        if backend is None:
+            backend = synthesis_service.backend if synthesis_service else get_backend()
+        self.backend = backend
+        self.engine_name = backend.name
+        self.speed = speed
+        self.cache = cache if cache is not None else get_shared_cache()
+        self.audio_pack = audio_pack if audio_pack is not None else get_shared_audio_pack()
+        
+    def render(self, text):
+        """Run the TTS backend directly, bypassing the pack and cache"""
+        return self.backend.synthesize(text, self.language, self.speed)
+        
+    def synthesize(self, text):
+        """Return audio for text, synthesizing only pack and cache misses"""
+        key = make_cache_key(text, self.language, self.engine_name, self.speed)
+        
+        # Memory tier first; packed phrases are kept in memory once read
+        audio = self.cache.get(key)
+        if audio is not None:
+            return audio
+        
+        audio = self.audio_pack.get(key)
+        if audio is not None:
+            self.cache.remember(key, audio)
+            return audio
+        
+        if self.synthesis_service is not None:
+            # Runs on the worker pool; identical concurrent requests share one job
+            audio = self.synthesis_service.synthesize(text, self.language, self.speed)
+        else:
+            audio = self.render(text)
+        self.cache.put(key, audio)
+        return audio
         
     def speak(self, text):
         """Convert text to speech and play it"""
         try:
-            # Create a temporary file
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.mp3') as fp:
-                temp_filename = fp.name
-                
-            # Generate speech
-            tts = gTTS(text=text, lang=self.language, slow=False)
-            tts.save(temp_filename)
+            audio = self.synthesize(text)
             
-            # Play the audio
-            pygame.mixer.music.load(temp_filename)
+            # Play the audio on the local device
+            if not pygame.mixer.get_init():
+                pygame.mixer.init()
+            # Backends return MP3 or WAV; tell pygame which
+            pygame.mixer.music.load(io.BytesIO(audio), audio_namehint(audio))
             pygame.mixer.music.play()
             while pygame.mixer.music.get_busy():
                 pygame.time.Clock().tick(10)
                 
-            # Clean up temp file
-            os.unlink(temp_filename)
             return True
         except Exception as e:
             print(f"Error in TTS: {e}")
@@ -0,0 +1,130 @@
+# src/tts/synthesis_service.py
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from .audio_cache import make_cache_key
+
+
+class SynthesisService:
+    """Bounded thread pool that runs TTS off the request thread.
+
+    Identical requests that arrive while a job for the same cache key is
+    still queued or running share that job's Future instead of starting a
+    new synthesis. The backend is any object with a ``name`` and a
+    ``synthesize(text, language, speed)`` method returning audio bytes.
+    """
+
+    def __init__(self, backend, max_workers=4, language='si', speed=1.0, cache=None,
+                 timing_window=200):
+        self.backend = backend
+        self.language = language
+        self.speed = speed
+        self.cache = cache
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix='tts')
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self._timings = deque(maxlen=timing_window)
+
+        self.max_workers = max_workers
+        self.queued = 0
+        self.running = 0
+        self.submitted = 0
+        self.coalesced = 0
+        self.completed = 0
+        self.failed = 0
+
+    def synthesize_async(self, text, language=None, speed=None):
+        """Return a Future resolving to the audio bytes for text"""
+        language = language or self.language
+        speed = self.speed if speed is None else speed
+        key = make_cache_key(text, language, self.backend.name, speed)
+
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future
+
+            self.submitted += 1
+            self.queued += 1
+            future = self._executor.submit(self._run, key, text, language, speed,
+                                           time.perf_counter())
+            self._in_flight[key] = future
+
+        future.add_done_callback(lambda done: self._release(key, done))
+        return future
+
+    def synthesize(self, text, language=None, speed=None, timeout=None):
+        """Blocking wrapper around synthesize_async"""
+        return self.synthesize_async(text, language, speed).result(timeout)
+
+    def _release(self, key, future):
+        with self._lock:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+
+    def _run(self, key, text, language, speed, submitted_at):
+        started_at = time.perf_counter()
+        with self._lock:
+            self.queued -= 1
+            self.running += 1
+
+        try:
+            audio = self.cache.get(key) if self.cache is not None else None
+            if audio is None:
+                audio = self.backend.synthesize(text, language, speed)
+                if self.cache is not None:
+                    self.cache.put(key, audio)
+        except Exception:
+            with self._lock:
+                self.running -= 1
+                self.failed += 1
+            raise
+
+        finished_at = time.perf_counter()
+        with self._lock:
+            self.running -= 1
+            self.completed += 1
+            self._timings.append({
+                "key": key,
+                "chars": len(text),
+                "bytes": len(audio),
+                "wait_ms": (started_at - submitted_at) * 1000,
+                "run_ms": (finished_at - started_at) * 1000
+            })
+        return audio
+
+    @property
+    def queue_depth(self):
+        with self._lock:
+            return self.queued
+
+    def stats(self):
+        """Return queue depth, counters and recent per-job timings"""
+        with self._lock:
+            timings = list(self._timings)
+            stats = {
+                "backend": self.backend.name,
+                "max_workers": self.max_workers,
+                "queue_depth": self.queued,
+                "running": self.running,
+                "in_flight": len(self._in_flight),
+                "submitted": self.submitted,
+                "coalesced": self.coalesced,
+                "completed": self.completed,
+                "failed": self.failed
+            }
+
+        if timings:
+            stats["mean_wait_ms"] = sum(t["wait_ms"] for t in timings) / len(timings)
+            stats["mean_run_ms"] = sum(t["run_ms"] for t in timings) / len(timings)
+        stats["recent_jobs"] = timings[-20:]
+        return stats
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,28 @@
+import os
+import uuid
+
+import pytest
+
+# PostgreSQL tests run against this database and are skipped when it is unset
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+
+@pytest.fixture
+def pg_dsn():
+    """DSN of a throwaway schema in the test database, dropped afterwards"""
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    import psycopg2
+    from psycopg2.extensions import make_dsn
+
+    schema = f"mathlearn_test_{uuid.uuid4().hex[:12]}"
+    admin = psycopg2.connect(TEST_DATABASE_URL)
+    admin.autocommit = True
+    with admin.cursor() as cursor:
+        cursor.execute(f'CREATE SCHEMA {schema}')
+    try:
+        yield make_dsn(TEST_DATABASE_URL, options=f'-csearch_path={schema}')
+    finally:
+        with admin.cursor() as cursor:
+            cursor.execute(f'DROP SCHEMA {schema} CASCADE')
+        admin.close()
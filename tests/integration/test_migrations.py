@@ -0,0 +1,133 @@
+import datetime
+
+from src.models import migrations
+
+
+def _months_ago(months, today=None):
+    month = migrations._month_start(today or datetime.date.today())
+    for _ in range(months):
+        month = datetime.date(month.year - (month.month == 1), (month.month - 2) % 12 + 1, 1)
+    return month
+
+
+def _partitions(cursor):
+    cursor.execute('''
+    SELECT child.relname FROM pg_inherits
+    JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+    JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+    WHERE parent.relname = 'performance_history'
+    ''')
+    return {row[0] for row in cursor.fetchall()}
+
+
+def _count(cursor, table):
+    cursor.execute(f'SELECT COUNT(*) FROM {table}')
+    return cursor.fetchone()[0]
+
+
+def _check_rollup_refresh(db):
+    """REFRESH ... CONCURRENTLY works and the view matches the history table"""
+    migrations.refresh_rollups(db)
+    with db.cursor() as cursor:
+        cursor.execute('SELECT COALESCE(SUM(attempts), 0) FROM performance_daily')
+        assert cursor.fetchone()[0] == _count(cursor, 'performance_history')
+
+
+def test_migrate_empty_database(pg_dsn):
+    from src.models.database import Database
+
+    db = Database(pg_dsn, minconn=1, maxconn=2)
+    try:
+        assert db.pool is not None
+        with db.cursor() as cursor:
+            assert migrations.applied_versions(cursor) == {v for v, _, _ in migrations.MIGRATIONS}
+            partitions = _partitions(cursor)
+        assert "performance_history_default" in partitions
+        month = migrations._month_start(datetime.date.today())
+        for _ in range(migrations.PARTITION_MONTHS_AHEAD + 1):
+            assert migrations._partition_name(month) in partitions
+            month = migrations._next_month(month)
+
+        _check_rollup_refresh(db)
+        with db.cursor() as cursor:
+            cursor.execute("INSERT INTO students (student_id, impairment_type) VALUES ('s1', 1)")
+            cursor.execute('''
+            INSERT INTO performance_history
+                (student_id, topic, question_type, difficulty, is_correct, response_time)
+            VALUES ('s1', 'addition', 'addition', 1, TRUE, 2.5)
+            ''')
+        _check_rollup_refresh(db)
+
+        # A second run has nothing left to apply
+        assert migrations.migrate(db) == []
+    finally:
+        db.close()
+
+
+def test_migrate_seeded_database(pg_dsn):
+    import psycopg2
+    from src.models.database import Database
+
+    # A database left at the initial schema, with history spread over several months
+    months = [_months_ago(4), _months_ago(2), _months_ago(0)]
+    conn = psycopg2.connect(pg_dsn)
+    with conn, conn.cursor() as cursor:
+        migrations.applied_versions(cursor)
+        migrations._initial_schema(cursor)
+        cursor.execute("INSERT INTO schema_migrations (version, name) VALUES (1, 'initial schema')")
+        for i in range(3):
+            cursor.execute('INSERT INTO students (student_id, impairment_type) VALUES (%s, 1)',
+                           (f"s{i}",))
+            cursor.execute('INSERT INTO progress (student_id, topic, level) VALUES (%s, %s, %s)',
+                           (f"s{i}", "addition", 1.5 + i))
+            for j, month in enumerate(months):
+                for k in range(5):
+                    cursor.execute('''
+                    INSERT INTO performance_history
+                        (student_id, topic, question_type, difficulty, is_correct,
+                         response_time, created_at)
+                    VALUES (%s, 'addition', 'addition', %s, %s, %s, %s)
+                    ''', (f"s{i}", j + 1, k % 2 == 0, 1.0 + k,
+                          datetime.datetime.combine(month, datetime.time(10)) +
+                          datetime.timedelta(days=k)))
+        cursor.execute('SELECT id FROM performance_history')
+        seeded_ids = {row[0] for row in cursor.fetchall()}
+    conn.close()
+
+    db = Database(pg_dsn, minconn=1, maxconn=2)
+    try:
+        assert db.pool is not None
+        with db.cursor() as cursor:
+            assert migrations.applied_versions(cursor) == {v for v, _, _ in migrations.MIGRATIONS}
+            assert _count(cursor, 'students') == 3
+            assert _count(cursor, 'progress') == 3
+            cursor.execute('SELECT id FROM performance_history')
+            assert {row[0] for row in cursor.fetchall()} == seeded_ids
+
+            cursor.execute("SELECT relkind FROM pg_class WHERE relname = 'performance_history'")
+            assert cursor.fetchone()[0] == 'p'
+            assert not any(name.endswith('_unpartitioned') for name in _partitions(cursor))
+            cursor.execute("SELECT to_regclass('performance_history_unpartitioned')")
+            assert cursor.fetchone()[0] is None
+
+            # Every seeded row sits in its own month's partition, none in the default
+            cursor.execute('''
+            SELECT tableoid::regclass::text, date_trunc('month', created_at)::date
+            FROM performance_history
+            ''')
+            for partition, month in cursor.fetchall():
+                assert partition == migrations._partition_name(month)
+            assert _count(cursor, 'ONLY performance_history_default') == 0
+
+            # The id sequence carries on after the copied rows
+            cursor.execute('''
+            INSERT INTO performance_history
+                (student_id, topic, question_type, difficulty, is_correct)
+            VALUES ('s0', 'addition', 'addition', 1, TRUE) RETURNING id
+            ''')
+            assert cursor.fetchone()[0] > max(seeded_ids)
+
+        _check_rollup_refresh(db)
+        assert migrations.migrate(db) == []
+    finally:
+        db.close()
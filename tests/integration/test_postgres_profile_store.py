@@ -0,0 +1,47 @@
+import threading
+
+import pytest
+
+from src.learning.student_profile import StudentProfile, answer_record
+
+
+def test_concurrent_apply_answers_with_a_small_pool(pg_dsn):
+    from src.learning.profile_store import PostgresProfileStore
+    from src.models.database import Database
+
+    # Fewer connections than threads, each holding a student lock while its
+    # nested store calls run
+    db = Database(pg_dsn, minconn=1, maxconn=2)
+    store = PostgresProfileStore(db)
+    students = [f"student-{i}" for i in range(4)]
+    rounds = 5
+    errors = []
+
+    def answer(student_id):
+        try:
+            profile = StudentProfile(student_id, store=store, multiprocess=True)
+            for _ in range(rounds):
+                profile.apply_answers([answer_record("addition", "", True, 2.0)])
+        except Exception as e:
+            errors.append(e)
+
+    # Two threads per student, so the same advisory lock is contended too
+    threads = [threading.Thread(target=answer, args=(student_id,))
+               for student_id in students for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(60)
+
+    try:
+        assert not any(thread.is_alive() for thread in threads)
+        assert errors == []
+        for student_id in students:
+            records, _ = store.read_history(student_id)
+            assert len(records) == 2 * rounds
+            data, version = store.load(student_id)
+            assert version == 2 * rounds
+            # No answer lost to a concurrent save
+            assert data["topic_progress"]["addition"] == pytest.approx(1 + 0.2 * 2 * rounds)
+    finally:
+        store.close()
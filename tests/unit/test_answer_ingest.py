@@ -0,0 +1,101 @@
+import os
+
+from src.learning.answer_ingest import AnswerIngestor
+from src.learning.profile_store import HistoryWriteError
+
+
+class FakeStore:
+    """History kept in memory; `down` makes every write fail"""
+
+    def __init__(self):
+        self.history = {}
+        self.down = False
+
+    def append_history_many(self, batches):
+        if self.down:
+            raise HistoryWriteError(dict(batches), ConnectionError("store is down"))
+        for student_id, records in batches.items():
+            self.history.setdefault(student_id, []).extend(records)
+
+
+class FlakyApply:
+    """Profile update that fails for the students in `failing`"""
+
+    def __init__(self):
+        self.applied = {}
+        self.failing = set()
+
+    def __call__(self, student_id, records):
+        if student_id in self.failing:
+            raise ConnectionError("advisory lock unavailable")
+        self.applied.setdefault(student_id, []).extend(records)
+
+
+def answer(n):
+    return {"topic": "addition", "subtopic": "", "is_correct": True, "n": n}
+
+
+def make_ingestor(tmp_path, store, apply):
+    return AnswerIngestor(store, apply, spill_path=str(tmp_path / "spill.jsonl"),
+                          retry_interval=0)
+
+
+def test_failed_apply_is_replayed_without_rewriting_history(tmp_path):
+    store, apply = FakeStore(), FlakyApply()
+    ingestor = make_ingestor(tmp_path, store, apply)
+    apply.failing = {"s1"}
+
+    ingestor.submit("s1", answer(1))
+    ingestor.submit("s2", answer(2))
+    ingestor.drain()
+    # History is written for both; s1's profile is still owed its answer
+    assert store.history == {"s1": [answer(1)], "s2": [answer(2)]}
+    assert apply.applied == {"s2": [answer(2)]}
+    assert os.path.exists(ingestor.spill_path)
+
+    apply.failing = set()
+    ingestor.submit("s2", answer(3))
+    ingestor.drain()
+    assert apply.applied == {"s1": [answer(1)], "s2": [answer(2), answer(3)]}
+    assert store.history == {"s1": [answer(1)], "s2": [answer(2), answer(3)]}
+    assert not os.path.exists(ingestor.spill_path)
+
+
+def test_failed_apply_and_write_are_both_replayed(tmp_path):
+    store, apply = FakeStore(), FlakyApply()
+    ingestor = make_ingestor(tmp_path, store, apply)
+    store.down = True
+    apply.failing = {"s1"}
+
+    ingestor.submit("s1", answer(1))
+    ingestor.submit("s2", answer(2))
+    ingestor.drain()
+    assert store.history == {}
+    assert apply.applied == {"s2": [answer(2)]}
+    assert ingestor.stats()["spilled"] == 2
+
+    # Store back, profile still failing: history is caught up, the apply stays owed
+    store.down = False
+    ingestor._replay()
+    assert store.history == {"s1": [answer(1)], "s2": [answer(2)]}
+    assert apply.applied == {"s2": [answer(2)]}
+
+    apply.failing = set()
+    ingestor._replay()
+    assert apply.applied == {"s1": [answer(1)], "s2": [answer(2)]}
+    assert store.history == {"s1": [answer(1)], "s2": [answer(2)]}
+    assert ingestor.stats()["replayed"] == 2
+    assert not os.path.exists(ingestor.spill_path)
+
+
+def test_backpressure_spill_is_applied_and_written_on_replay(tmp_path):
+    store, apply = FakeStore(), FlakyApply()
+    ingestor = AnswerIngestor(store, apply, max_queue=1, enqueue_timeout=0,
+                              spill_path=str(tmp_path / "spill.jsonl"), retry_interval=0)
+    ingestor.submit("s1", answer(1))
+    ingestor.submit("s1", answer(2))  # queue full: spilled unapplied and unwritten
+    ingestor.drain()
+
+    assert store.history == {"s1": [answer(1), answer(2)]}
+    assert apply.applied == {"s1": [answer(1), answer(2)]}
+    assert not os.path.exists(ingestor.spill_path)
@@ -0,0 +1,71 @@
+import importlib
+
+import pytest
+
+import config
+from src.tts import audio_cache, audio_pack
+from src.tts.audio_cache import AudioCache, make_cache_key
+from src.tts.audio_pack import AudioPack
+from src.tts.enhanced_speech_engine import EnhancedSpeechEngine
+
+AUDIO = b"RIFF\x00\x00\x00\x00WAVE" + bytes(range(256)) * 4
+
+
+class FixedBackend:
+    name = 'fixed'
+
+    def synthesize(self, text, language, speed=1.0):
+        return AUDIO
+
+
+@pytest.fixture
+def app_module(tmp_path, monkeypatch):
+    # Keep the module-level components off the network and out of ./data
+    monkeypatch.setattr(config, "TTS_ENGINE", "null")
+    monkeypatch.setattr(config, "TTS_CACHE_DIR", str(tmp_path / "shared_cache"))
+    monkeypatch.setattr(config, "TTS_AUDIO_PACK_DIR", str(tmp_path / "shared_pack"))
+    monkeypatch.setattr(config, "ANSWER_INGEST", False)
+    monkeypatch.setattr(config, "LESSON_PREFETCH", False)
+    monkeypatch.setattr(config, "PROFILE_WRITE_BEHIND", False)
+    monkeypatch.setattr(audio_cache, "_shared_cache", None)
+    monkeypatch.setattr(audio_pack, "_shared_pack", None)
+    module = importlib.import_module("app")
+
+    # The cache holds clips in memory only, so get_audio serves them itself
+    engine = EnhancedSpeechEngine(cache=AudioCache(), audio_pack=AudioPack(str(tmp_path / "pack")),
+                                  backend=FixedBackend(), equation_mode="synthesize")
+    monkeypatch.setattr(module, "speech_engine", engine)
+    return module
+
+
+def test_get_audio_serves_ranges(app_module):
+    client = app_module.app.test_client()
+    key = make_cache_key("හොඳයි", "si", "fixed", 1.0)
+    app_module.speech_engine.cache.put(key, AUDIO)
+
+    whole = client.get(f"/api/audio/{key}")
+    assert whole.status_code == 200
+    assert whole.data == AUDIO
+    assert whole.headers["Accept-Ranges"] == "bytes"
+
+    part = client.get(f"/api/audio/{key}", headers={"Range": "bytes=100-199"})
+    assert part.status_code == 206
+    assert part.data == AUDIO[100:200]
+    assert part.headers["Content-Range"] == f"bytes 100-199/{len(AUDIO)}"
+    assert part.mimetype == "audio/wav"
+
+    assert client.get("/api/audio/" + "0" * 64).status_code == 404
+
+
+def test_speak_returns_the_whole_clip_and_a_ranged_url(app_module):
+    client = app_module.app.test_client()
+
+    response = client.post("/api/speak", json={"text": "හොඳයි"}, headers={"Range": "bytes=0-9"})
+    assert response.status_code == 200
+    assert response.data == AUDIO
+    assert "Accept-Ranges" not in response.headers
+
+    url = client.post("/api/speak", json={"text": "හොඳයි", "response": "url"}).get_json()["url"]
+    part = client.get(url, headers={"Range": "bytes=0-9"})
+    assert part.status_code == 206
+    assert part.data == AUDIO[:10]
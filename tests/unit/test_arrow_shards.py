@@ -0,0 +1,72 @@
+import json
+import os
+
+import pytest
+
+from src.data.arrow_shards import SCHEMA, ShardWriter, read_shard, shard_paths
+from src.data.generate_training_data import generate_training_dataset
+
+
+def sample_problems(count):
+    return [{
+        "question": f"ගොවිපලට පළමුව {i} ක් සහ පසුව {i + 1} ක් එකතු විය. මුළු එකතුව කීයද?",
+        "answer": 2 * i + 1,
+        "type": "addition",
+        "difficulty": 1 + i % 10,
+        "context_type": "rural",
+        "solution": f"{i} + {i + 1} = {2 * i + 1}"
+    } for i in range(count)]
+
+
+def expected_rows(problems):
+    return [dict(problem, answer=str(problem["answer"])) for problem in problems]
+
+
+def test_shard_round_trip(tmp_path):
+    path = str(tmp_path / "shard-00000.arrow")
+    problems = sample_problems(7)
+    # Several record batches, the last one partial
+    with ShardWriter(path, rows_per_batch=3) as writer:
+        writer.write(problems)
+
+    assert writer.rows == 7
+    assert not os.path.exists(f"{path}.tmp")
+    table = read_shard(path)
+    assert table.schema == SCHEMA
+    assert table.to_pylist() == expected_rows(problems)
+
+
+def test_shard_opens_with_dataset_from_file(tmp_path):
+    datasets = pytest.importorskip("datasets")
+    path = str(tmp_path / "shard-00000.arrow")
+    problems = sample_problems(25)
+    with ShardWriter(path, rows_per_batch=10) as writer:
+        writer.write(problems)
+
+    dataset = datasets.Dataset.from_file(path)
+    assert dataset.num_rows == 25
+    assert dataset.column_names == SCHEMA.names
+    assert dataset.to_list() == expected_rows(problems)
+
+
+def test_failed_write_leaves_no_shard(tmp_path):
+    path = str(tmp_path / "shard-00000.arrow")
+    with pytest.raises(KeyError):
+        with ShardWriter(path) as writer:
+            writer.write([{"question": "x"}])
+    assert os.listdir(tmp_path) == []
+
+
+def test_generate_training_dataset_keeps_existing_build(tmp_path):
+    output_dir = str(tmp_path)
+    with open(os.path.join(output_dir, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump({"shards": []}, f)
+
+    with pytest.raises(ValueError):
+        generate_training_dataset(40, seed=0, output_dir=output_dir)
+    assert shard_paths(output_dir) == []
+
+    generate_training_dataset(40, seed=0, output_dir=output_dir, overwrite=True)
+    assert not os.path.exists(os.path.join(output_dir, "manifest.json"))
+    [path] = shard_paths(output_dir)
+    assert read_shard(path).num_rows == 40
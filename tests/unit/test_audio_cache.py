@@ -0,0 +1,156 @@
+import json
+import os
+
+from src.tts.audio_cache import AudioCache
+from src.tts.audio_pack import AudioPack, build_audio_pack
+
+
+def clip(n, size=100):
+    return b"RIFF\x00\x00\x00\x00WAVE" + bytes([n]) * size
+
+
+def test_memory_tier_evicts_least_recently_used():
+    cache = AudioCache(max_memory_items=2)
+    cache.put("a", clip(1))
+    cache.put("b", clip(2))
+    assert cache.get("a") == clip(1)  # "b" is now the oldest
+    cache.put("c", clip(3))
+
+    assert cache.get("b") is None
+    assert cache.get("a") == clip(1)
+    assert cache.get("c") == clip(3)
+    stats = cache.stats()
+    assert stats["memory_evictions"] == 1
+    assert stats["memory_items"] == 2
+    assert stats["misses"] == 1
+
+
+def test_disk_tier_stays_within_its_budget(tmp_path):
+    size = len(clip(0))
+    cache = AudioCache(str(tmp_path), max_memory_items=1, max_disk_bytes=3 * size)
+    for n in range(3):
+        cache.put(f"k{n}", clip(n))
+    cache.get("k0")  # k1 is now the least recently used on disk
+    cache.put("k3", clip(3))
+
+    stats = cache.stats()
+    assert stats["disk_bytes"] <= 3 * size
+    assert stats["disk_items"] == 3
+    assert stats["disk_evictions"] == 1
+    assert cache.path_for("k1") is None
+    assert not os.path.exists(tmp_path / "k1.audio")
+    assert cache.path_for("k0") is not None
+
+
+def test_evicted_from_memory_is_read_back_from_disk(tmp_path):
+    cache = AudioCache(str(tmp_path), max_memory_items=1)
+    cache.put("a", clip(1))
+    cache.put("b", clip(2))
+
+    assert cache.get("a") == clip(1)
+    stats = cache.stats()
+    assert stats["disk_hits"] == 1
+    assert stats["memory_hits"] == 0
+    # The disk hit is back in memory
+    assert cache.get("a") == clip(1)
+    assert cache.stats()["memory_hits"] == 1
+
+
+def test_remember_keeps_audio_off_disk(tmp_path):
+    cache = AudioCache(str(tmp_path))
+    cache.remember("a", clip(1))
+    assert cache.get("a") == clip(1)
+    assert cache.path_for("a") is None
+    assert cache.stats()["disk_items"] == 0
+
+
+def test_warm_start_loads_recent_disk_entries(tmp_path):
+    first = AudioCache(str(tmp_path))
+    for n in range(3):
+        first.put(f"k{n}", clip(n))
+        # Distinct access times, oldest first
+        os.utime(tmp_path / f"k{n}.audio", (1000 + n, 1000 + n))
+
+    cache = AudioCache(str(tmp_path), max_memory_items=2, warm=True)
+    stats = cache.stats()
+    assert stats["disk_items"] == 3
+    assert stats["memory_items"] == 2
+    assert cache.get("k2") == clip(2)
+    assert cache.get("k1") == clip(1)
+    assert cache.stats()["memory_hits"] == 2
+    assert cache.get("k0") == clip(0)
+    assert cache.stats()["disk_hits"] == 1
+
+    cold = AudioCache(str(tmp_path))
+    assert cold.stats()["memory_items"] == 0
+
+
+class CountingBackend:
+    name = 'counting'
+
+    def __init__(self):
+        self.rendered = []
+
+    def synthesize(self, text, language, speed=1.0):
+        self.rendered.append(text)
+        return b"RIFF\x00\x00\x00\x00WAVE" + text.encode('utf-8')
+
+
+class PackEngine:
+    """The parts of a speech engine build_audio_pack uses"""
+
+    language = 'si'
+    speed = 1.0
+
+    def __init__(self):
+        self.backend = CountingBackend()
+        self.engine_name = self.backend.name
+
+    def render(self, text):
+        return self.backend.synthesize(text, self.language, self.speed)
+
+
+def test_audio_pack_rebuild_renders_only_changes(tmp_path):
+    pack_dir = str(tmp_path)
+    engine = PackEngine()
+
+    result = build_audio_pack(pack_dir, engine, phrases=["one", "two"], max_workers=2)
+    assert result["version"] == 1
+    assert result["rendered"] == 2
+    assert sorted(engine.backend.rendered) == ["one", "two"]
+
+    # Nothing changed: nothing rendered and the version stays
+    result = build_audio_pack(pack_dir, engine, phrases=["one", "two"], max_workers=2)
+    assert result["version"] == 1
+    assert result["rendered"] == 0
+    assert result["reused"] == 2
+    assert len(engine.backend.rendered) == 2
+
+    # One phrase added and one dropped: only the new one is rendered
+    result = build_audio_pack(pack_dir, engine, phrases=["one", "three"], max_workers=2)
+    assert result["version"] == 2
+    assert (result["rendered"], result["reused"], result["removed"]) == (1, 1, 1)
+    assert engine.backend.rendered[-1] == "three"
+
+    pack = AudioPack(pack_dir)
+    assert pack.version == 2
+    assert sorted(entry["text"] for entry in pack.manifest["entries"].values()) == ["one", "three"]
+    assert len(os.listdir(pack_dir)) == 3  # two clips and the manifest
+    for key, entry in pack.manifest["entries"].items():
+        assert pack.get(key) == b"RIFF\x00\x00\x00\x00WAVE" + entry["text"].encode('utf-8')
+
+
+def test_audio_pack_rerenders_a_missing_clip(tmp_path):
+    pack_dir = str(tmp_path)
+    engine = PackEngine()
+    build_audio_pack(pack_dir, engine, phrases=["one", "two"])
+    pack = AudioPack(pack_dir)
+    key, entry = next(iter(pack.manifest["entries"].items()))
+    os.unlink(pack.path_for(key))
+
+    result = build_audio_pack(pack_dir, engine, phrases=["one", "two"])
+    assert result["rendered"] == 1
+    assert result["version"] == 2
+    with open(os.path.join(pack_dir, AudioPack.MANIFEST), encoding='utf-8') as f:
+        assert json.load(f)["entries"][key]["file"] == entry["file"]
+    assert AudioPack(pack_dir).get(key) is not None
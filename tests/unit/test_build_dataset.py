@@ -0,0 +1,41 @@
+import json
+import os
+import types
+
+import pytest
+
+from src.data.build_dataset import MANIFEST_NAME, build_dataset, training_shard_paths
+from src.data.math_problem_generator import TrainingDataGenerator
+
+
+def test_training_shard_paths_without_a_dataset(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        training_shard_paths(str(tmp_path))
+
+
+def test_training_shard_paths_of_an_arrow_build(tmp_path):
+    build_dataset(str(tmp_path), 300, shard_size=100, workers=1)
+    paths = training_shard_paths(str(tmp_path))
+    assert [os.path.basename(path) for path in paths] == \
+        [f"shard-{i:05d}.arrow" for i in range(3)]
+
+
+def test_training_shard_paths_names_the_jsonl_build_to_replace(tmp_path):
+    build_dataset(str(tmp_path), 50, shard_size=50, workers=1, output_format="instructions")
+    with pytest.raises(ValueError, match="'instructions'.*--format arrow"):
+        training_shard_paths(str(tmp_path))
+
+
+def test_training_shard_paths_of_an_unfinished_build(tmp_path):
+    with open(tmp_path / MANIFEST_NAME, "w", encoding="utf-8") as f:
+        json.dump({"format": "arrow", "shards": []}, f)
+    with pytest.raises(ValueError, match="--resume"):
+        training_shard_paths(str(tmp_path))
+
+
+def test_generate_training_data_streams_examples():
+    examples = TrainingDataGenerator().generate_training_data(25, seed=0, chunk_size=10)
+    assert isinstance(examples, types.GeneratorType)
+    examples = list(examples)
+    assert len(examples) == 25
+    assert all(set(example) == {"instruction", "input", "output"} for example in examples)
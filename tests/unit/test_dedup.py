@@ -0,0 +1,161 @@
+import numpy as np
+import pytest
+
+from src.cultural.problem_generator import CulturalProblemGenerator, ProblemBatch, QUESTION_TEMPLATES
+from src.data.arrow_shards import read_shard
+from src.data.build_dataset import build_dataset, build_shard, load_manifest
+from src.data.dedup import (KEY_BITS, KEY_FIELDS, KEY_SHIFTS, TOPIC_CODES, Deduplicator,
+                            batch_keys, is_validation, key_partition, text_key)
+
+
+def make_batch(topic, difficulty, a, b, context_types=None, contexts=None, templates=None):
+    n = len(a)
+    zeros = np.zeros(n, dtype=np.int8)
+    return ProblemBatch(topic, difficulty,
+                        zeros if context_types is None else np.array(context_types, dtype=np.int8),
+                        zeros if contexts is None else np.array(contexts, dtype=np.int8),
+                        np.array(a), np.array(b), None,
+                        zeros if templates is None else np.array(templates, dtype=np.int8))
+
+
+def unpack(key, name):
+    return (int(key) >> KEY_SHIFTS[name]) & ((1 << KEY_BITS[name]) - 1)
+
+
+def test_key_fields_fit_in_64_bits_without_overlap():
+    assert sum(bits for _, bits in KEY_FIELDS) <= 64
+    masks = [((1 << KEY_BITS[name]) - 1) << KEY_SHIFTS[name] for name, _ in KEY_FIELDS]
+    for i, mask in enumerate(masks):
+        assert all(mask & other == 0 for other in masks[i + 1:])
+
+
+def test_batch_keys_pack_every_field():
+    batch = make_batch("probability", 10, a=[2 ** 24 - 1, 7], b=[1, 2 ** 24 - 1],
+                       context_types=[1, 0], contexts=[3, 2], templates=[0, 2])
+    keys = batch_keys(batch)
+    assert keys.dtype == np.uint64
+    first, second = keys.tolist()
+    assert unpack(first, "topic") == TOPIC_CODES["probability"]
+    assert unpack(first, "difficulty") == 10
+    assert (unpack(first, "context_type"), unpack(first, "context")) == (1, 3)
+    assert unpack(first, "template") == 0
+    assert (unpack(first, "a"), unpack(first, "b")) == (2 ** 24 - 1, 1)
+    # The weather template does not mention the context, so it is not part of the key
+    assert (unpack(second, "context_type"), unpack(second, "context")) == (0, 0)
+    assert unpack(second, "template") == 2
+    assert (unpack(second, "a"), unpack(second, "b")) == (7, 2 ** 24 - 1)
+
+
+@pytest.mark.parametrize("difficulty, a, b", [
+    (16, [1], [1]),
+    (-1, [1], [1]),
+    (1, [2 ** 24], [1]),
+    (1, [1], [2 ** 24]),
+    (1, [-1], [1]),
+])
+def test_batch_keys_reject_values_wider_than_their_field(difficulty, a, b):
+    with pytest.raises(ValueError):
+        batch_keys(make_batch("addition", difficulty, a, b))
+
+
+@pytest.mark.parametrize("topic", list(QUESTION_TEMPLATES))
+def test_keys_equal_exactly_when_problems_are(topic):
+    generator = CulturalProblemGenerator()
+    rng = np.random.default_rng(0)
+    for difficulty in (1, 2, 10):
+        batch = generator.generate_batch(topic, difficulty, 2000, rng)
+        texts = {}
+        for key, question in zip(batch_keys(batch).tolist(), batch.questions()):
+            assert texts.setdefault(key, question) == question
+        # No two distinct questions share a key
+        assert len(texts) == len(set(batch.questions()))
+
+
+def test_deduplicator_passes_each_problem_once():
+    generator = CulturalProblemGenerator()
+    rng = np.random.default_rng(1)
+    dedup = Deduplicator()
+    kept = []
+    for _ in range(5):
+        kept.extend(dedup.filter(generator.generate_batch("addition", 1, 500, rng)).questions())
+    assert len(kept) == len(set(kept))
+    assert dedup.stats()["kept"] == len(kept)
+    assert dedup.stats()["seen"] == len(kept) + dedup.stats()["duplicates"]
+    assert dedup.duplicates > 0
+
+
+def test_fill_stops_short_on_a_small_cell():
+    generator = CulturalProblemGenerator()
+    dedup = Deduplicator()
+    # Division at difficulty 1: divisor 2 and quotient 1..5 in eight contexts, 40 problems
+    questions = [q for batch in dedup.fill(generator, "division", 1, 10000,
+                                           np.random.default_rng(2)) for q in batch.questions()]
+    assert len(questions) == len(set(questions)) < 10000
+
+
+def shard_text_keys(path):
+    table = read_shard(path)
+    return [text_key(t, d, q) for t, d, q in zip(table.column("type").to_pylist(),
+                                                 table.column("difficulty").to_pylist(),
+                                                 table.column("question").to_pylist())]
+
+
+def test_random_shard_has_no_duplicates(tmp_path):
+    entry = build_shard(str(tmp_path), 0, 5000, np.random.SeedSequence(3), "arrow")
+    keys = shard_text_keys(str(tmp_path / entry["file"]))
+    assert len(keys) == len(set(keys)) == entry["examples"]
+    # Dropped duplicates are topped up
+    assert entry["examples"] == entry["requested"] == 5000
+    assert entry["duplicates"] > 0
+
+
+def test_partitioned_deduplicators_split_the_distinct_problems():
+    generator = CulturalProblemGenerator()
+    batch = generator.generate_batch("addition", 1, 5000, np.random.default_rng(5))
+    parts = [Deduplicator(partition=(index, 3)).filter(batch) for index in range(3)]
+    kept = [set(batch_keys(part).tolist()) for part in parts]
+    assert all(kept)
+    assert not kept[0] & kept[1] and not kept[0] & kept[2] and not kept[1] & kept[2]
+    assert set.union(*kept) == set(batch_keys(batch).tolist())
+    assert sum(len(part) for part in parts) == len(Deduplicator().filter(batch))
+
+
+def test_key_partition_spreads_keys_evenly():
+    keys = batch_keys(CulturalProblemGenerator().generate_batch(
+        "multiplication", 8, 30000, np.random.default_rng(6)))
+    counts = np.bincount(key_partition(np.unique(keys), 3).astype(np.int64), minlength=3)
+    assert counts.min() > 0.9 * counts.max()
+
+
+def test_random_build_has_no_duplicates_across_shards(tmp_path):
+    result = build_dataset(str(tmp_path), 3000, shard_size=1000, workers=1)
+    manifest = load_manifest(str(tmp_path))
+    keys = [key for entry in manifest["shards"]
+            for key in shard_text_keys(str(tmp_path / entry["file"]))]
+    assert result["examples"] == len(keys) == len(set(keys)) == 3000
+    assert manifest["dedup"] == "partitioned"
+
+
+def test_validation_split_is_disjoint_and_stable():
+    generator = CulturalProblemGenerator()
+    rng = np.random.default_rng(4)
+    problems = []
+    for topic in QUESTION_TEMPLATES:
+        for difficulty in (1, 5):
+            problems.extend(generator.generate_batch(topic, difficulty, 1000, rng).to_dicts())
+    # Repeat a slice so some problems occur more than once
+    problems += problems[:2000]
+
+    sides = {}
+    for problem in problems:
+        key = text_key(problem["type"], problem["difficulty"], problem["question"])
+        side = is_validation(key, 0.1)
+        assert sides.setdefault((problem["type"], problem["difficulty"], problem["question"]),
+                                side) == side
+    validation = {problem for problem, side in sides.items() if side}
+    training = {problem for problem, side in sides.items() if not side}
+    assert validation and training and not validation & training
+    assert len(validation) / len(sides) == pytest.approx(0.1, abs=0.02)
+    # Whitespace differences do not move a problem across the split
+    question = problems[0]["question"]
+    assert text_key("addition", 1, question) == text_key("addition", 1, f"  {question}  ")
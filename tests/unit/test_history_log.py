@@ -0,0 +1,35 @@
+import datetime
+
+from src.learning.history_log import HistoryLog
+
+
+def record(days_ago, now, is_correct=True):
+    timestamp = (now - datetime.timedelta(days=days_ago)).isoformat()
+    return {"timestamp": timestamp, "topic": "addition", "subtopic": "",
+            "is_correct": is_correct, "response_time": 2.0}
+
+
+def test_append_compacts_once_log_grows_past_threshold(tmp_path):
+    now = datetime.datetime.now()
+    log = HistoryLog("s1", str(tmp_path), compact_bytes=4096, retention_days=30)
+
+    log.append_many([record(60, now) for _ in range(5)])
+    # Below the threshold nothing is rolled up yet
+    assert log.load_summary()["compacted_until"] is None
+    assert len(log.records()) == 5
+
+    while log.load_summary()["compacted_until"] is None:
+        log.append(record(1, now))
+
+    summary = log.load_summary()
+    day = (now - datetime.timedelta(days=60)).date().isoformat()
+    assert summary["days"][day]["addition"][""]["attempts"] == 5
+    assert all(r["timestamp"] >= summary["compacted_until"] for r in log.records())
+
+
+def test_append_without_threshold_never_compacts(tmp_path):
+    now = datetime.datetime.now()
+    log = HistoryLog("s1", str(tmp_path))
+    log.append_many([record(60, now) for _ in range(200)])
+    assert log.load_summary()["compacted_until"] is None
+    assert len(log.records()) == 200
@@ -0,0 +1,46 @@
+from src.learning.lesson_generator import AdaptiveLessonGenerator
+from src.learning.profile_store import JsonProfileStore
+from src.learning.student_profile import StudentProfile, answer_record
+
+
+def profile_with(tmp_path, answers, student_id="s1"):
+    profile = StudentProfile(student_id, store=JsonProfileStore(str(tmp_path)), multiprocess=False)
+    profile.apply_answers([answer_record("addition", "", correct, 2.0) for correct in answers])
+    return profile
+
+
+def level_difficulty(profile):
+    return max(1, min(10, int(profile.get_proficiency_level("addition"))))
+
+
+def test_few_answers_keep_the_level_difficulty(tmp_path):
+    profile = profile_with(tmp_path, [True] * 4)
+    _, difficulty, _ = AdaptiveLessonGenerator().plan_lesson(profile, "addition")
+    assert difficulty == level_difficulty(profile)
+
+
+def test_accurate_run_steps_up_a_level(tmp_path):
+    profile = profile_with(tmp_path, [True] * 8)
+    _, difficulty, _ = AdaptiveLessonGenerator().plan_lesson(profile, "addition")
+    assert difficulty == level_difficulty(profile) + 1
+
+
+def test_accurate_but_just_missed_does_not_step_up(tmp_path):
+    profile = profile_with(tmp_path, [True] * 12 + [False])
+    stats = profile.get_topic_stats("addition")
+    assert stats["current_streak"] == 0 and stats["ewma_accuracy"] < 0.85
+    _, difficulty, _ = AdaptiveLessonGenerator().plan_lesson(profile, "addition")
+    assert difficulty == level_difficulty(profile)
+
+
+def test_mostly_wrong_recently_steps_down(tmp_path):
+    profile = profile_with(tmp_path, [True] * 20 + [False] * 5)
+    assert profile.get_topic_stats("addition")["ewma_accuracy"] < 0.4
+    _, difficulty, _ = AdaptiveLessonGenerator().plan_lesson(profile, "addition")
+    assert difficulty == level_difficulty(profile) - 1
+
+
+def test_difficulty_stays_in_range(tmp_path):
+    profile = profile_with(tmp_path, [False] * 10)
+    _, difficulty, _ = AdaptiveLessonGenerator().plan_lesson(profile, "addition")
+    assert difficulty == 1
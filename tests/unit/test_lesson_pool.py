@@ -0,0 +1,87 @@
+import time
+
+from src.learning.lesson_generator import AdaptiveLessonGenerator
+from src.learning.lesson_pool import LessonPool
+from src.learning.profile_store import JsonProfileStore
+from src.learning.student_profile import StudentProfile, answer_record
+
+
+class CountingGenerator(AdaptiveLessonGenerator):
+    def __init__(self):
+        super().__init__()
+        self.built = 0
+
+    def build_lesson(self, focus_topic, difficulty, learning_style):
+        self.built += 1
+        return super().build_lesson(focus_topic, difficulty, learning_style)
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def make_profile(tmp_path, student_id="s1"):
+    profile = StudentProfile(student_id, store=JsonProfileStore(str(tmp_path)), multiprocess=False)
+    # Prefetch follows an answer, which puts the topic on the learning path
+    profile.update_progress("addition", "", True, 2.0)
+    return profile
+
+
+def test_miss_builds_now_and_refills_the_pool(tmp_path):
+    generator = CountingGenerator()
+    pool = LessonPool(generator, per_key=1, max_workers=1)
+    profile = make_profile(tmp_path)
+    try:
+        lesson = pool.get(profile, "addition")
+        assert lesson["topic"] == "addition"
+        assert pool.stats()["misses"] == 1
+
+        # The miss queued a lesson for the next request at the same level
+        assert wait_for(lambda: pool.stats()["ready"] == 1)
+        assert pool.get(profile, "addition")["topic"] == "addition"
+        stats = pool.stats()
+        assert (stats["hits"], stats["misses"]) == (1, 1)
+    finally:
+        pool.shutdown()
+
+
+def test_prefetched_lesson_is_a_hit(tmp_path):
+    generator = CountingGenerator()
+    pool = LessonPool(generator, per_key=2, max_workers=2)
+    profile = make_profile(tmp_path)
+    try:
+        pool.prefetch(profile)
+        assert wait_for(lambda: pool.stats()["ready"] == 2)
+        topic, difficulty, _ = generator.plan_lesson(profile)
+
+        lesson = pool.get(profile)
+        assert (lesson["topic"], lesson["difficulty"]) == (topic, difficulty)
+        assert pool.stats()["hits"] == 1 and pool.stats()["misses"] == 0
+        # Nothing was built on the request path
+        assert wait_for(lambda: generator.built == 3)
+    finally:
+        pool.shutdown()
+
+
+def test_changed_prediction_drops_the_old_pool(tmp_path):
+    pool = LessonPool(CountingGenerator(), per_key=1, max_workers=1)
+    profile = make_profile(tmp_path)
+    try:
+        pool.prefetch(profile)
+        assert wait_for(lambda: pool.stats()["ready"] == 1)
+
+        # A run of correct answers moves the student up a difficulty
+        before = pool.generator.plan_lesson(profile)
+        profile.apply_answers([answer_record("addition", "", True, 2.0) for _ in range(10)])
+        assert pool.generator.plan_lesson(profile)[1] != before[1]
+
+        pool.prefetch(profile)
+        assert pool.stats()["invalidated"] == 1
+        assert wait_for(lambda: pool.stats()["ready"] == 1)
+    finally:
+        pool.shutdown()
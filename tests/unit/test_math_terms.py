@@ -0,0 +1,83 @@
+import random
+
+import pytest
+
+from src.nlp.aho_corasick import AhoCorasick
+from src.nlp.enhanced_tokenizer import EnhancedSinhalaTokenizer
+
+
+def baseline_occurrences(patterns, text):
+    """Every (start, end, value) occurrence, found with one str.find loop per pattern"""
+    found = []
+    for pattern, value in patterns.items():
+        start = text.find(pattern)
+        while start != -1:
+            found.append((start, start + len(pattern), value))
+            start = text.find(pattern, start + 1)
+    return sorted(found)
+
+
+def baseline_identify_math_terms(math_terms, text):
+    """identify_math_terms before the automaton: first occurrence of each term"""
+    identified_terms = []
+    for eng_term, si_term in math_terms.items():
+        if si_term in text:
+            identified_terms.append({
+                "term": si_term,
+                "english_equivalent": eng_term,
+                "position": text.find(si_term)
+            })
+    identified_terms.sort(key=lambda x: x["position"])
+    return identified_terms
+
+
+def random_texts(fragments, seed, count=1000):
+    rng = random.Random(seed)
+    for _ in range(count):
+        yield "".join(rng.choice(fragments) for _ in range(rng.randint(0, 16)))
+
+
+@pytest.mark.parametrize("seed", [0, 1])
+def test_automaton_finds_every_occurrence(seed):
+    # Patterns sharing prefixes and suffixes, and nested in one another
+    patterns = {"he": 1, "she": 2, "his": 3, "hers": 4, "e": 5, "ත්‍රිකෝණය": 6, "කෝණය": 7, "ණය": 8}
+    matcher = AhoCorasick(patterns)
+    fragments = list(patterns) + ["h", "s", "r", "x", " ", "ත්‍රි", "කෝ", "ණ"]
+    for text in random_texts(fragments, seed):
+        assert sorted(matcher.iter_matches(text)) == baseline_occurrences(patterns, text), text
+
+
+@pytest.mark.parametrize("seed", [0, 1])
+def test_identify_math_terms_agrees_with_substring_search(seed):
+    tokenizer = EnhancedSinhalaTokenizer()
+    math_terms = tokenizer.math_terms
+    patterns = {si_term: eng_term for eng_term, si_term in reversed(list(math_terms.items()))}
+    fragments = list(patterns) + ["3", " ", "x", "ක", "ත්‍රි", "සහ "]
+
+    for text in random_texts(fragments, seed):
+        identified = tokenizer.identify_math_terms(text)
+        occurrences = baseline_occurrences(patterns, text)
+
+        # Every reported match is a real occurrence, and matches do not overlap
+        spans = [(item["position"], item["position"] + len(item["term"])) for item in identified]
+        assert all((start, end, item["english_equivalent"]) in occurrences
+                   for (start, end), item in zip(spans, identified)), text
+        assert all(end <= next_start for (_, end), (next_start, _) in zip(spans, spans[1:])), text
+
+        # Every occurrence is reported unless a longer term covers it
+        for start, end, _ in occurrences:
+            assert any(s <= start and end <= e for s, e in spans), text
+
+        # The old search found the same set of terms, though only once each
+        old = baseline_identify_math_terms(math_terms, text)
+        assert {item["term"] for item in identified} <= {item["term"] for item in old}, text
+        for item in old:
+            start = item["position"]
+            assert any(s <= start < e for s, e in spans), text
+
+
+def test_longer_term_hides_the_one_inside_it():
+    tokenizer = EnhancedSinhalaTokenizer()
+    terms = tokenizer.identify_math_terms("ත්‍රිකෝණයේ කෝණය")
+    assert [(item["term"], item["position"]) for item in terms] == [
+        ("ත්‍රිකෝණය", 0), ("කෝණය", len("ත්‍රිකෝණයේ "))]
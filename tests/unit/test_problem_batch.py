@@ -0,0 +1,125 @@
+import random
+import re
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from src.cultural.problem_generator import (CONTEXTS, QUESTION_TEMPLATES,
+                                            CulturalProblemGenerator)
+
+TOPICS = list(QUESTION_TEMPLATES)
+DIFFICULTIES = range(1, 11)
+N = 3000
+
+# Allowed gap between batch and scalar shares of a category, about 4.5 standard errors at N
+SHARE_TOLERANCE = 0.05
+
+CONTEXT_NAMES = [name for names in CONTEXTS.values() for name in names]
+
+# (a, b) bounds per topic; for division a is the total, b the divisor
+BOUNDS = {
+    "addition": lambda d: ((1, d * 10), (1, d * 10)),
+    "subtraction": lambda d: ((d * 10, d * 20), (1, d * 20)),
+    "multiplication": lambda d: ((1, d * 5), (1, d * 5)),
+    "division": lambda d: ((2, d * 2 * d * 5), (2, d * 2)),
+    "probability": lambda d: ((d * 5, d * 10), (1, d * 10)),
+}
+
+
+def expected_answer(topic, a, b):
+    if topic == "addition":
+        return a + b
+    if topic == "subtraction":
+        return a - b
+    if topic == "multiplication":
+        return a * b
+    if topic == "division":
+        return a // b
+    return f"{b}/{a}"
+
+
+def operands(question):
+    """a and b as they appear in the question text; every template has {a} before {b}"""
+    a, b = re.findall(r"\d+", question)[:2]
+    return int(a), int(b)
+
+
+def template_index(topic, question, a, b):
+    for index, template in enumerate(QUESTION_TEMPLATES[topic]):
+        # The context only ever opens the question
+        if question.endswith(template.format(context="", a=a, b=b)):
+            return index
+    raise AssertionError(question)
+
+
+def context_name(question):
+    return next((name for name in CONTEXT_NAMES if question.startswith(name)), None)
+
+
+def shares(values):
+    counts = Counter(values)
+    return {key: count / len(values) for key, count in counts.items()}
+
+
+def assert_same_shares(batch_values, scalar_values):
+    batch_shares, scalar_shares = shares(batch_values), shares(scalar_values)
+    assert set(batch_shares) == set(scalar_shares)
+    for key in batch_shares:
+        assert batch_shares[key] == pytest.approx(scalar_shares[key], abs=SHARE_TOLERANCE), key
+
+
+def scalar_problems(generator, topic, difficulty, seed):
+    random.seed(seed)
+    return [generator.generate_problem(topic, difficulty) for _ in range(N)]
+
+
+@pytest.mark.parametrize("topic", TOPICS)
+def test_batch_operands_and_answers(topic):
+    generator = CulturalProblemGenerator()
+    for difficulty in DIFFICULTIES:
+        batch = generator.generate_batch(topic, difficulty, N, seed=difficulty)
+        (a_low, a_high), (b_low, b_high) = BOUNDS[topic](difficulty)
+        assert a_low <= batch.a.min() and batch.a.max() <= a_high
+        assert b_low <= batch.b.min() and batch.b.max() <= b_high
+        if topic == "division":
+            assert 1 <= batch.answers.min() and batch.answers.max() <= difficulty * 5
+            assert np.array_equal(batch.a, batch.b * batch.answers)
+        if topic in ("subtraction", "probability"):
+            assert (batch.b <= batch.a).all()
+
+        problems = batch.to_dicts()
+        assert problems == [batch.problem(i) for i in range(len(batch))]
+        for problem, a, b in zip(problems, batch.a.tolist(), batch.b.tolist()):
+            assert problem["type"] == topic and problem["difficulty"] == difficulty
+            assert operands(problem["question"]) == (a, b)
+            assert problem["answer"] == expected_answer(topic, a, b)
+
+
+@pytest.mark.parametrize("topic", TOPICS)
+def test_batch_matches_scalar_distributions(topic):
+    generator = CulturalProblemGenerator()
+    for difficulty in DIFFICULTIES:
+        batch = generator.generate_batch(topic, difficulty, N, seed=difficulty).to_dicts()
+        scalar = scalar_problems(generator, topic, difficulty, seed=difficulty)
+
+        batch_operands = [operands(p["question"]) for p in batch]
+        scalar_operands = [operands(p["question"]) for p in scalar]
+        for side in (0, 1):
+            batch_side = np.array([pair[side] for pair in batch_operands])
+            scalar_side = np.array([pair[side] for pair in scalar_operands])
+            # Both paths reach the same extremes and agree on the mean
+            assert batch_side.min() == scalar_side.min()
+            assert batch_side.max() == pytest.approx(scalar_side.max(), rel=0.05)
+            standard_error = np.sqrt((batch_side.var() + scalar_side.var()) / N)
+            assert abs(batch_side.mean() - scalar_side.mean()) < 5 * standard_error + 1e-9
+
+        for problem, (a, b) in zip(scalar, scalar_operands):
+            assert problem["answer"] == expected_answer(topic, a, b)
+
+        assert_same_shares([p["context_type"] for p in batch], [p["context_type"] for p in scalar])
+        assert_same_shares([context_name(p["question"]) for p in batch],
+                           [context_name(p["question"]) for p in scalar])
+        assert_same_shares(
+            [template_index(topic, p["question"], *pair) for p, pair in zip(batch, batch_operands)],
+            [template_index(topic, p["question"], *pair) for p, pair in zip(scalar, scalar_operands)])
@@ -0,0 +1,92 @@
+import time
+
+from src.learning.profile_cache import ProfileCache
+from src.learning.profile_store import JsonProfileStore
+from src.learning.profile_writer import ProfileWriter
+from src.learning.student_profile import StudentProfile
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def make_profile(store, student_id, writer=None):
+    return StudentProfile(student_id, writer=writer, store=store, multiprocess=False)
+
+
+def attempts(store, student_id):
+    """Answers the stored profile holds, read through a fresh instance"""
+    return make_profile(store, student_id).get_topic_stats("addition")["attempts"]
+
+
+def test_stop_flushes_pending_profiles(tmp_path):
+    store = JsonProfileStore(str(tmp_path))
+    writer = ProfileWriter(interval=60, batch_size=100).start()
+    profile = make_profile(store, "s1", writer)
+    for correct in (True, False, True):
+        profile.update_progress("addition", "", correct, 2.0)
+
+    # Answers coalesce into one pending write
+    assert store.version("s1") is None
+    assert writer.stats()["pending"] == 1
+    assert writer.stats()["marked"] == 3
+
+    writer.stop()
+    assert not profile.dirty
+    assert attempts(store, "s1") == 3
+    assert writer.stats() == {"pending": 0, "marked": 3, "writes": 1, "failures": 0}
+
+
+def test_full_batch_is_flushed_before_the_interval(tmp_path):
+    store = JsonProfileStore(str(tmp_path))
+    writer = ProfileWriter(interval=60, batch_size=2).start()
+    try:
+        make_profile(store, "s1", writer).update_progress("addition", "", True, 2.0)
+        time.sleep(0.1)
+        assert store.version("s1") is None
+
+        make_profile(store, "s2", writer).update_progress("addition", "", True, 2.0)
+        assert wait_for(lambda: writer.stats()["writes"] == 2)
+        assert attempts(store, "s1") == attempts(store, "s2") == 1
+    finally:
+        writer.stop()
+
+
+def test_cache_eviction_flushes_dirty_profiles(tmp_path):
+    store = JsonProfileStore(str(tmp_path))
+    # Never started, so only evictions and explicit flushes write
+    writer = ProfileWriter(interval=60)
+    cache = ProfileCache(lambda student_id: make_profile(store, student_id, writer), max_entries=1)
+
+    first = cache.get("s1")
+    first.update_progress("addition", "", True, 2.0)
+    assert first.dirty and store.version("s1") is None
+
+    cache.get("s2")
+    assert "s1" not in cache and len(cache) == 1
+    assert not first.dirty
+    assert attempts(store, "s1") == 1
+    # The flush took it off the writer's pending list
+    assert writer.stats()["pending"] == 0
+    assert cache.stats()["evictions"] == 1
+
+    # Still referenced, so it comes back as the same instance
+    assert cache.get("s1") is first
+    assert cache.stats()["misses"] == 3
+
+
+def test_cache_hits_and_idle_expiry(tmp_path):
+    store = JsonProfileStore(str(tmp_path))
+    cache = ProfileCache(lambda student_id: make_profile(store, student_id), ttl=0.05)
+    profile = cache.get("s1")
+    assert cache.get("s1") is profile
+    assert (cache.stats()["hits"], cache.stats()["misses"]) == (1, 1)
+
+    time.sleep(0.1)
+    assert cache.sweep() == 1
+    assert len(cache) == 0
@@ -0,0 +1,71 @@
+import pytest
+
+from src.tts.audio_cache import AudioCache
+from src.tts.audio_pack import AudioPack, build_audio_pack
+from src.tts.enhanced_speech_engine import EnhancedSpeechEngine
+from src.tts.speech_engine import SpeechEngine
+
+
+class CountingPack(AudioPack):
+    """AudioPack that counts the clips it reads from disk"""
+
+    def __init__(self, pack_dir):
+        super().__init__(pack_dir)
+        self.reads = 0
+
+    def get(self, key):
+        audio = super().get(key)
+        if audio is not None:
+            self.reads += 1
+        return audio
+
+
+class CountingBackend:
+    name = 'counting'
+
+    def __init__(self):
+        self.calls = 0
+
+    def synthesize(self, text, language, speed=1.0):
+        self.calls += 1
+        return b"RIFF\x00\x00\x00\x00WAVE" + text.encode('utf-8')
+
+
+def make_engine(engine_class, pack_dir, backend):
+    kwargs = {"equation_mode": "synthesize"} if engine_class is EnhancedSpeechEngine else {}
+    return engine_class(cache=AudioCache(max_memory_items=8), audio_pack=CountingPack(pack_dir),
+                        backend=backend, **kwargs)
+
+
+def synthesize(engine, text):
+    if isinstance(engine, EnhancedSpeechEngine):
+        return engine.synthesize_with_key(text)[1]
+    return engine.synthesize(text)
+
+
+@pytest.mark.parametrize("engine_class", [SpeechEngine, EnhancedSpeechEngine])
+def test_repeated_pack_hit_is_served_from_memory(tmp_path, engine_class):
+    backend = CountingBackend()
+    build_audio_pack(str(tmp_path), make_engine(engine_class, str(tmp_path), backend),
+                     phrases=["හොඳයි"])
+    assert backend.calls == 1
+
+    engine = make_engine(engine_class, str(tmp_path), backend)
+    first = synthesize(engine, "හොඳයි")
+    second = synthesize(engine, "හොඳයි")
+
+    assert first == second
+    assert engine.audio_pack.reads == 1
+    assert engine.cache.stats()["memory_hits"] == 1
+    assert backend.calls == 1
+    # Packed audio is held in memory only, not copied into the disk tier
+    assert engine.cache.stats()["disk_items"] == 0
+
+
+@pytest.mark.parametrize("engine_class", [SpeechEngine, EnhancedSpeechEngine])
+def test_unpacked_phrase_is_synthesized_once(tmp_path, engine_class):
+    backend = CountingBackend()
+    engine = make_engine(engine_class, str(tmp_path), backend)
+    assert synthesize(engine, "x") == synthesize(engine, "x")
+    assert backend.calls == 1
+    assert engine.audio_pack.reads == 0
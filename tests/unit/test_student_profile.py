@@ -0,0 +1,97 @@
+import json
+
+import pytest
+
+from src.learning.profile_store import JsonProfileStore
+from src.learning.student_profile import EWMA_ALPHA, StudentProfile, answer_record
+
+
+def make_profile(tmp_path, student_id="s1"):
+    return StudentProfile(student_id, store=JsonProfileStore(str(tmp_path)), multiprocess=False)
+
+
+def test_rollups_count_answers_and_streaks(tmp_path):
+    profile = make_profile(tmp_path)
+    answers = [True, True, False, True, True, True]
+    records = [answer_record("addition", "carrying", correct, 2.0 + i)
+               for i, correct in enumerate(answers)]
+    profile.apply_answers(records)
+
+    stats = profile.get_topic_stats("addition")
+    assert stats["attempts"] == 6
+    assert stats["correct"] == 5
+    assert stats["current_streak"] == 3
+    assert stats["best_streak"] == 3
+    assert stats["last_seen"] == records[-1]["timestamp"]
+    # The subtopic rollup sees the same answers
+    assert profile.get_topic_stats("addition", "carrying") == stats
+
+
+def test_rollup_averages_follow_the_ewma(tmp_path):
+    profile = make_profile(tmp_path)
+    accuracy = response_time = None
+    for i, correct in enumerate([False, True, True, False, True]):
+        profile.update_progress("subtraction", "", correct, 1.0 + i)
+        hit = 1.0 if correct else 0.0
+        accuracy = hit if accuracy is None else accuracy + EWMA_ALPHA * (hit - accuracy)
+        time = 1.0 + i
+        response_time = time if response_time is None else \
+            response_time + EWMA_ALPHA * (time - response_time)
+
+    stats = profile.get_topic_stats("subtraction")
+    assert stats["ewma_accuracy"] == pytest.approx(accuracy)
+    assert stats["ewma_response_time"] == pytest.approx(response_time)
+    assert stats["current_streak"] == 1
+    assert stats["best_streak"] == 2
+
+
+def test_unseen_topic_has_an_empty_rollup(tmp_path):
+    stats = make_profile(tmp_path).get_topic_stats("division")
+    assert stats["attempts"] == 0
+    assert stats["ewma_accuracy"] is None
+    assert stats["last_seen"] is None
+
+
+def test_rollups_survive_a_save_and_reload(tmp_path):
+    profile = make_profile(tmp_path)
+    profile.apply_answers([answer_record("addition", "", i % 3 != 0, 1.5) for i in range(7)] +
+                          [answer_record("division", "remainders", True, 4.0)])
+
+    reloaded = make_profile(tmp_path)
+    assert reloaded.get_topic_stats() == profile.get_topic_stats()
+    assert reloaded.get_topic_stats("division", "remainders") == \
+        profile.get_topic_stats("division", "remainders")
+
+
+def test_rollups_are_rebuilt_for_profiles_saved_without_them(tmp_path):
+    profile = make_profile(tmp_path)
+    profile.apply_answers([answer_record("addition", "", i % 2 == 0, 2.0) for i in range(5)])
+    expected = profile.get_topic_stats("addition")
+
+    path = tmp_path / "s1.json"
+    data = json.loads(path.read_text(encoding="utf-8"))
+    del data["topic_stats"], data["subtopic_stats"]
+    path.write_text(json.dumps(data), encoding="utf-8")
+
+    assert make_profile(tmp_path).get_topic_stats("addition") == expected
+
+
+def test_reload_if_changed_sees_saves_through_another_store(tmp_path):
+    # Two worker processes, each with its own store over the same directory
+    first = StudentProfile("s1", store=JsonProfileStore(str(tmp_path)), multiprocess=False)
+    second = StudentProfile("s1", store=JsonProfileStore(str(tmp_path)), multiprocess=False)
+    assert not second.reload_if_changed()
+
+    first.apply_answers([answer_record("addition", "", True, 2.0) for _ in range(3)])
+    assert second.get_topic_stats("addition")["attempts"] == 0
+    assert second.reload_if_changed()
+    assert second.get_topic_stats("addition") == first.get_topic_stats("addition")
+    assert second.get_proficiency_level("addition") == first.get_proficiency_level("addition")
+    # Nothing new since the reload
+    assert not second.reload_if_changed()
+
+    # Its own save does not count as a change either
+    second.update_progress("addition", "", False, 2.0)
+    assert not second.reload_if_changed()
+    assert first.reload_if_changed()
+    assert first.get_topic_stats("addition")["attempts"] == 4
@@ -0,0 +1,85 @@
+import threading
+import time
+
+from src.tts.synthesis_service import SynthesisService
+
+
+class BlockingBackend:
+    """Fake backend that holds every synthesis until released"""
+
+    name = 'blocking'
+
+    def __init__(self):
+        self.calls = []
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self._lock = threading.Lock()
+
+    def synthesize(self, text, language, speed=1.0):
+        with self._lock:
+            self.calls.append(text)
+        self.started.set()
+        assert self.release.wait(5)
+        return f"audio:{text}:{language}".encode()
+
+
+def test_concurrent_identical_requests_share_one_synthesis():
+    backend = BlockingBackend()
+    service = SynthesisService(backend, max_workers=4)
+    results = []
+    results_lock = threading.Lock()
+
+    def request():
+        audio = service.synthesize("දෙක එකතු තුන", timeout=5)
+        with results_lock:
+            results.append(audio)
+
+    threads = [threading.Thread(target=request) for _ in range(16)]
+    for thread in threads:
+        thread.start()
+    assert backend.started.wait(5)
+    # Every waiter has joined the in-flight job before it finishes
+    deadline = time.monotonic() + 5
+    while service.stats()["coalesced"] < 15 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    backend.release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert backend.calls == ["දෙක එකතු තුන"]
+    assert results == ["audio:දෙක එකතු තුන:si".encode()] * 16
+    stats = service.stats()
+    assert stats["submitted"] == 1
+    assert stats["coalesced"] == 15
+    assert stats["completed"] == 1
+    service.shutdown()
+
+
+def test_distinct_requests_run_in_parallel_on_the_pool():
+    backend = BlockingBackend()
+    service = SynthesisService(backend, max_workers=4)
+
+    futures = [service.synthesize_async(f"text {i}") for i in range(4)]
+    deadline = time.monotonic() + 5
+    while service.stats()["running"] < 4 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    # All four jobs are inside the backend at once
+    assert service.stats()["running"] == 4
+    backend.release.set()
+
+    assert [future.result(5) for future in futures] == \
+        [f"audio:text {i}:si".encode() for i in range(4)]
+    assert sorted(backend.calls) == [f"text {i}" for i in range(4)]
+    service.shutdown()
+
+
+def test_new_request_after_completion_synthesizes_again():
+    backend = BlockingBackend()
+    backend.release.set()
+    service = SynthesisService(backend, max_workers=2)
+
+    assert service.synthesize("a", timeout=5) == b"audio:a:si"
+    assert service.synthesize("a", timeout=5) == b"audio:a:si"
+    # Without a cache, coalescing only covers jobs still in flight
+    assert backend.calls == ["a", "a"]
+    service.shutdown()
@@ -0,0 +1,115 @@
+import random
+import re
+
+import pytest
+
+from src.nlp.enhanced_tokenizer import EnhancedSinhalaTokenizer
+from src.nlp.tokenizer import SinhalaTokenizer
+
+FRAGMENTS = [
+    # Sinhala words, including ones with ZWJ and vowel signs
+    "එකතු", "කිරීම", "ත්‍රිකෝණය", "වර්ගමූලය", "හරය", "සමීකරණය", "ගුණ",
+    # Numbers and decimals, including trailing and doubled dots
+    "3", "42", "3.14", "0.5", "10.", ".5", "1.2.3", "007",
+    # Math symbols and characters the tokenizers skip
+    "+", "-", "*", "/", "=", "^", "(", ")", ",", "?", "%", "×", "÷",
+    # Variables
+    "x", "y", "ab", "Z",
+    # Sinhala lith digits, matched by both \d and the Sinhala block
+    "෧", "෨෩", "෦.෫", "෯",
+    # Other digits \d accepts
+    "٣", "४२",
+    " ", " ", "  ", "\n", "\t"
+]
+
+
+def baseline_tokenize(patterns, text):
+    """The tokenizers before the scanner: one finditer per pattern, merged by start"""
+    all_tokens = []
+    for pattern in patterns:
+        all_tokens += [(m.group(), m.start(), m.end()) for m in re.finditer(pattern, text)]
+    all_tokens.sort(key=lambda x: x[1])
+    return [token[0] for token in all_tokens]
+
+
+def random_texts(seed, count=2000):
+    rng = random.Random(seed)
+    for _ in range(count):
+        yield "".join(rng.choice(FRAGMENTS) for _ in range(rng.randint(0, 24)))
+
+
+def patterns_of(tokenizer):
+    patterns = [tokenizer.sinhala_pattern, tokenizer.number_pattern, tokenizer.math_symbol_pattern]
+    if hasattr(tokenizer, "variable_pattern"):
+        patterns.append(tokenizer.variable_pattern)
+    return patterns
+
+
+@pytest.mark.parametrize("tokenizer_class", [EnhancedSinhalaTokenizer, SinhalaTokenizer])
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_scanner_matches_multi_pass_tokenizer(tokenizer_class, seed):
+    tokenizer = tokenizer_class()
+    patterns = patterns_of(tokenizer)
+    for text in random_texts(seed):
+        expected = baseline_tokenize(patterns, text)
+        assert tokenizer.tokenize(text) == expected, text
+        assert [token.text for token in tokenizer.tokenize_iter(text)] == expected, text
+
+
+@pytest.mark.parametrize("tokenizer_class", [EnhancedSinhalaTokenizer, SinhalaTokenizer])
+def test_scanner_matches_multi_pass_tokenizer_on_examples(tokenizer_class):
+    tokenizer = tokenizer_class()
+    patterns = patterns_of(tokenizer)
+    texts = [
+        "",
+        "x + 5 = 10",
+        "3.5 ගුණ 2 = 7.0",
+        "(x^2 + y^2) / 2.25",
+        "රුපියල් 150.75 න් 25 ක් අඩු කරන්න",
+        "ත්‍රිකෝණයේ කෝණ 60, 60 සහ 60 වේ",
+        # Sinhala lith digits take the per-pattern fallback
+        "෧෨ + 3 = x",
+        "අංක෧෨",
+        "෦.෫ගුණ2.5"
+    ]
+    for text in texts:
+        assert tokenizer.tokenize(text) == baseline_tokenize(patterns, text), text
+    assert tokenizer.tokenize_many(texts) == [baseline_tokenize(patterns, text) for text in texts]
+
+
+def baseline_spans(patterns, text):
+    """(type, text, start, end) of the multi-pass tokenizer's tokens"""
+    all_tokens = []
+    for name, pattern in patterns:
+        all_tokens += [(name, m.group(), m.start(), m.end()) for m in re.finditer(pattern, text)]
+    all_tokens.sort(key=lambda x: x[2])
+    return all_tokens
+
+
+@pytest.mark.parametrize("tokenizer_class", [EnhancedSinhalaTokenizer, SinhalaTokenizer])
+@pytest.mark.parametrize("seed", [0, 1])
+def test_token_stream_matches_token_lists(tokenizer_class, seed):
+    tokenizer = tokenizer_class()
+    patterns = tokenizer.scanner.patterns
+    for text in random_texts(seed, count=500):
+        expected = baseline_spans(patterns, text)
+        tokens = [token for _, token, _, _ in expected]
+        stream = tokenizer.tokenize_stream(text)
+
+        assert len(stream) == len(expected), text
+        assert stream.texts() == tokens, text
+        assert [tuple(token) for token in stream] == expected, text
+        for i, (name, token, start, end) in enumerate(expected):
+            assert (stream.type(i), stream.text(i), stream.span(i)) == (name, token, (start, end))
+
+        # Windows and slices are views that agree with slicing the token list
+        for i in range(len(tokens)):
+            window = stream.window(i, before=2, after=3)
+            assert window.texts() == tokens[max(0, i - 2):i + 4], text
+            first, last = expected[max(0, i - 2)], expected[min(len(tokens), i + 4) - 1]
+            assert window.context_text() == text[first[2]:last[3]], text
+        if tokens:
+            assert stream.find(tokens[-1]) == tokens.index(tokens[-1])
+        assert stream.find("෴") == -1
+        for name, _ in patterns:
+            assert stream.of_type(name) == [i for i, token in enumerate(expected) if token[0] == name]
@@ -0,0 +1,69 @@
+import re
+
+import pytest
+
+from src.nlp.math_processor import MathProcessor
+from src.nlp.verbalizer import generate_equations, verbalize
+
+# EnhancedSpeechEngine's symbol table before the verbalizer
+BASELINE_TERMS = {
+    "+": "එකතු",
+    "-": "අඩු",
+    "*": "ගුණ",
+    "/": "බෙදා",
+    "=": "සමානයි",
+    "^": "න්තු",
+    "x": "එක්ස්",
+    "y": "වයි",
+    "z": "සෙඩ්",
+    "√": "වර්ගමූලය",
+    "(": "වරහන ආරම්භය",
+    ")": "වරහන අවසානය"
+}
+
+
+def baseline_preprocess(text):
+    """EnhancedSpeechEngine._preprocess_math_equation before the verbalizer"""
+    for symbol, word in BASELINE_TERMS.items():
+        text = text.replace(symbol, f" {word} ")
+    text = re.sub(r'(\d+)\^(\d+)', r'\1 න්තු \2', text)
+    text = re.sub(r'(\d+)/(\d+)', r'\1 බෙදා \2', text)
+    text = re.sub(r'√(\d+)', r'වර්ගමූලය \1', text)
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def same_speech(expected):
+    """The old pipeline left unmapped variables joined to their coefficient ("4b")"""
+    return re.sub(r'(\d)([a-zA-Z])', r'\1 \2', expected)
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_verbalizer_matches_old_pipeline(seed):
+    # Binary operators, brackets, roots, single-number powers and fractions
+    # read the same as before; only unary minus and compound exponents differ
+    for equation in generate_equations(2000, seed):
+        assert verbalize(equation, "si") == same_speech(baseline_preprocess(equation)), equation
+
+
+def test_verbalizer_matches_old_pipeline_on_examples():
+    for equation in ["", "3 + 4 = 7", "2x + 3y = 12", "(x + 1) * (x - 1)", "√16 = 4",
+                     "3/4 + 1/4 = 1", "x^2 + y^3 = z", "12.5 * 2 = 25", "ලකුණු 5 + 3"]:
+        assert verbalize(equation, "si") == same_speech(baseline_preprocess(equation)), equation
+
+
+def test_compound_exponent_is_bracketed():
+    assert verbalize("2^3^2", "en") == "2 to the power of open bracket 3 squared close bracket"
+    assert verbalize("2^√4 + 1", "en") == \
+        "2 to the power of open bracket the square root of 4 close bracket plus 1"
+    assert verbalize("2^3^2", "si") == "2 න්තු වරහන ආරම්භය 3 න්තු 2 වරහන අවසානය"
+    # Single-unit exponents, bracketed ones included, are read as they are
+    assert verbalize("x^(y + 1)", "en") == \
+        "x to the power of open bracket y plus 1 close bracket"
+    assert verbalize("2^-1", "en") == "2 to the power of negative 1"
+    assert verbalize("2^3 + 1", "en") == "2 cubed plus 1"
+
+
+def test_math_processor_uses_the_verbalizer():
+    processor = MathProcessor()
+    assert processor.equation_to_speech("2^3^2 = 512", "en") == \
+        "2 to the power of open bracket 3 squared close bracket equals 512"